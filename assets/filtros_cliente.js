@@ -0,0 +1,215 @@
+/*
+ * Modo cliente (SALARIOS_MODO_CLIENTE=1): filtros e reagregação dos gráficos temporal,
+ * de tamanho de empresa e de top cargos no navegador, sobre as contagens e somas por
+ * célula enviadas uma vez por sessão (ver agregados_cliente em dashboard_salarios.py).
+ * Os traces reproduzem os do Plotly Express, copiando o estilo dos moldes do servidor.
+ * Sem o ranking no payload (agregados.cargos null, acima do limite de entradas), top
+ * cargos e paginação devolvem no_update e são respondidos pelo servidor
+ */
+(function () {
+    // Posições permitidas de uma dimensão, ou null quando o filtro cobre todos os valores
+    // (como normalizar_filtro: null, "all", lista vazia ou terminada em "all" = todos)
+    function permitidas(valor, valores) {
+        if (valor === null || valor === undefined || valor === "all") {
+            return null;
+        }
+        let escolhidos;
+        if (Array.isArray(valor)) {
+            if (valor.length === 0 || valor[valor.length - 1] === "all") {
+                return null;
+            }
+            escolhidos = new Set(valor);
+        } else if (typeof valor === "object") {
+            escolhidos = new Set(valores.filter(function (item) {
+                return (valor.de === null || valor.de === undefined || item >= valor.de) &&
+                    (valor.ate === null || valor.ate === undefined || item <= valor.ate);
+            }));
+        } else {
+            escolhidos = new Set([valor]);
+        }
+        const posicoes = new Set();
+        valores.forEach(function (item, i) {
+            if (escolhidos.has(item)) {
+                posicoes.add(i);
+            }
+        });
+        return posicoes;
+    }
+
+    // Índices das células que atendem aos filtros (um valor por dimensão de filtro)
+    function selecionar(agregados, celulas, filtros) {
+        const ativos = [];
+        agregados.dimensoes.forEach(function (dim, j) {
+            const posicoes = permitidas(filtros[j], celulas.valores[dim]);
+            if (posicoes !== null) {
+                ativos.push([celulas.posicoes[dim], posicoes]);
+            }
+        });
+        const selecionadas = [];
+        for (let i = 0; i < celulas.contagem.length; i++) {
+            if (ativos.every(function (ativo) { return ativo[1].has(ativo[0][i]); })) {
+                selecionadas.push(i);
+            }
+        }
+        return selecionadas;
+    }
+
+    // Contagem e soma por combinação das dimensões em `por`, com os valores de cada grupo
+    function agrupar(celulas, selecionadas, por) {
+        const grupos = new Map();
+        selecionadas.forEach(function (i) {
+            const posicoes = por.map(function (dim) { return celulas.posicoes[dim][i]; });
+            const chave = posicoes.join("|");
+            let grupo = grupos.get(chave);
+            if (grupo === undefined) {
+                grupo = {
+                    posicoes: posicoes,
+                    valores: por.map(function (dim, j) { return celulas.valores[dim][posicoes[j]]; }),
+                    contagem: 0,
+                    soma: 0
+                };
+                grupos.set(chave, grupo);
+            }
+            grupo.contagem += celulas.contagem[i];
+            grupo.soma += celulas.soma[i];
+        });
+        return Array.from(grupos.values());
+    }
+
+    function total(celulas, selecionadas) {
+        return selecionadas.reduce(function (soma, i) { return soma + celulas.contagem[i]; }, 0);
+    }
+
+    function comparar(a, b) {
+        return a < b ? -1 : (a > b ? 1 : 0);
+    }
+
+    // Layout do molde copiado: o Plotly altera o layout recebido ao desenhar
+    function figura(molde, traces) {
+        return {data: traces, layout: JSON.parse(JSON.stringify(molde.layout))};
+    }
+
+    // Cargos elegíveis (mínimo de registros) na ordem do ranking do servidor
+    function estatisticasCargos(agregados, filtros) {
+        const cargos = agregados.cargos;
+        const grupos = agrupar(cargos, selecionar(agregados, cargos, filtros), ["job_title"]);
+        grupos.sort(function (a, b) { return a.posicoes[0] - b.posicoes[0]; });
+        return grupos.filter(function (grupo) {
+            return grupo.contagem >= agregados.top_cargos.minimo;
+        }).map(function (grupo) {
+            return {cargo: grupo.valores[0], media: grupo.soma / grupo.contagem, contagem: grupo.contagem};
+        });
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        cliente: {
+            temporal: function (ano, experiencia, tamanho, pais, agregados) {
+                if (!agregados) {
+                    return window.dash_clientside.no_update;
+                }
+                const filtros = [ano, experiencia, tamanho, pais];
+                const selecionadas = selecionar(agregados, agregados.cubo, filtros);
+                if (total(agregados.cubo, selecionadas) === 0) {
+                    return agregados.vazia;
+                }
+                const rotulos = agregados.rotulos.experience_level;
+                const pontos = agrupar(agregados.cubo, selecionadas, ["work_year", "experience_level"]).map(function (grupo) {
+                    return {ano: grupo.valores[0], rotulo: rotulos[grupo.valores[1]], media: grupo.soma / grupo.contagem};
+                });
+                pontos.sort(function (a, b) { return comparar(a.ano, b.ano) || comparar(a.rotulo, b.rotulo); });
+
+                // Um trace por nível, com as cores na ordem em que os níveis aparecem (como no px.line)
+                const molde = agregados.moldes["grafico-temporal"];
+                const base = molde.data[0];
+                const traces = [];
+                const porRotulo = {};
+                pontos.forEach(function (ponto) {
+                    let trace = porRotulo[ponto.rotulo];
+                    if (trace === undefined) {
+                        trace = Object.assign({}, base, {
+                            name: ponto.rotulo,
+                            legendgroup: ponto.rotulo,
+                            hovertemplate: base.hovertemplate.replace("=" + base.name + "<br>", "=" + ponto.rotulo + "<br>"),
+                            line: Object.assign({}, base.line, {color: agregados.cores[traces.length % agregados.cores.length]}),
+                            x: [],
+                            y: []
+                        });
+                        porRotulo[ponto.rotulo] = trace;
+                        traces.push(trace);
+                    }
+                    trace.x.push(ponto.ano);
+                    trace.y.push(ponto.media);
+                });
+                return figura(molde, traces);
+            },
+
+            empresa: function (ano, experiencia, tamanho, pais, agregados) {
+                if (!agregados) {
+                    return window.dash_clientside.no_update;
+                }
+                const filtros = [ano, experiencia, tamanho, pais];
+                const selecionadas = selecionar(agregados, agregados.cubo, filtros);
+                if (total(agregados.cubo, selecionadas) === 0) {
+                    return agregados.vazia;
+                }
+                const rotulos = agregados.rotulos.company_size;
+                const ordem = {Small: 1, Medium: 2, Large: 3};
+                const barras = agrupar(agregados.cubo, selecionadas, ["company_size"]).map(function (grupo) {
+                    return {rotulo: rotulos[grupo.valores[0]], media: grupo.soma / grupo.contagem};
+                });
+                barras.sort(function (a, b) { return ordem[a.rotulo] - ordem[b.rotulo]; });
+
+                const molde = agregados.moldes["grafico-empresa"];
+                const base = molde.data[0];
+                const medias = barras.map(function (barra) { return barra.media; });
+                return figura(molde, [Object.assign({}, base, {
+                    x: barras.map(function (barra) { return barra.rotulo; }),
+                    y: medias,
+                    marker: Object.assign({}, base.marker, {color: medias})
+                })]);
+            },
+
+            top_cargos: function (ano, experiencia, tamanho, pais, agregados, pagina) {
+                if (!agregados || !agregados.cargos) {
+                    return window.dash_clientside.no_update;
+                }
+                const filtros = [ano, experiencia, tamanho, pais];
+                if (total(agregados.cubo, selecionar(agregados, agregados.cubo, filtros)) === 0) {
+                    return agregados.vazia;
+                }
+                // Média decrescente (empates na ordem dos cargos, como o nlargest), fatia da
+                // página e barras em ordem crescente
+                const k = agregados.top_cargos.k;
+                const inicio = ((pagina || 1) - 1) * k;
+                const ranking = estatisticasCargos(agregados, filtros);
+                ranking.sort(function (a, b) { return b.media - a.media; });
+                const top = ranking.slice(inicio, inicio + k);
+                top.sort(function (a, b) { return a.media - b.media; });
+
+                const molde = agregados.moldes["grafico-top-cargos"];
+                const base = molde.data[0];
+                const medias = top.map(function (item) { return item.media; });
+                return figura(molde, [Object.assign({}, base, {
+                    x: medias,
+                    y: top.map(function (item) { return item.cargo; }),
+                    customdata: top.map(function (item) { return [item.contagem]; }),
+                    marker: Object.assign({}, base.marker, {color: medias})
+                })]);
+            },
+
+            paginacao: function (ano, experiencia, tamanho, pais, agregados) {
+                const semMudanca = window.dash_clientside.no_update;
+                if (!agregados || !agregados.cargos) {
+                    return [semMudanca, semMudanca];
+                }
+                const elegiveis = estatisticasCargos(agregados, [ano, experiencia, tamanho, pais]).length;
+                const paginas = Math.max(1, Math.ceil(elegiveis / agregados.top_cargos.k));
+                // Nova seleção volta à primeira página
+                const filtro = window.dash_clientside.callback_context.triggered.some(function (gatilho) {
+                    return gatilho.prop_id.indexOf("filtro-") === 0;
+                });
+                return [paginas, filtro ? 1 : semMudanca];
+            }
+        }
+    });
+})();
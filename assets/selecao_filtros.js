@@ -0,0 +1,79 @@
+/*
+ * Seleção dos filtros: o valor exibido nos dropdowns de multi-seleção é o mesmo
+ * aplicado pelos gráficos (normalizar_filtro em indice_filtros.py). Escolher
+ * "Todos" limpa os demais valores e escolher um valor tira o "Todos"; a faixa
+ * de anos (RangeSlider) e o dropdown de ano mostram sempre a mesma seleção
+ */
+(function () {
+    const semMudanca = function () { return window.dash_clientside.no_update; };
+
+    // Valor canônico de um dropdown, ou no_update quando ele já está na forma canônica
+    function normalizar(valor) {
+        if (!Array.isArray(valor)) {
+            return valor === null || valor === undefined ? ["all"] : semMudanca();
+        }
+        if (valor.length === 0 || valor[valor.length - 1] === "all") {
+            return valor.length === 1 ? semMudanca() : ["all"];
+        }
+        if (valor.indexOf("all") >= 0) {
+            return valor.filter(function (item) { return item !== "all"; });
+        }
+        return semMudanca();
+    }
+
+    function todos(valor) {
+        return !Array.isArray(valor) ? valor === "all" || valor === null || valor === undefined :
+            valor.length === 0 || valor[valor.length - 1] === "all";
+    }
+
+    function iguais(a, b) {
+        return Array.isArray(a) && Array.isArray(b) && a.length === b.length &&
+            a.every(function (item, i) { return item === b[i]; });
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        filtros: {
+            normalizar: normalizar,
+
+            // [valor do dropdown de ano, valor da faixa]: a faixa vira a lista dos anos
+            // dentro dela (a faixa inteira, "Todos"); o dropdown move a faixa para os
+            // anos escolhidos (do menor ao maior)
+            ano: function (valor, faixa, opcoes) {
+                const anos = (opcoes || []).map(function (opcao) { return opcao.value; })
+                    .filter(function (ano) { return ano !== "all"; })
+                    .sort(function (a, b) { return a - b; });
+                if (anos.length === 0) {
+                    return [semMudanca(), semMudanca()];
+                }
+                const gatilhos = window.dash_clientside.callback_context.triggered.map(function (gatilho) {
+                    return gatilho.prop_id;
+                });
+
+                if (gatilhos.indexOf("faixa-ano.value") >= 0) {
+                    if (!faixa) {
+                        return [semMudanca(), semMudanca()];
+                    }
+                    let novo = ["all"];
+                    if (faixa[0] > anos[0] || faixa[1] < anos[anos.length - 1]) {
+                        novo = anos.filter(function (ano) { return ano >= faixa[0] && ano <= faixa[1]; });
+                    }
+                    if (novo.length === 0 || iguais(novo, valor) || (todos(novo) && todos(valor))) {
+                        return [semMudanca(), semMudanca()];
+                    }
+                    return [novo, semMudanca()];
+                }
+
+                const normalizado = normalizar(valor);
+                const efetivo = normalizado === window.dash_clientside.no_update ? valor : normalizado;
+                let novaFaixa = [anos[0], anos[anos.length - 1]];
+                if (!todos(efetivo)) {
+                    const escolhidos = (Array.isArray(efetivo) ? efetivo : [efetivo]).slice().sort(function (a, b) {
+                        return a - b;
+                    });
+                    novaFaixa = [escolhidos[0], escolhidos[escolhidos.length - 1]];
+                }
+                return [normalizado, iguais(novaFaixa, faixa) ? semMudanca() : novaFaixa];
+            }
+        }
+    });
+})();
@@ -0,0 +1,45 @@
+/*
+ * Medição no navegador do tempo até o primeiro gráfico e até todos os gráficos
+ * após cada mudança de filtro (usado pelos clientside callbacks do dashboard)
+ */
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    tempos: {
+        marcar_inicio: function () {
+            return performance.now();
+        },
+
+        registrar_grafico: function () {
+            const figuras = arguments.length - 1;
+            const inicio = arguments[figuras];
+            if (inicio === undefined || inicio === null) {
+                return window.dash_clientside.no_update;
+            }
+
+            if (!window._temposGraficos || window._temposGraficos.inicio !== inicio) {
+                window._temposGraficos = {inicio: inicio, recebidos: {}};
+            }
+            const estado = window._temposGraficos;
+            const agora = performance.now();
+            window.dash_clientside.callback_context.triggered.forEach(function (gatilho) {
+                const id = gatilho.prop_id.split(".")[0];
+                if (!(id in estado.recebidos)) {
+                    estado.recebidos[id] = agora - inicio;
+                }
+            });
+
+            const tempos = Object.values(estado.recebidos);
+            const resultado = {
+                graficos: tempos.length,
+                primeiro_ms: Math.min.apply(null, tempos),
+                todos_ms: tempos.length === figuras ? Math.max.apply(null, tempos) : null
+            };
+            if (resultado.todos_ms !== null) {
+                console.log(
+                    "⏱️ Primeiro gráfico: " + resultado.primeiro_ms.toFixed(0) + " ms | " +
+                    "todos os gráficos: " + resultado.todos_ms.toFixed(0) + " ms"
+                );
+            }
+            return resultado;
+        }
+    }
+});
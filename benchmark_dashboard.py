@@ -0,0 +1,326 @@
+"""
+Benchmark do caminho quente do dashboard (update_graphs)
+Gera datasets sintéticos com o mesmo esquema do arquivo original, percorre
+todas as combinações dos filtros (inclusive uma seleção sem resultados) e
+registra, por gráfico, latência p50/p95, pico de memória e tamanho da
+resposta serializada das seleções com dados; as seleções vazias (figura_vazia)
+têm uma linha própria. O resultado é gravado em JSON para comparar execuções
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+PASTA_MODULO = os.path.dirname(os.path.abspath(__file__))
+ARQUIVO_ORIGINAL = os.path.join(PASTA_MODULO, "Data", "salario_profissionais_dados.csv")
+PASTA_SINTETICOS = os.path.join(PASTA_MODULO, "Data", "sinteticos")
+
+ESCALAS = {"10k": 10_000, "1M": 1_000_000, "10M": 10_000_000}
+
+# Ano fora do dataset: exercita o caminho de resultado vazio
+ANO_INEXISTENTE = 1900
+
+PASTA_RESULTADOS = "resultados_benchmark"
+
+# ============================================================================
+# DATASETS SINTÉTICOS
+# ============================================================================
+
+def gerar_dataset(linhas, caminho, semente=0, bloco=1_000_000):
+    """
+    Reamostra as linhas do arquivo original (mantendo cardinalidades e a relação
+    entre as colunas) e perturba salário e experiência. Grava o CSV em blocos e o
+    cache colunar direto das categorias, sem o parse de um CSV gigante
+    """
+    from dados_salariais import construir_cache
+
+    origem = pd.read_csv(ARQUIVO_ORIGINAL)
+    aleatorio = np.random.default_rng(semente)
+    amostra = aleatorio.integers(0, len(origem), size=linhas)
+
+    colunas = {}
+    for nome in origem.columns:
+        serie = origem[nome]
+        if serie.dtype == object:
+            categorico = pd.Categorical(serie)
+            colunas[nome] = pd.Categorical.from_codes(categorico.codes[amostra], categories=categorico.categories)
+        else:
+            colunas[nome] = serie.to_numpy()[amostra]
+
+    # Ruído multiplicativo de ~10% no salário e ±1 ano de experiência
+    salario = colunas["salary_in_usd"] * aleatorio.lognormal(0, 0.1, size=linhas)
+    colunas["salary_in_usd"] = np.maximum(salario.round(), 1).astype(np.int64)
+    experiencia = colunas["years_of_experience"] + aleatorio.integers(-1, 2, size=linhas)
+    colunas["years_of_experience"] = np.clip(experiencia, 0, None).astype(np.int64)
+    df = pd.DataFrame(colunas)[origem.columns]
+
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    temporario = f"{caminho}.tmp"
+    with open(temporario, "w", encoding="utf-8", newline="") as arquivo:
+        for inicio in range(0, linhas, bloco):
+            df.iloc[inicio:inicio + bloco].to_csv(arquivo, header=inicio == 0, index=False)
+    os.replace(temporario, caminho)
+
+    construir_cache(caminho, df)
+    return caminho
+
+
+def caminho_dataset(escala, pasta=PASTA_SINTETICOS, semente=0):
+    caminho = os.path.join(pasta, f"salarios_{escala}_s{semente}.csv")
+    if not os.path.isfile(caminho):
+        print(f"🧪 Gerando dataset sintético {escala} ({ESCALAS[escala]:,} linhas)...")
+        inicio = time.perf_counter()
+        gerar_dataset(ESCALAS[escala], caminho, semente)
+        print(f"   ✅ {caminho} em {time.perf_counter() - inicio:.1f}s")
+    return caminho
+
+# ============================================================================
+# MEDIÇÃO (EXECUTADA EM UM PROCESSO POR ESCALA)
+# ============================================================================
+
+def _percentil(valores, p):
+    return float(np.percentile(valores, p)) if valores else None
+
+
+def combinacoes_filtros(dashboard, max_combinacoes=None, semente=0):
+    """
+    Produto cartesiano das opções dos dropdowns ("Todos" incluso) e uma seleção vazia.
+    A amostra (max_combinacoes) é sorteada entre as combinações com dados: no produto
+    completo a maioria das seleções é vazia
+    """
+    opcoes = [[opcao["value"] for opcao in dashboard.opcoes_filtro(id_filtro)] for id_filtro in dashboard.FILTROS_DROPDOWN]
+    combinacoes = list(itertools.product(*opcoes))
+    if max_combinacoes is not None and len(combinacoes) > max_combinacoes:
+        # Amostra fixa pela semente; a seleção inicial (tudo "Todos") sempre entra
+        com_dados = [
+            combinacao for combinacao in combinacoes[1:]
+            if dashboard.cubo_salarios.celula(dashboard.montar_filtros(*combinacao))[0] > 0
+        ]
+        sorteadas = random.Random(semente).sample(com_dados, min(max_combinacoes - 1, len(com_dados)))
+        combinacoes = [combinacoes[0]] + sorteadas
+    return combinacoes + [(ANO_INEXISTENTE, "all", "all", "all")]
+
+
+def medir_escala(caminho, repeticoes=3, max_combinacoes=None, medir_memoria=True):
+    """
+    Carrega o dashboard sobre o arquivo e mede cada gráfico em cada combinação.
+    O cache de figuras fica desligado; cada medida inclui a codificação JSON que o
+    Dash aplica à resposta (to_json_plotly), ou seja, cálculo e serialização.
+    Percentis por gráfico só sobre as seleções com dados; as vazias, à parte
+    """
+    os.environ["SALARIOS_ARQUIVO_DADOS"] = caminho
+    os.environ["SALARIOS_CACHE_FIGURAS_MB"] = "0"
+    from plotly.io.json import to_json_plotly
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import dashboard_salarios as dashboard
+        inicio = time.perf_counter()
+        dashboard.garantir_dados()
+        tempo_carga = time.perf_counter() - inicio
+
+    combinacoes = combinacoes_filtros(dashboard, max_combinacoes)
+    latencias = {id_grafico: [] for id_grafico in dashboard.GRAFICOS}
+    memorias = {id_grafico: [] for id_grafico in dashboard.GRAFICOS}
+    tamanhos = {id_grafico: [] for id_grafico in dashboard.GRAFICOS}
+    selecoes = []
+    selecoes_vazias = []
+
+    for combinacao in combinacoes:
+        filtros = dashboard.montar_filtros(*combinacao)
+        vazia = dashboard.cubo_salarios.celula(filtros)[0] == 0
+        total_selecao = 0.0
+        for id_grafico in dashboard.GRAFICOS:
+            if not vazia:
+                if medir_memoria:
+                    # Passada separada: o tracemalloc deixa o cálculo mais lento
+                    tracemalloc.start()
+                    figura = dashboard.obter_figura(id_grafico, *combinacao)
+                    memorias[id_grafico].append(tracemalloc.get_traced_memory()[1])
+                    tracemalloc.stop()
+                else:
+                    figura = dashboard.obter_figura(id_grafico, *combinacao)
+                tamanhos[id_grafico].append(len(to_json_plotly(figura)))
+
+            tempos = []
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                to_json_plotly(dashboard.obter_figura(id_grafico, *combinacao))
+                tempos.append(time.perf_counter() - inicio)
+            mediana = float(np.median(tempos))
+            if not vazia:
+                latencias[id_grafico].append(mediana)
+            total_selecao += mediana
+        (selecoes_vazias if vazia else selecoes).append(total_selecao)
+
+    def resumo_ms(valores):
+        if not valores:
+            return {"p50_ms": None, "p95_ms": None, "max_ms": None}
+        return {
+            "p50_ms": _percentil(valores, 50) * 1000,
+            "p95_ms": _percentil(valores, 95) * 1000,
+            "max_ms": max(valores) * 1000
+        }
+
+    graficos = {}
+    for id_grafico in dashboard.GRAFICOS:
+        graficos[id_grafico] = {
+            **resumo_ms(latencias[id_grafico]),
+            "pico_memoria_mb": max(memorias[id_grafico]) / 2**20 if medir_memoria and selecoes else None,
+            "resposta_p50_bytes": int(_percentil(tamanhos[id_grafico], 50)) if selecoes else None,
+            "resposta_max_bytes": max(tamanhos[id_grafico]) if selecoes else None
+        }
+
+    return {
+        "linhas": len(dashboard.df),
+        "combinacoes": len(combinacoes),
+        "combinacoes_vazias": len(selecoes_vazias),
+        "repeticoes": repeticoes,
+        "carga_s": tempo_carga,
+        # ru_maxrss: KB no Linux, bytes no macOS
+        "pico_processo_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2**20 if sys.platform == "darwin" else 2**10),
+        "selecao": resumo_ms(selecoes),
+        "selecao_vazia": resumo_ms(selecoes_vazias),
+        "graficos": graficos
+    }
+
+
+def _executar_em_processo(caminho, repeticoes, max_combinacoes, medir_memoria):
+    """
+    Cada escala roda num processo novo: o pico de memória não acumula entre escalas
+    """
+    comando = [sys.executable, os.path.abspath(__file__), "--medir", caminho, "--repeticoes", str(repeticoes)]
+    if max_combinacoes is not None:
+        comando += ["--max-combinacoes", str(max_combinacoes)]
+    if not medir_memoria:
+        comando.append("--sem-memoria")
+    saida = subprocess.run(comando, check=True, capture_output=True, text=True, cwd=PASTA_MODULO).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+# ============================================================================
+# RELATÓRIO E COMPARAÇÃO COM A LINHA DE BASE
+# ============================================================================
+
+def _ambiente():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PASTA_MODULO,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__
+    }
+
+
+def _linhas_resumo(resultado):
+    """
+    (nome, valores) de cada gráfico, da seleção com dados e da seleção vazia
+    (execuções antigas não têm esta última)
+    """
+    linhas = list(resultado["graficos"].items()) + [("seleção (5 gráficos)", resultado["selecao"])]
+    if "selecao_vazia" in resultado:
+        linhas.append(("seleção vazia", resultado["selecao_vazia"]))
+    return linhas
+
+
+def imprimir_resultado(escala, resultado):
+    print(f"\n📊 {escala}: {resultado['linhas']:,} linhas | {resultado['combinacoes']} combinações "
+          f"({resultado['combinacoes_vazias']} vazias) | carga {resultado['carga_s']:.2f}s "
+          f"| pico do processo {resultado['pico_processo_mb']:.0f} MB")
+    print(f"   {'gráfico':<22} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'pico MB':>9} {'resposta':>10}")
+    for nome, valores in _linhas_resumo(resultado):
+        pico = valores.get("pico_memoria_mb")
+        resposta = valores.get("resposta_p50_bytes")
+        tempos = [f"{valores[chave]:>9.2f}" if valores.get(chave) is not None else f"{'-':>9}"
+                  for chave in ("p50_ms", "p95_ms", "max_ms")]
+        print(f"   {nome:<22} {' '.join(tempos)} "
+              f"{(f'{pico:.1f}' if pico is not None else '-'):>9} "
+              f"{(f'{resposta / 1024:.1f} KB' if resposta is not None else '-'):>10}")
+
+
+def comparar(atual, base, tolerancia=0.2):
+    """
+    Compara o p95 de cada gráfico com a linha de base; retorna as regressões
+    acima da tolerância (fração)
+    """
+    regressoes = []
+    print(f"\n⚖️  Comparação com a linha de base ({base['ambiente'].get('commit')}, tolerância {tolerancia:.0%})")
+    for escala, resultado in atual["escalas"].items():
+        anterior = base["escalas"].get(escala)
+        if anterior is None:
+            continue
+        anteriores = dict(_linhas_resumo(anterior))
+        for nome, valores in _linhas_resumo(resultado):
+            if nome not in anteriores or valores["p95_ms"] is None or anteriores[nome]["p95_ms"] is None:
+                continue
+            razao = valores["p95_ms"] / anteriores[nome]["p95_ms"] if anteriores[nome]["p95_ms"] else float("inf")
+            marca = "🔴" if razao > 1 + tolerancia else "🟢"
+            print(f"   {marca} {escala:>4} {nome:<22} p95 {anteriores[nome]['p95_ms']:>9.2f} → "
+                  f"{valores['p95_ms']:>9.2f} ms ({razao:.2f}x)")
+            if razao > 1 + tolerancia:
+                regressoes.append((escala, nome, razao))
+    return regressoes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de update_graphs por combinação de filtros e escala")
+    parser.add_argument("--escalas", default="10k,1M,10M", help=f"escalas separadas por vírgula ({', '.join(ESCALAS)})")
+    parser.add_argument("--repeticoes", type=int, default=3, help="execuções cronometradas por gráfico e combinação")
+    parser.add_argument("--max-combinacoes", type=int, default=None,
+                        help="amostra fixa de combinações por escala (padrão: todas)")
+    parser.add_argument("--sem-memoria", action="store_true", help="pula a passada com tracemalloc")
+    parser.add_argument("--pasta", default=PASTA_SINTETICOS, help="onde ficam os datasets sintéticos")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida", default=os.path.join(PASTA_RESULTADOS, "benchmark_resultados.json"),
+                        help="arquivo JSON com os resultados")
+    parser.add_argument("--base", help="JSON de uma execução anterior para comparação")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="regressão aceita no p95 (fração)")
+    parser.add_argument("--medir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        # Processo filho: imprime apenas o JSON da escala
+        resultado = medir_escala(args.medir, args.repeticoes, args.max_combinacoes, not args.sem_memoria)
+        print(json.dumps(resultado))
+        sys.exit(0)
+
+    print("="*70)
+    print("⏱️  BENCHMARK DO DASHBOARD (update_graphs)")
+    print("="*70)
+    resultados = {"ambiente": _ambiente(), "escalas": {}}
+    for escala in args.escalas.split(","):
+        if escala not in ESCALAS:
+            parser.error(f"escala desconhecida: {escala}")
+        caminho = caminho_dataset(escala, args.pasta, args.semente)
+        resultado = _executar_em_processo(caminho, args.repeticoes, args.max_combinacoes, not args.sem_memoria)
+        resultados["escalas"][escala] = resultado
+        imprimir_resultado(escala, resultado)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.saida)), exist_ok=True)
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultados, arquivo, ensure_ascii=False, indent=2)
+    print(f"\n💾 Resultados gravados em: {args.saida}")
+
+    if args.base:
+        with open(args.base, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+        if comparar(resultados, base, args.tolerancia):
+            sys.exit(1)
@@ -0,0 +1,109 @@
+"""
+Cache LRU de figuras serializadas, limitado por memória
+A chave é a tupla de filtros + versão do dataset; o valor é o payload JSON
+das figuras, de modo que seleções repetidas (de qualquer usuário) não
+reconstroem os gráficos. Opcionalmente, uma segunda camada em disco
+(diskcache) compartilha as figuras entre processos, como os jobs em segundo
+plano e os workers do gunicorn
+"""
+
+import json
+import threading
+from collections import OrderedDict
+
+from plotly.utils import PlotlyJSONEncoder
+
+
+class CacheFiguras:
+    """
+    LRU por bytes: ao ultrapassar o limite, descarta as entradas menos usadas
+    """
+
+    def __init__(self, limite_bytes=64 * 1024 * 1024, disco=None):
+        self.limite_bytes = limite_bytes
+        # Camada compartilhada (ex.: diskcache.Cache): consultada quando a memória falha
+        self.disco = disco
+        self._itens = OrderedDict()
+        self._bytes = 0
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+
+    def obter(self, chave):
+        with self._trava:
+            payload = self._itens.get(chave)
+            if payload is not None:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return json.loads(payload)
+        payload = self.disco.get(chave) if self.disco is not None else None
+        if payload is None:
+            with self._trava:
+                self.falhas += 1
+            return None
+        # Calculada por outro processo: passa a ficar também na memória deste
+        self._inserir(chave, payload)
+        with self._trava:
+            self.acertos += 1
+        return json.loads(payload)
+
+    def contem(self, chave):
+        """
+        Se a chave está em alguma camada, sem contar acerto/falha nem ler o payload
+        """
+        with self._trava:
+            if chave in self._itens:
+                return True
+        return self.disco is not None and chave in self.disco
+
+    def guardar(self, chave, figuras):
+        # Cache desligado (limite 0, sem disco): nem codifica a figura
+        if self.limite_bytes <= 0 and self.disco is None:
+            return
+        payload = json.dumps(figuras, cls=PlotlyJSONEncoder)
+        if self.disco is not None:
+            self.disco.set(chave, payload)
+        self._inserir(chave, payload)
+
+    def _inserir(self, chave, payload):
+        tamanho = len(payload)
+        if tamanho > self.limite_bytes:
+            return
+        with self._trava:
+            anterior = self._itens.pop(chave, None)
+            if anterior is not None:
+                self._bytes -= len(anterior)
+            self._itens[chave] = payload
+            self._bytes += tamanho
+            while self._bytes > self.limite_bytes:
+                _, descartado = self._itens.popitem(last=False)
+                self._bytes -= len(descartado)
+                self.descartes += 1
+
+    def invalidar(self, afetada):
+        """
+        Remove apenas as entradas cuja chave satisfaz afetada(chave)
+        """
+        with self._trava:
+            chaves = [chave for chave in self._itens if afetada(chave)]
+            for chave in chaves:
+                self._bytes -= len(self._itens.pop(chave))
+        if self.disco is not None:
+            for chave in list(self.disco):
+                if afetada(chave):
+                    self.disco.delete(chave)
+        return len(chaves)
+
+    def estatisticas(self):
+        with self._trava:
+            consultas = self.acertos + self.falhas
+            return {
+                "entradas": len(self._itens),
+                "bytes": self._bytes,
+                "limite_bytes": self.limite_bytes,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "descartes": self.descartes,
+                "taxa_acerto": self.acertos / consultas if consultas else 0.0
+            }
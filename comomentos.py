@@ -0,0 +1,77 @@
+"""
+Momentos mescláveis para a matriz de correlação
+Cada grupo (por exemplo, uma célula do cubo) guarda contagem, médias e a
+matriz de co-momentos M = Σ (x - média)(x - média)ᵀ, calculada em duas
+passadas sobre os desvios em relação à média do próprio grupo. Grupos se
+combinam pela fórmula de Chan et al. sem revisitar as linhas, o que evita o
+cancelamento numérico das somas de produtos brutos (Σxy - n·x̄·ȳ)
+"""
+
+import numpy as np
+
+
+def momentos_por_grupo(grupos, valores, total_grupos):
+    """
+    (contagem, médias, co-momentos) de cada grupo; valores tem uma coluna por
+    variável e grupos o código (0..total_grupos-1) de cada linha
+    """
+    variaveis = valores.shape[1]
+    contagem = np.bincount(grupos, minlength=total_grupos)
+    medias = np.zeros((total_grupos, variaveis))
+    ocupados = contagem > 0
+    for j in range(variaveis):
+        somas = np.bincount(grupos, weights=valores[:, j], minlength=total_grupos)
+        medias[ocupados, j] = somas[ocupados] / contagem[ocupados]
+
+    desvios = valores - medias[grupos]
+    comomentos = np.empty((total_grupos, variaveis, variaveis))
+    for i in range(variaveis):
+        for j in range(i, variaveis):
+            produto = np.bincount(grupos, weights=desvios[:, i] * desvios[:, j], minlength=total_grupos)
+            comomentos[:, i, j] = produto
+            comomentos[:, j, i] = produto
+    return contagem, medias, comomentos
+
+
+def mesclar_momentos(primeiro, segundo):
+    """
+    Momentos da união, elemento a elemento (mesmo formato nos dois lados):
+    M = Ma + Mb + δδᵀ·na·nb/n, com δ = média_b - média_a
+    """
+    n_a, media_a, m_a = primeiro
+    n_b, media_b, m_b = segundo
+    contagem = n_a + n_b
+    peso = np.divide(n_b, contagem, out=np.zeros(contagem.shape), where=contagem > 0)
+    delta = media_b - media_a
+    medias = media_a + delta * peso[..., None]
+    comomentos = m_a + m_b + delta[..., :, None] * delta[..., None, :] * (n_a * peso)[..., None, None]
+    return contagem, medias, comomentos
+
+
+def combinar_momentos(contagem, medias, comomentos):
+    """
+    Momentos de todos os grupos juntos (primeiro eixo), de uma vez:
+    M = Σ Mᵢ + Σ nᵢ (médiaᵢ - média)(médiaᵢ - média)ᵀ
+    """
+    variaveis = medias.shape[-1]
+    total = int(contagem.sum())
+    if total == 0:
+        return 0, np.full(variaveis, np.nan), np.full((variaveis, variaveis), np.nan)
+    media = contagem @ medias / total
+    desvios = medias - media
+    return total, media, comomentos.sum(axis=0) + np.einsum("g,gi,gj->ij", contagem, desvios, desvios)
+
+
+def correlacao(comomentos):
+    """
+    Correlação de Pearson a partir dos co-momentos; variáveis constantes
+    dão NaN, como em DataFrame.corr()
+    """
+    desvio = np.sqrt(np.clip(np.diag(comomentos), 0, None))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        matriz = comomentos / np.outer(desvio, desvio)
+    constantes = ~(desvio > 0)
+    matriz[constantes, :] = np.nan
+    matriz[:, constantes] = np.nan
+    np.fill_diagonal(matriz, np.where(constantes, np.nan, 1.0))
+    return np.clip(matriz, -1.0, 1.0)
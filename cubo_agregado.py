@@ -0,0 +1,258 @@
+"""
+Cubo de agregação pré-calculado para os gráficos do dashboard
+Guarda contagem e soma do salário para cada célula
+(ano x experiência x tamanho da empresa x país de residência), incluindo
+uma posição extra "all" em cada dimensão com o total já consolidado.
+Consultas viram leituras de poucas células, independentes do número de linhas.
+Cada célula não vazia também guarda um sketch de quantis (KLL) do salário,
+que se combina com os das outras células para medianas e quartis de qualquer
+combinação de filtros, e os co-momentos das variáveis numéricas, que dão a
+matriz de correlação de qualquer seleção sem voltar às linhas
+"""
+
+import numpy as np
+import pandas as pd
+
+from comomentos import combinar_momentos, correlacao, mesclar_momentos, momentos_por_grupo
+from dados_salariais import coluna_disponivel, com_derivadas
+from indice_filtros import DIMENSOES_FILTRO
+from sketch_quantis import SketchQuantis
+
+# Variáveis da matriz de correlação do dashboard
+COLUNAS_CORRELACAO = ["work_year", "salary_in_usd", "experience_level_num", "company_size_num", "years_of_experience"]
+
+
+class CuboSalarial:
+    """
+    Arrays densos de contagem e soma; a última posição de cada eixo é o rollup "all"
+    """
+
+    def __init__(self, df, dimensoes=DIMENSOES_FILTRO, medida="salary_in_usd", k_quantis=200,
+                 covariaveis=COLUNAS_CORRELACAO):
+        self.dimensoes = [dim for dim in dimensoes if dim in df.columns]
+        self.medida = medida
+        self.k_quantis = k_quantis
+        self.covariaveis = [col for col in covariaveis if coluna_disponivel(df, col)]
+
+        codigos = []
+        self.valores = {}
+        self.posicoes = {}
+        for dim in self.dimensoes:
+            cod, valores = pd.factorize(df[dim], sort=True, use_na_sentinel=False)
+            codigos.append(cod)
+            self.valores[dim] = valores.tolist()
+            self.posicoes[dim] = {valor: i for i, valor in enumerate(self.valores[dim])}
+
+        forma = tuple(len(self.valores[dim]) for dim in self.dimensoes)
+        celula = np.ravel_multi_index(codigos, forma) if len(df) else np.empty(0, dtype=np.intp)
+        tamanho = int(np.prod(forma))
+
+        self._contagem_base = np.bincount(celula, minlength=tamanho).reshape(forma)
+        medidas = df[medida].to_numpy(dtype=float)
+        self._soma_base = np.bincount(celula, weights=medidas, minlength=tamanho).reshape(forma)
+        self._consolidar()
+
+        # Co-momentos por célula (contagem, médias, matriz); linhas com alguma
+        # variável ausente ficam de fora, como numa correlação listwise
+        self._momentos = None
+        if self.covariaveis:
+            matriz = com_derivadas(df, self.covariaveis).to_numpy(dtype=float)
+            completas = ~np.isnan(matriz).any(axis=1)
+            contagem, medias, comomentos = momentos_por_grupo(celula[completas], matriz[completas], tamanho)
+            variaveis = len(self.covariaveis)
+            self._momentos = (
+                contagem.reshape(forma),
+                medias.reshape(forma + (variaveis,)),
+                comomentos.reshape(forma + (variaveis, variaveis))
+            )
+
+        # Sketches por célula, chaveados pelos valores (e não pelas posições, que
+        # mudam ao mesclar). Nunca são alterados depois de prontos: mesclar cria novos
+        self.sketches = {}
+        if k_quantis:
+            ordem = np.argsort(celula, kind="stable")
+            celulas, inicios = np.unique(celula[ordem], return_index=True)
+            for codigo, trecho in zip(celulas, np.split(medidas[ordem], inicios[1:])):
+                posicoes = np.unravel_index(codigo, forma)
+                chave = tuple(self.valores[dim][i] for dim, i in zip(self.dimensoes, posicoes))
+                self.sketches[chave] = SketchQuantis(k_quantis, semente=int(codigo)).atualizar(trecho)
+
+    def _consolidar(self):
+        """
+        Rollups: cada eixo ganha uma posição final com a soma dos demais valores
+        """
+        contagem = self._contagem_base
+        soma = self._soma_base
+        for eixo in range(contagem.ndim):
+            contagem = np.concatenate([contagem, contagem.sum(axis=eixo, keepdims=True)], axis=eixo)
+            soma = np.concatenate([soma, soma.sum(axis=eixo, keepdims=True)], axis=eixo)
+        self.contagem = contagem
+        self.soma = soma
+
+    def mesclar(self, outro):
+        """
+        Soma as células de outro cubo (por exemplo, de outro bloco do arquivo),
+        alinhando as dimensões pela união ordenada dos valores
+        """
+        valores = {
+            dim: pd.Index(self.valores[dim]).union(pd.Index(outro.valores[dim])).tolist()
+            for dim in self.dimensoes
+        }
+        forma = tuple(len(valores[dim]) for dim in self.dimensoes)
+        contagem = np.zeros(forma, dtype=self._contagem_base.dtype)
+        soma = np.zeros(forma)
+        momentos = []
+        for cubo in (self, outro):
+            posicoes = np.ix_(*[
+                pd.Index(valores[dim]).get_indexer(cubo.valores[dim]) for dim in self.dimensoes
+            ])
+            contagem[posicoes] += cubo._contagem_base
+            soma[posicoes] += cubo._soma_base
+            if self._momentos is not None:
+                # Eixos finais (variáveis) acompanham a célula
+                alinhados = tuple(np.zeros(forma + parte.shape[len(forma):]) for parte in cubo._momentos)
+                for destino, parte in zip(alinhados, cubo._momentos):
+                    destino[posicoes] = parte
+                momentos.append(alinhados)
+
+        sketches = dict(self.sketches)
+        for chave, sketch in outro.sketches.items():
+            anterior = sketches.get(chave)
+            sketches[chave] = sketch if anterior is None else \
+                SketchQuantis.combinar([anterior, sketch], self.k_quantis, semente=0)
+
+        self.valores = valores
+        self.posicoes = {dim: {valor: i for i, valor in enumerate(valores[dim])} for dim in self.dimensoes}
+        self._contagem_base = contagem
+        self._soma_base = soma
+        self.sketches = sketches
+        self._momentos = mesclar_momentos(*momentos) if momentos else None
+        self._consolidar()
+        return self
+
+    def _posicao(self, dim, valor, agrupar=False):
+        """
+        Índice do eixo para o valor do filtro: "all" usa o rollup, ou todos os
+        valores reais quando a dimensão é agrupada; valor desconhecido -> None
+        """
+        if valor == "all":
+            return slice(0, len(self.valores[dim])) if agrupar else len(self.valores[dim])
+        posicao = self.posicoes[dim].get(valor)
+        if posicao is None:
+            return None
+        return slice(posicao, posicao + 1) if agrupar else posicao
+
+    def _posicoes(self, dim, valor, agrupar=False):
+        """
+        Array de posições do eixo: rollup (ou todos os valores, se agrupada) para
+        "all"; as posições dos valores conhecidos para um valor ou uma tupla
+        """
+        if valor == "all":
+            total = len(self.valores[dim])
+            return np.arange(total) if agrupar else np.array([total])
+        valores = valor if isinstance(valor, tuple) else (valor,)
+        return np.array(
+            [self.posicoes[dim][item] for item in valores if item in self.posicoes[dim]], dtype=np.intp
+        )
+
+    def celula(self, filtros):
+        """
+        (contagem, soma) para a combinação de filtros; tuplas de valores
+        (multi-seleção ou faixa) somam as células escolhidas
+        """
+        if any(isinstance(filtros.get(dim), tuple) for dim in self.dimensoes):
+            indice = np.ix_(*[self._posicoes(dim, filtros.get(dim, "all")) for dim in self.dimensoes])
+            return int(self.contagem[indice].sum()), float(self.soma[indice].sum())
+
+        indice = []
+        for dim in self.dimensoes:
+            posicao = self._posicao(dim, filtros.get(dim, "all"))
+            if posicao is None:
+                return 0, 0.0
+            indice.append(posicao)
+        indice = tuple(indice)
+        return int(self.contagem[indice]), float(self.soma[indice])
+
+    def media(self, filtros):
+        contagem, soma = self.celula(filtros)
+        return soma / contagem if contagem else np.nan
+
+    def sketch(self, filtros):
+        """
+        Sketch com a união das células que atendem aos filtros
+        """
+        fixos = [
+            (i, filtros[dim] if isinstance(filtros[dim], tuple) else (filtros[dim],))
+            for i, dim in enumerate(self.dimensoes)
+            if filtros.get(dim, "all") != "all"
+        ]
+        selecionados = [
+            sketch for chave, sketch in self.sketches.items()
+            if all(chave[i] in valores for i, valores in fixos)
+        ]
+        return SketchQuantis.combinar(selecionados, self.k_quantis, semente=0)
+
+    def quantis(self, filtros, qs):
+        """
+        Quantis aproximados do salário para a combinação de filtros
+        (erro de rank em sketch(filtros).erro_rank())
+        """
+        return self.sketch(filtros).quantis(qs)
+
+    def momentos(self, filtros):
+        """
+        (contagem, médias, co-momentos) das linhas que atendem aos filtros,
+        combinados a partir das células escolhidas: custo proporcional ao número
+        de células, não de linhas
+        """
+        indice = np.ix_(*[self._posicoes(dim, filtros.get(dim, "all"), agrupar=True) for dim in self.dimensoes])
+        variaveis = len(self.covariaveis)
+        contagem, medias, comomentos = (parte[indice] for parte in self._momentos)
+        return combinar_momentos(
+            contagem.reshape(-1), medias.reshape(-1, variaveis), comomentos.reshape(-1, variaveis, variaveis)
+        )
+
+    def correlacao(self, filtros):
+        """
+        Equivalente a df_filtrado[covariaveis].corr() (Pearson)
+        """
+        _, _, comomentos = self.momentos(filtros)
+        return pd.DataFrame(correlacao(comomentos), index=self.covariaveis, columns=self.covariaveis)
+
+    def agrupar(self, filtros, por):
+        """
+        Equivalente a groupby(por)[medida].agg(count, sum, mean) sobre as linhas
+        filtradas, lido diretamente das células do cubo (grupos vazios omitidos)
+        """
+        posicoes = [self._posicoes(dim, filtros.get(dim, "all"), agrupar=dim in por) for dim in self.dimensoes]
+
+        # Eixos não agrupados são somados (um único elemento, salvo multi-seleção)
+        indice = np.ix_(*posicoes)
+        somados = tuple(i for i, dim in enumerate(self.dimensoes) if dim not in por)
+        contagem = self.contagem[indice].sum(axis=somados)
+        soma = self.soma[indice].sum(axis=somados)
+
+        eixos = [dim for dim in self.dimensoes if dim in por]
+        ordem = [eixos.index(dim) for dim in por]
+        contagem = contagem.transpose(ordem)
+        soma = soma.transpose(ordem)
+
+        rotulos = []
+        for dim in por:
+            rotulos.append([self.valores[dim][i] for i in posicoes[self.dimensoes.index(dim)]])
+
+        grade = pd.MultiIndex.from_product(rotulos, names=list(por)).to_frame(index=False)
+        grade["count"] = contagem.ravel()
+        grade["sum"] = soma.ravel()
+        grade = grade[grade["count"] > 0].reset_index(drop=True)
+        grade["mean"] = grade["sum"] / grade["count"]
+        return grade
+
+    def celulas(self):
+        """
+        Células não vazias em formato colunar, sem os rollups:
+        ({dim: posição de cada célula}, contagem, soma)
+        """
+        ocupadas = np.nonzero(self._contagem_base)
+        posicoes = dict(zip(self.dimensoes, ocupadas))
+        return posicoes, self._contagem_base[ocupadas], self._soma_base[ocupadas]
@@ -0,0 +1,394 @@
+"""
+Camada de dados do Dashboard de Salários
+Modelo compacto do DataFrame (categorias, inteiros reduzidos e colunas
+derivadas por tabela de consulta) e cache colunar em disco (arrays NumPy
+memory-mapped) para evitar o parse completo do CSV a cada inicialização
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from indice_filtros import DIMENSOES_FILTRO, ordenar_ids, tipo_id
+from tabela_registros import COLUNAS_REGISTROS, permutacao
+
+# ============================================================================
+# MAPEAMENTOS DAS COLUNAS CATEGÓRICAS
+# ============================================================================
+
+experiencia_map = {"EN": 1, "MI": 2, "SE": 3, "EX": 4}
+tamanho_map = {"S": 1, "M": 2, "L": 3}
+
+experience_labels = {"EN": "Entry", "MI": "Mid", "SE": "Senior", "EX": "Executive"}
+size_labels = {"S": "Small", "M": "Medium", "L": "Large"}
+
+# Colunas derivadas não ficam no DataFrame: cada uma é uma tabela de consulta sobre
+# as categorias da coluna de origem, expandida pelos códigos só quando pedida
+COLUNAS_DERIVADAS = {
+    "experience_level_num": ("experience_level", experiencia_map),
+    "company_size_num": ("company_size", tamanho_map),
+    "experience_label": ("experience_level", experience_labels),
+    "size_label": ("company_size", size_labels)
+}
+
+# Colunas de texto do dataset, lidas do CSV já como categorias (códigos + dicionário)
+COLUNAS_TEXTO = [
+    "country", "region", "experience_level", "job_title",
+    "employee_residence", "company_location", "company_size"
+]
+
+# ============================================================================
+# CACHE COLUNAR
+# ============================================================================
+
+VERSAO_CACHE = 5
+PASTA_CACHE = ".cache_colunar"
+ARQUIVO_MANIFESTO = "manifesto.json"
+
+
+def caminho_cache(caminho_csv):
+    """
+    Pasta do cache colunar, criada ao lado do arquivo de origem
+    """
+    pasta, nome = os.path.split(os.path.abspath(caminho_csv))
+    return os.path.join(pasta, PASTA_CACHE, os.path.splitext(nome)[0])
+
+
+def _hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _assinatura_origem(caminho_csv):
+    info = os.stat(caminho_csv)
+    return {"tamanho": info.st_size, "mtime_ns": info.st_mtime_ns}
+
+
+def construir_cache(caminho_csv, df=None, tempo_parse=None):
+    """
+    Grava o dataset em formato colunar: uma coluna por arquivo .npy e
+    colunas de texto codificadas como categorias (códigos inteiros + dicionário)
+    e inteiros no menor tipo. Ordenações e códigos do índice de filtros e as
+    permutações de ordenação da tabela de registros também vão para o cache,
+    para que processos diferentes mapeiem os mesmos arquivos
+    """
+    if df is None:
+        inicio = time.perf_counter()
+        df = ler_csv(caminho_csv)
+        tempo_parse = time.perf_counter() - inicio
+    # Cópia rasa: a compactação não altera o df de quem chamou
+    df = preparar_colunas(df.copy(deep=False), verbose=False)
+
+    destino = caminho_cache(caminho_csv)
+    temporario = f"{destino}.tmp-{os.getpid()}"
+    shutil.rmtree(temporario, ignore_errors=True)
+    os.makedirs(temporario)
+
+    colunas = []
+    for nome in df.columns:
+        serie = df[nome]
+        if serie.dtype == object or isinstance(serie.dtype, pd.CategoricalDtype):
+            categorico = pd.Categorical(serie)
+            np.save(os.path.join(temporario, f"{nome}.npy"), categorico.codes)
+            colunas.append({
+                "nome": nome,
+                "tipo": "categoria",
+                "categorias": categorico.categories.tolist()
+            })
+        else:
+            np.save(os.path.join(temporario, f"{nome}.npy"), serie.to_numpy())
+            colunas.append({"nome": nome, "tipo": str(serie.dtype)})
+
+    indice = {}
+    for dim in DIMENSOES_FILTRO:
+        if dim in df.columns:
+            valores, ordem, limites, codigos = ordenar_ids(df[dim], tipo_id(len(df)))
+            np.save(os.path.join(temporario, f"indice__{dim}.npy"), ordem)
+            np.save(os.path.join(temporario, f"codigos__{dim}.npy"), codigos)
+            indice[dim] = {"valores": valores, "limites": limites.tolist()}
+
+    # As dimensões de filtro já têm a permutação: a ordem do índice é a mesma
+    ordens = [coluna for coluna in COLUNAS_REGISTROS if coluna in df.columns and coluna not in indice]
+    for coluna in ordens:
+        np.save(os.path.join(temporario, f"ordem__{coluna}.npy"), permutacao(df[coluna], tipo_id(len(df))))
+
+    manifesto = {
+        "versao": VERSAO_CACHE,
+        "origem": _assinatura_origem(caminho_csv),
+        "sha256": _hash_arquivo(caminho_csv),
+        "linhas": len(df),
+        "tempo_parse_s": tempo_parse,
+        "colunas": colunas,
+        "indice": indice,
+        "ordens": ordens
+    }
+    with open(os.path.join(temporario, ARQUIVO_MANIFESTO), "w", encoding="utf-8") as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False)
+
+    shutil.rmtree(destino, ignore_errors=True)
+    os.replace(temporario, destino)
+    return manifesto
+
+
+def _ler_manifesto(pasta):
+    try:
+        with open(os.path.join(pasta, ARQUIVO_MANIFESTO), encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+
+
+def cache_valido(caminho_csv):
+    """
+    Retorna o manifesto se o cache corresponde ao arquivo de origem.
+    Tamanho e mtime iguais bastam; se apenas o mtime mudou, o hash decide
+    """
+    pasta = caminho_cache(caminho_csv)
+    manifesto = _ler_manifesto(pasta)
+    if manifesto is None or manifesto.get("versao") != VERSAO_CACHE:
+        return None
+
+    origem = _assinatura_origem(caminho_csv)
+    if origem["tamanho"] != manifesto["origem"]["tamanho"]:
+        return None
+    if origem["mtime_ns"] != manifesto["origem"]["mtime_ns"]:
+        if _hash_arquivo(caminho_csv) != manifesto["sha256"]:
+            return None
+        # Conteúdo idêntico (arquivo copiado ou "tocado"): atualiza a assinatura
+        manifesto["origem"] = origem
+        try:
+            with open(os.path.join(pasta, ARQUIVO_MANIFESTO), "w", encoding="utf-8") as arquivo:
+                json.dump(manifesto, arquivo, ensure_ascii=False)
+        except OSError:
+            pass
+    return manifesto
+
+
+def carregar_cache(caminho_csv, manifesto):
+    """
+    Carrega as colunas via memory-map, sem copiar os arrays para a memória
+    """
+    pasta = caminho_cache(caminho_csv)
+    colunas = {}
+    for coluna in manifesto["colunas"]:
+        dados = np.load(os.path.join(pasta, f"{coluna['nome']}.npy"), mmap_mode="r")
+        if coluna["tipo"] == "categoria":
+            dados = pd.Categorical.from_codes(dados, categories=coluna["categorias"], validate=False)
+        colunas[coluna["nome"]] = dados
+    return pd.DataFrame(colunas, copy=False)
+
+
+def ordenacoes_do_cache(caminho_csv, linhas):
+    """
+    Ordenações e códigos do índice de filtros gravados no cache (memory-mapped), no formato
+    aceito por IndiceFiltros; None se o cache não corresponde ao arquivo de origem
+    (mesma verificação de cache_valido) ou às linhas carregadas: o índice é então
+    calculado sobre os dados
+    """
+    pasta = caminho_cache(caminho_csv)
+    manifesto = cache_valido(caminho_csv)
+    if manifesto is None or manifesto.get("linhas") != linhas or "indice" not in manifesto:
+        return None
+    return {
+        dim: (
+            info["valores"],
+            np.load(os.path.join(pasta, f"indice__{dim}.npy"), mmap_mode="r"),
+            np.asarray(info["limites"]),
+            np.load(os.path.join(pasta, f"codigos__{dim}.npy"), mmap_mode="r")
+        )
+        for dim, info in manifesto["indice"].items()
+    }
+
+
+def permutacoes_do_cache(caminho_csv, linhas):
+    """
+    Permutações de ordenação da tabela de registros gravadas no cache (memory-mapped):
+    as das dimensões de filtro são as ordenações do índice. {} se o cache não
+    corresponde ao arquivo de origem ou às linhas carregadas
+    """
+    pasta = caminho_cache(caminho_csv)
+    manifesto = cache_valido(caminho_csv)
+    if manifesto is None or manifesto.get("linhas") != linhas:
+        return {}
+    arquivos = {dim: f"indice__{dim}.npy" for dim in manifesto.get("indice", {})}
+    arquivos.update({coluna: f"ordem__{coluna}.npy" for coluna in manifesto.get("ordens", [])})
+    return {coluna: np.load(os.path.join(pasta, arquivo), mmap_mode="r") for coluna, arquivo in arquivos.items()}
+
+
+# ============================================================================
+# MODELO COMPACTO E COLUNAS DERIVADAS
+# ============================================================================
+
+def _mapear_por_categoria(serie, mapa, numerico=True):
+    """
+    Aplica o mapa sobre as categorias (e não linha a linha) e expande pelos códigos
+    """
+    categorico = serie.astype("category").cat
+    valores = categorico.categories.map(mapa).to_numpy(dtype=float if numerico else object)
+    # Código -1 (valor ausente) cai na última posição, que é NaN
+    resultado = np.append(valores, np.nan)[categorico.codes]
+    if numerico and not np.isnan(resultado).any():
+        resultado = resultado.astype(_tipo_inteiro(resultado))
+    return resultado
+
+
+def _tipo_inteiro(valores):
+    """
+    Menor inteiro com sinal que comporta os valores
+    """
+    if len(valores) == 0:
+        return np.int8
+    minimo, maximo = valores.min(), valores.max()
+    for tipo in (np.int8, np.int16, np.int32):
+        if np.iinfo(tipo).min <= minimo and maximo <= np.iinfo(tipo).max:
+            return tipo
+    return np.int64
+
+
+def coluna_disponivel(df, nome):
+    if nome in df.columns:
+        return True
+    return nome in COLUNAS_DERIVADAS and COLUNAS_DERIVADAS[nome][0] in df.columns
+
+
+def colunas_de_origem(nomes):
+    """
+    Colunas a ler do DataFrame para montar `nomes` (derivadas trocadas pela origem)
+    """
+    return list(dict.fromkeys(COLUNAS_DERIVADAS[nome][0] if nome in COLUNAS_DERIVADAS else nome for nome in nomes))
+
+
+def coluna_derivada(df, nome):
+    """
+    Valores de uma coluna derivada para as linhas de df, pela tabela de consulta
+    """
+    origem, mapa = COLUNAS_DERIVADAS[nome]
+    numerico = all(isinstance(valor, (int, float)) for valor in mapa.values())
+    return _mapear_por_categoria(df[origem], mapa, numerico=numerico)
+
+
+def com_derivadas(df, nomes):
+    """
+    DataFrame só com as colunas pedidas; as derivadas são calculadas na hora
+    """
+    return pd.DataFrame(
+        {nome: df[nome] if nome in df.columns else coluna_derivada(df, nome) for nome in nomes},
+        copy=False
+    )
+
+
+def preparar_colunas(df, verbose=True):
+    """
+    Modelo compacto: texto como categorias, inteiros no menor tipo que comporta os
+    valores. Colunas derivadas (experience_level_num, rótulos...) não são
+    materializadas: ver coluna_derivada. Colunas já compactas (cache colunar) não são copiadas
+    """
+    for nome in df.columns:
+        serie = df[nome]
+        if serie.dtype == object:
+            df[nome] = serie.astype("category")
+        elif serie.dtype == np.int64:
+            tipo = _tipo_inteiro(serie.to_numpy())
+            if tipo != np.int64:
+                df[nome] = serie.astype(tipo)
+    if verbose:
+        imprimir_relatorio_memoria(df)
+    return df
+
+
+def relatorio_memoria(df):
+    """
+    Memória por coluna, como df.memory_usage(deep=True), com o tipo e o tamanho do dicionário
+    """
+    memoria = df.memory_usage(deep=True, index=False)
+    relatorio = pd.DataFrame({
+        "tipo": [str(df[nome].dtype) if not isinstance(df[nome].dtype, pd.CategoricalDtype)
+                 else f"category[{df[nome].cat.codes.dtype}]" for nome in df.columns],
+        "valores_distintos": [len(df[nome].cat.categories) if isinstance(df[nome].dtype, pd.CategoricalDtype)
+                              else None for nome in df.columns],
+        "bytes": memoria.to_numpy()
+    }, index=df.columns)
+    relatorio["bytes_por_registro"] = relatorio["bytes"] / max(len(df), 1)
+    relatorio["percentual"] = relatorio["bytes"] / max(relatorio["bytes"].sum(), 1) * 100
+    return relatorio
+
+
+def imprimir_relatorio_memoria(df):
+    relatorio = relatorio_memoria(df)
+    total = relatorio["bytes"].sum()
+    print("💾 Memória por coluna (memory_usage(deep=True)):")
+    for nome, linha in relatorio.iterrows():
+        distintos = f" ({int(linha['valores_distintos'])} valores)" if pd.notna(linha["valores_distintos"]) else ""
+        print(f"   {nome:<22} {linha['tipo'] + distintos:<30} {linha['bytes'] / 1024:>10,.1f} KB "
+              f"{linha['bytes_por_registro']:>5.1f} B/registro {linha['percentual']:>5.1f}%")
+    print(f"   {'TOTAL':<22} {'':<30} {total / 1024:>10,.1f} KB {total / max(len(df), 1):>5.1f} B/registro")
+    print(f"   Derivadas por tabela de consulta: {', '.join(COLUNAS_DERIVADAS)}")
+    return relatorio
+
+
+# ============================================================================
+# CARREGAMENTO
+# ============================================================================
+
+def ler_csv(caminho_csv, **opcoes):
+    """
+    read_csv com as colunas de texto já como categorias: as strings repetidas
+    nunca chegam a existir uma por linha
+    """
+    return pd.read_csv(caminho_csv, dtype={coluna: "category" for coluna in COLUNAS_TEXTO}, **opcoes)
+
+
+def carregar_dataset(caminho_csv, usar_cache=True):
+    """
+    Carrega o dataset a partir do cache colunar quando válido; caso contrário
+    faz o parse do CSV e (re)constrói o cache
+    """
+    if usar_cache:
+        manifesto = cache_valido(caminho_csv)
+        if manifesto is not None:
+            inicio = time.perf_counter()
+            df = carregar_cache(caminho_csv, manifesto)
+            tempo_cache = time.perf_counter() - inicio
+            tempo_parse = manifesto.get("tempo_parse_s") or 0
+            print(f"⚡ Cache colunar carregado em {tempo_cache * 1000:.1f} ms "
+                  f"(parse do CSV: {tempo_parse * 1000:.1f} ms)")
+            return df
+
+    inicio = time.perf_counter()
+    df = ler_csv(caminho_csv)
+    tempo_parse = time.perf_counter() - inicio
+    print(f"📄 CSV lido em {tempo_parse * 1000:.1f} ms")
+
+    if usar_cache:
+        try:
+            construir_cache(caminho_csv, df, tempo_parse)
+            print(f"💾 Cache colunar gravado em: {caminho_cache(caminho_csv)}")
+        except OSError as e:
+            print(f"⚠️  Não foi possível gravar o cache colunar: {e}")
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Constrói o cache colunar do dataset salarial")
+    parser.add_argument(
+        "csv", nargs="?",
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "Data", "salario_profissionais_dados.csv")
+    )
+    args = parser.parse_args()
+
+    manifesto = construir_cache(args.csv)
+    print(f"💾 Cache gravado em: {caminho_cache(args.csv)}")
+    print(f"📊 {manifesto['linhas']:,} registros | parse do CSV: {manifesto['tempo_parse_s'] * 1000:.1f} ms")
+
+    inicio = time.perf_counter()
+    carregar_cache(args.csv, manifesto)
+    print(f"⚡ Carga do cache: {(time.perf_counter() - inicio) * 1000:.1f} ms")
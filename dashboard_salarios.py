@@ -4,160 +4,409 @@ Desenvolvido com Plotly Dash
 Versão com filtro por país e análise corrigida de Top Cargos
 """
 
+import time
+_inicio_importacoes = time.perf_counter()
+
 import dash
-from dash import dcc, html, Input, Output
+from dash import dcc, html, dash_table, Input, Output, State, Patch, ctx, ClientsideFunction
+from dash.exceptions import PreventUpdate
+from flask import jsonify, request
 import plotly.express as px
 import plotly.graph_objects as go
-import pandas as pd
 import numpy as np
 import dash_bootstrap_components as dbc
 import os
-import glob
+import sys
+import argparse
+import atexit
+import threading
+from contextlib import contextmanager
+
+from dados_salariais import (
+    carregar_dataset, preparar_colunas, ordenacoes_do_cache, permutacoes_do_cache, experience_labels, size_labels,
+    com_derivadas, colunas_de_origem
+)
+from indice_filtros import IndiceFiltros, DIMENSOES_FILTRO, normalizar_filtro
+from cubo_agregado import CuboSalarial
+from ranking_cargos import RankingCargos
+from cache_figuras import CacheFiguras
+from ingestao_streaming import agregar_streaming, calcular_cagr, ResumoSalarial
+from tabela_incremental import TabelaIncremental
+from observador_dados import ObservadorArquivo
+from descoberta_dados import encontrar_arquivo_csv
+from metricas import Metricas
+from motor_agregacao import agregar
+from tabela_registros import PaginadorRegistros, chave_selecao
+
+# ============================================================================
+# PERFIL DE INICIALIZAÇÃO
+# ============================================================================
+
+# Segundos gastos em cada etapa da inicialização (importações, descoberta, leitura...)
+perfil_inicializacao = {"importacoes": time.perf_counter() - _inicio_importacoes}
+
+# Métricas expostas em /metrics e no cabeçalho Server-Timing
+metricas = Metricas()
+metricas.descrever("salarios_carga_segundos", "gauge", "Tempo de cada etapa da inicialização")
+metricas.descrever("salarios_etapa_segundos", "histogram", "Tempo de cada etapa do cálculo das figuras, por gráfico")
+metricas.descrever("salarios_grafico_segundos", "histogram", "Tempo para obter cada figura, por gráfico e resultado do cache")
+metricas.descrever("salarios_cache_figuras_acertos_total", "counter", "Consultas atendidas pelo cache de figuras")
+metricas.descrever("salarios_cache_figuras_falhas_total", "counter", "Consultas que precisaram calcular a figura")
+metricas.descrever("salarios_cache_figuras_descartes_total", "counter", "Figuras descartadas pelo limite de memória")
+metricas.descrever("salarios_cache_figuras_bytes", "gauge", "Bytes ocupados pelo cache de figuras")
+metricas.descrever("salarios_jobs_segundo_plano_total", "counter", "Figuras enviadas a jobs em segundo plano, por gráfico")
+metricas.definir("salarios_carga_segundos", perfil_inicializacao["importacoes"], etapa="importacoes")
+
+@contextmanager
+def medir_etapa(etapa):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        perfil_inicializacao[etapa] = perfil_inicializacao.get(etapa, 0) + time.perf_counter() - inicio
+        metricas.definir("salarios_carga_segundos", perfil_inicializacao[etapa], etapa=etapa)
+
+def relatorio_inicializacao(limite_s=None):
+    """
+    Imprime o tempo de cada etapa; retorna False se o total passar do limite
+    """
+    total = sum(perfil_inicializacao.values())
+    print("="*70)
+    print("⏱️  PERFIL DE INICIALIZAÇÃO")
+    print("="*70)
+    for etapa, segundos in perfil_inicializacao.items():
+        print(f"   {etapa:<14} {segundos * 1000:10.1f} ms")
+    print(f"   {'total':<14} {total * 1000:10.1f} ms")
+    print("="*70 + "\n")
+    if limite_s is not None and total > limite_s:
+        print(f"❌ Inicialização acima do limite de {limite_s:g}s")
+        return False
+    return True
+
+# ============================================================================
+# CONFIGURAÇÃO (VARIÁVEIS DE AMBIENTE)
+# ============================================================================
+
+# Modo streaming: o arquivo é lido em blocos e só agregados mescláveis ficam em memória
+MODO_STREAMING = os.environ.get("SALARIOS_MODO_STREAMING", "0") == "1"
+
+# Atualização ao vivo: novos registros (arquivo ou API) entram sem reiniciar o app
+ATUALIZACAO_AO_VIVO = os.environ.get("SALARIOS_ATUALIZACAO_AO_VIVO", "0") == "1"
+INTERVALO_ATUALIZACAO_S = float(os.environ.get("SALARIOS_INTERVALO_ATUALIZACAO", "5"))
+
+# Carga dos dados: "segundo_plano" (padrão), "sob_demanda" (no primeiro acesso) ou "imediata"
+CARGA_DADOS = os.environ.get("SALARIOS_CARGA_DADOS", "segundo_plano")
+
+# Quantis das fatias filtradas: "auto" (exatos até o limite de registros, sketch acima),
+# "exato" (sempre sobre as linhas) ou "sketch" (sempre pelos sketches das células do cubo)
+MODO_QUANTIS = os.environ.get("SALARIOS_MODO_QUANTIS", "auto")
+LIMITE_QUANTIS_EXATOS = int(os.environ.get("SALARIOS_QUANTIS_EXATOS_ATE", "100000"))
+
+# Ranking de cargos: tamanho da página (k) e mínimo de registros por cargo
+TOP_CARGOS_K = int(os.environ.get("SALARIOS_TOP_CARGOS_K", "10"))
+TOP_CARGOS_MINIMO = int(os.environ.get("SALARIOS_TOP_CARGOS_MINIMO", "3"))
+
+# Segundo plano: figuras pesadas (acima do limite de registros e fora do cache) são calculadas
+# em jobs de um gerenciador local (diskcache), cancelados quando a seleção muda
+SEGUNDO_PLANO = os.environ.get("SALARIOS_SEGUNDO_PLANO", "0") == "1"
+LIMITE_SEGUNDO_PLANO = int(os.environ.get("SALARIOS_SEGUNDO_PLANO_ACIMA", "200000"))
+PASTA_SEGUNDO_PLANO = os.environ.get(
+    "SALARIOS_SEGUNDO_PLANO_PASTA", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache_segundo_plano")
+)
+
+# Modo cliente: os gráficos temporal, de tamanho de empresa e de top cargos são filtrados e
+# reagregados no navegador (assets/filtros_cliente.js), sobre contagens e somas enviadas uma vez por sessão
+MODO_CLIENTE = os.environ.get("SALARIOS_MODO_CLIENTE", "0") == "1"
+# Entradas (célula x cargo) do ranking enviadas ao navegador; acima disso o payload não leva
+# o ranking e o gráfico de top cargos (com a paginação) continua no servidor
+LIMITE_RANKING_CLIENTE = int(os.environ.get("SALARIOS_CLIENTE_MAX_RANKING", "20000"))
+
+# Tabela de registros da seleção: linhas por página (paginação, ordenação e filtros no servidor)
+REGISTROS_POR_PAGINA = int(os.environ.get("SALARIOS_REGISTROS_POR_PAGINA", "20"))
+# Ids das seleções (e seleções ordenadas) da tabela guardados entre páginas
+CACHE_REGISTROS_BYTES = int(os.environ.get("SALARIOS_CACHE_REGISTROS_MB", "64")) * 1024 * 1024
+
+# Análises de diagnóstico no console (ex.: top cargos sem filtros), desligadas por padrão
+DIAGNOSTICOS = os.environ.get("SALARIOS_DIAGNOSTICOS", "0") == "1"
+
+# Relatório de tempos da inicialização e limite (segundos) para acusar regressão
+PERFIL_INICIALIZACAO = os.environ.get("SALARIOS_PERFIL_INICIALIZACAO", "0") == "1"
+LIMITE_INICIALIZACAO_S = float(os.environ["SALARIOS_LIMITE_INICIALIZACAO_S"]) \
+    if os.environ.get("SALARIOS_LIMITE_INICIALIZACAO_S") else None
+
+AQUECER_CACHE = os.environ.get("SALARIOS_AQUECER_CACHE", "0") == "1"
 
 # ============================================================================
 # CARREGAMENTO E PREPARAÇÃO DOS DADOS (OTIMIZADO)
 # ============================================================================
 
-print("\n" + "="*70)
-print("🔍 LOCALIZANDO ARQUIVO DE DADOS")
-print("="*70)
+# Estado carregado por carregar_dados (vazio até a carga terminar)
+caminho_arquivo = None
+df = None
+resumo_streaming = None
+indice_filtros = None
+paginador_registros = None
+cubo_salarios = None
+ranking_cargos = None
+tamanho_carregado = None
+versao_dados = None
+histograma_completo = faixa_histograma = None
+# Cargos e países presentes, mantidos a cada lote ingerido (KPIs sem nunique sobre o df)
+cargos_distintos = paises_distintos = set()
+observador_dados = None
+
+# Cache LRU das figuras, chaveado pelos filtros + versão do dataset
+cache_figuras = CacheFiguras(limite_bytes=int(os.environ.get("SALARIOS_CACHE_FIGURAS_MB", "64")) * 1024 * 1024)
 
-def encontrar_arquivo_csv():
+def carregar_dados():
     """
-    Procura o arquivo CSV em múltiplos locais e nomes possíveis
+    Localiza e lê o dataset e monta as estruturas consultadas pelos gráficos
+    (índice, cubo, bins do histograma). Chamada uma única vez, por garantir_dados
     """
-    nomes_possiveis = [
-        "salario_profissionais_dados.csv",
-        "salaries.csv",
-        "ds_salaries.csv",
-        "data_science_salaries.csv"
-    ]
+    global caminho_arquivo, df, resumo_streaming, indice_filtros, paginador_registros, cubo_salarios, ranking_cargos
+    global tamanho_carregado, versao_dados, histograma_completo, faixa_histograma, observador_dados
+    global cargos_distintos, paises_distintos
     
-    pastas_possiveis = [
-        "",
-        "Data",
-        "data",
-        "datasets",
-        "..",
-        "../.."
-    ]
+    print("\n" + "="*70)
+    print("🔍 LOCALIZANDO ARQUIVO DE DADOS")
+    print("="*70)
     
-    for pasta in pastas_possiveis:
-        for nome in nomes_possiveis:
-            if pasta:
-                caminho = os.path.join(pasta, nome)
+    # Carregar o dataset
+    try:
+        with medir_etapa("descoberta"):
+            caminho_arquivo = encontrar_arquivo_csv()
+        with medir_etapa("leitura"):
+            if MODO_STREAMING:
+                resumo_streaming = agregar_streaming(caminho_arquivo)
+                print("\n✅ Dataset agregado em streaming!")
+                print(f"📊 Total de registros: {resumo_streaming.cubo.celula({})[0]:,}")
             else:
-                caminho = nome
+                df = carregar_dataset(caminho_arquivo)
+                print("\n✅ Dataset carregado com sucesso!")
+                print(f"📊 Total de registros: {len(df):,}")
+                print(f"📋 Colunas: {', '.join(df.columns.tolist())}")
+        print("="*70 + "\n")
+    except Exception as e:
+        print(f"\n❌ ERRO: {e}")
+        print("\n🛑 O dashboard não pode ser iniciado.")
+        raise
+    
+    with medir_etapa("precalculo"):
+        if MODO_STREAMING:
+            # Sem linhas em memória: não há índice, apenas os cubos montados bloco a bloco
+            cubo_salarios = resumo_streaming.cubo
+            ranking_cargos = resumo_streaming.ranking
+        else:
+            # Modelo compacto (categorias e inteiros reduzidos), com o uso de memória por coluna
+            preparar_colunas(df)
             
-            if os.path.exists(caminho):
-                caminho_completo = os.path.abspath(caminho)
-                print(f"✅ Arquivo encontrado: {caminho}")
-                print(f"📁 Caminho completo: {caminho_completo}")
-                return caminho
-    
-    print("\n🔎 Procurando recursivamente...")
-    for nome in nomes_possiveis:
-        arquivos_encontrados = glob.glob(f"**/{nome}", recursive=True)
-        if arquivos_encontrados:
-            caminho = arquivos_encontrados[0]
-            caminho_completo = os.path.abspath(caminho)
-            print(f"✅ Arquivo encontrado: {caminho}")
-            print(f"📁 Caminho completo: {caminho_completo}")
-            return caminho
-    
-    print("\n❌ ARQUIVO NÃO ENCONTRADO!")
-    print(f"📁 Diretório atual: {os.getcwd()}")
-    print("\n📄 Arquivos CSV disponíveis:")
-    
-    todos_csv = glob.glob("**/*.csv", recursive=True)
-    if todos_csv:
-        for i, arquivo in enumerate(todos_csv[:10], 1):
-            print(f"   {i}. {arquivo}")
-    else:
-        print("   (Nenhum arquivo CSV encontrado)")
+            print("✅ Preparação dos dados concluída\n")
+            
+            # Índice invertido das dimensões de filtro: ordenações lidas do cache colunar
+            # (compartilhadas entre processos) ou construídas uma única vez
+            indice_filtros = IndiceFiltros(df, ordenacoes=ordenacoes_do_cache(caminho_arquivo, len(df)))
+            
+            # Tabela de registros: permutações de ordenação por coluna, também do cache colunar
+            paginador_registros = PaginadorRegistros(
+                df, indice_filtros, permutacoes=permutacoes_do_cache(caminho_arquivo, len(df)),
+                limite_cache_bytes=CACHE_REGISTROS_BYTES
+            )
+            
+            # Cubo de contagens e somas (ano x experiência x tamanho x país) com rollups "all"
+            cubo_salarios = CuboSalarial(df)
+            
+            # Contagem e soma por cargo em cada célula, para o top-k sem groupby
+            ranking_cargos = RankingCargos(df)
+            
+            # Bins da seleção "Todos", calculados uma única vez
+            histograma_completo = calcular_bins_histograma(df["salary_in_usd"].to_numpy())
+            faixa_histograma = faixa_salarial(df["salary_in_usd"].to_numpy())
+            
+            cargos_distintos = valores_distintos(df, "job_title")
+            paises_distintos = valores_distintos(df, "employee_residence")
+        
+        tamanho_carregado = os.path.getsize(caminho_arquivo)
+        versao_dados = f"{tamanho_carregado}-{os.path.getmtime(caminho_arquivo)}"
+        obter_kpis()
     
-    raise FileNotFoundError(
-        f"\n❌ Arquivo de dados não encontrado!\n"
-        f"📁 Procurado em: {os.getcwd()}\n"
-        "💡 Verifique se o arquivo existe na pasta 'Data'"
-    )
+    if ATUALIZACAO_AO_VIVO:
+        observador_dados = ObservadorArquivo(
+            caminho_arquivo, ingerir_registros,
+            deslocamento=tamanho_carregado, intervalo=INTERVALO_ATUALIZACAO_S
+        ).iniciar()
+        # Encerra o observador antes do interpretador (não corta uma ingestão no meio)
+        atexit.register(observador_dados.parar)
+        print(f"👀 Observando novos registros em {caminho_arquivo} (a cada {INTERVALO_ATUALIZACAO_S:g}s)")
+    
+    if DIAGNOSTICOS:
+        imprimir_diagnosticos()
 
-# Carregar o dataset
-try:
-    caminho_arquivo = encontrar_arquivo_csv()
-    df = pd.read_csv(caminho_arquivo)
-    print(f"\n✅ Dataset carregado com sucesso!")
-    print(f"📊 Total de registros: {len(df):,}")
-    print(f"📋 Colunas: {', '.join(df.columns.tolist())}")
+def imprimir_diagnosticos():
+    """
+    Análises apenas para o console (SALARIOS_DIAGNOSTICOS=1)
+    """
+    if df is None:
+        return
+    
+    # Verificar análise de Top Cargos (SEM FILTROS)
+    print("="*70)
+    print("📊 ANÁLISE DE TOP CARGOS (DATASET COMPLETO - SEM FILTROS)")
+    print("="*70)
+    top_cargos_analise = agregar(df, ["job_title"], estatisticas=("mean", "median", "count"))
+    top_cargos_analise = top_cargos_analise.set_index("job_title").round(2)
+    top_cargos_analise.columns = ["Salário Médio", "Salário Mediano", "Qtd Registros"]
+    top_cargos_analise = top_cargos_analise.sort_values("Salário Médio", ascending=False).head(10)
+    print(top_cargos_analise)
     print("="*70 + "\n")
-except Exception as e:
-    print(f"\n❌ ERRO: {e}")
-    print("\n🛑 O dashboard não pode ser iniciado.")
-    raise
-
-# Criando colunas numéricas para análises
-if "experience_level_num" not in df.columns:
-    experiencia_map = {"EN": 1, "MI": 2, "SE": 3, "EX": 4}
-    df["experience_level_num"] = df["experience_level"].map(experiencia_map)
-    print("✅ Coluna 'experience_level_num' criada")
-
-if "company_size_num" not in df.columns:
-    tamanho_map = {"S": 1, "M": 2, "L": 3}
-    df["company_size_num"] = df["company_size"].map(tamanho_map)
-    print("✅ Coluna 'company_size_num' criada")
-
-# Mapeamento de labels legíveis
-experience_labels = {"EN": "Entry", "MI": "Mid", "SE": "Senior", "EX": "Executive"}
-size_labels = {"S": "Small", "M": "Medium", "L": "Large"}
-
-df["experience_label"] = df["experience_level"].map(experience_labels)
-df["size_label"] = df["company_size"].map(size_labels)
-
-print("✅ Preparação dos dados concluída\n")
-
-# Verificar análise de Top Cargos (SEM FILTROS)
-print("="*70)
-print("📊 ANÁLISE DE TOP CARGOS (DATASET COMPLETO - SEM FILTROS)")
-print("="*70)
-top_cargos_analise = df.groupby("job_title").agg({
-    "salary_in_usd": ["mean", "median", "count"]
-}).round(2)
-top_cargos_analise.columns = ["Salário Médio", "Salário Mediano", "Qtd Registros"]
-top_cargos_analise = top_cargos_analise.sort_values("Salário Médio", ascending=False).head(10)
-print(top_cargos_analise)
-print("="*70 + "\n")
+    
+    # Memória dos sketches de quantis por célula do cubo (itens float64)
+    if cubo_salarios is not None and cubo_salarios.sketches:
+        itens = sum(sketch.tamanho() for sketch in cubo_salarios.sketches.values())
+        print(f"🧮 Sketches de quantis: {len(cubo_salarios.sketches):,} células, {itens:,} itens "
+              f"({itens * 8 / 1024:,.0f} KB)\n")
+
+# Sinal de prontidão: definido quando a carga e o aquecimento do cache terminam
+# (consultado por /pronto e pelos callbacks); _dados_carregados marca só a carga
+dados_prontos = threading.Event()
+_dados_carregados = threading.Event()
+erro_carga = None
+# Reentrante: o aquecimento calcula figuras pelo mesmo caminho das requisições
+_trava_carga = threading.RLock()
+_trava_inicio_carga = threading.Lock()
+_thread_carga = None
+
+def garantir_dados():
+    """
+    Carrega os dados (e aquece o cache) na primeira chamada; chamadas concorrentes
+    esperam a mesma carga, e o app só fica pronto depois do aquecimento
+    """
+    if dados_prontos.is_set():
+        return
+    with _trava_carga:
+        if not _dados_carregados.is_set():
+            carregar_dados()
+            _dados_carregados.set()
+            try:
+                _apos_carga()
+            finally:
+                dados_prontos.set()
+
+def _apos_carga():
+    if AQUECER_CACHE:
+        with medir_etapa("aquecimento"):
+            aquecer_cache_figuras()
+    if PERFIL_INICIALIZACAO:
+        relatorio_inicializacao(LIMITE_INICIALIZACAO_S)
+
+def _carregar_em_segundo_plano():
+    global erro_carga
+    try:
+        garantir_dados()
+    except Exception as e:
+        erro_carga = e
+
+def iniciar_carga():
+    """
+    Dispara a carga em segundo plano (apenas na primeira chamada)
+    """
+    global _thread_carga
+    with _trava_inicio_carga:
+        if _thread_carga is None:
+            _thread_carga = threading.Thread(target=_carregar_em_segundo_plano, name="carga-dados", daemon=True)
+            _thread_carga.start()
 
 # ============================================================================
 # CÁLCULOS DE KPIs
 # ============================================================================
 
-total_registros = len(df)
-salario_medio = df["salary_in_usd"].mean()
-salario_mediano = df["salary_in_usd"].median()
-total_cargos = df["job_title"].nunique()
-total_paises = df["employee_residence"].nunique() if "employee_residence" in df.columns else 0
-
-# CAGR (Crescimento Anual Composto)
-anos_ordenados = sorted(df["work_year"].unique())
-if len(anos_ordenados) > 1:
-    salario_inicial = df[df["work_year"] == anos_ordenados[0]]["salary_in_usd"].mean()
-    salario_final = df[df["work_year"] == anos_ordenados[-1]]["salary_in_usd"].mean()
-    num_anos = anos_ordenados[-1] - anos_ordenados[0]
-    cagr = ((salario_final / salario_inicial) ** (1 / num_anos) - 1) * 100
-else:
-    cagr = 0
+def valores_distintos(tabela, coluna):
+    """
+    Valores presentes (não ausentes) de uma coluna; vazio quando ela não existe
+    """
+    if coluna not in tabela.columns:
+        return set()
+    return set(tabela[coluna].dropna().unique().tolist())
 
-# ============================================================================
-# CONFIGURAÇÃO DO APP DASH
-# ============================================================================
+def calcular_kpis():
+    """
+    KPIs do dataset completo (mesmas chaves de ResumoSalarial.kpis)
+    """
+    if MODO_STREAMING:
+        # Mediana pelo sketch de quantis; distintos pelos conjuntos acumulados
+        return resumo_streaming.kpis()
+    
+    total_registros, soma_salarios = cubo_salarios.celula({})
+    # Mediana exata em datasets pequenos; nos demais, pelo sketch do cubo (já mesclado
+    # a cada lote), para que um lote novo não custe uma passada sobre todas as linhas
+    if MODO_QUANTIS == "exato" or (MODO_QUANTIS == "auto" and len(df) <= LIMITE_QUANTIS_EXATOS):
+        salario_mediano = df["salary_in_usd"].median()
+    else:
+        salario_mediano = cubo_salarios.sketch({}).mediana()
+    return {
+        "total_registros": total_registros,
+        "salario_medio": soma_salarios / total_registros,
+        "salario_mediano": salario_mediano,
+        "total_cargos": len(cargos_distintos),
+        "total_paises": len(paises_distintos),
+        # CAGR (Crescimento Anual Composto)
+        "cagr": calcular_cagr(cubo_salarios)
+    }
 
-app = dash.Dash(
-    __name__,
-    external_stylesheets=[dbc.themes.BOOTSTRAP],
-    meta_tags=[{"name": "viewport", "content": "width=device-width, initial-scale=1"}]
-)
+# Versão dos dados em memória: incrementada a cada lote de registros novos
+versao_incremental = 0
+_kpis_calculados = {}
 
-app.title = "Dashboard - Salários Data Science"
+def obter_kpis():
+    """
+    KPIs da versão atual; recalculados só na primeira consulta após novos registros
+    """
+    versao = versao_incremental
+    if _kpis_calculados.get("versao") != versao:
+        _kpis_calculados.update(versao=versao, kpis=calcular_kpis())
+    return _kpis_calculados["kpis"]
+
+def quantis_filtrados(filtros, salarios=None):
+    """
+    Q1, mediana, Q3 e IQR do salário na fatia filtrada, com o erro de rank
+    (0 quando exato). Fatias pequenas usam as linhas; as demais, os sketches do cubo
+    """
+    registros = cubo_salarios.celula(filtros)[0]
+    if registros == 0:
+        return {"registros": 0, "q1": None, "mediana": None, "q3": None, "iqr": None, "erro_rank": 0.0}
+    exato = indice_filtros is not None and (
+        MODO_QUANTIS == "exato" or (MODO_QUANTIS == "auto" and registros <= LIMITE_QUANTIS_EXATOS)
+    )
+    if exato:
+        if salarios is None:
+            salarios = indice_filtros.filtrar(filtros, colunas=["salary_in_usd"])["salary_in_usd"].to_numpy()
+        q1, mediana, q3 = np.quantile(salarios, [0.25, 0.5, 0.75])
+        erro = 0.0
+    else:
+        sketch = cubo_salarios.sketch(filtros)
+        q1, mediana, q3 = sketch.quantis([0.25, 0.5, 0.75])
+        erro = sketch.erro_rank()
+    return {
+        "registros": registros,
+        "q1": float(q1),
+        "mediana": float(mediana),
+        "q3": float(q3),
+        "iqr": float(q3 - q1),
+        "erro_rank": erro
+    }
+
+def textos_kpis(kpis):
+    return {
+        "kpi-total-registros": f"{kpis['total_registros']:,}",
+        "kpi-salario-medio": f"${kpis['salario_medio']:,.0f}",
+        "kpi-salario-mediano": f"${kpis['salario_mediano']:,.0f}",
+        "kpi-cagr": f"{kpis['cagr']:+.1f}%",
+        "kpi-cargos": f"{kpis['total_cargos']}",
+        "kpi-paises": f"{kpis['total_paises']}"
+    }
+
+IDS_KPIS = [
+    "kpi-total-registros", "kpi-salario-medio", "kpi-salario-mediano", "kpi-cagr", "kpi-cargos", "kpi-paises"
+]
 
 # ============================================================================
 # PALETA DE CORES PROFISSIONAL
@@ -180,11 +429,11 @@ COLORS = {
 # COMPONENTES DO DASHBOARD
 # ============================================================================
 
-def create_kpi_card(title, value, icon, color):
+def create_kpi_card(title, value, icon, color, id_valor):
     return dbc.Card(
         dbc.CardBody([
             html.Div([
-                html.H3(value, style={"color": color, "fontWeight": "bold", "marginBottom": "5px"}),
+                html.H3(value, id=id_valor, style={"color": color, "fontWeight": "bold", "marginBottom": "5px"}),
                 html.P(title, style={"color": "#6c757d", "marginBottom": "0", "fontSize": "0.9rem"})
             ], style={"textAlign": "center"})
         ]),
@@ -197,382 +446,1286 @@ def create_kpi_card(title, value, icon, color):
         }
     )
 
+# Dimensão e rótulo de cada dropdown de filtro
+FILTROS_DROPDOWN = {
+    "filtro-ano": ("work_year", str),
+    "filtro-experiencia": ("experience_level", lambda exp: experience_labels.get(exp, exp)),
+    "filtro-tamanho": ("company_size", lambda size: size_labels.get(size, size)),
+    "filtro-pais": ("employee_residence", str)
+}
+
+# Colunas da tabela de registros (ids das colunas do dataset, rótulos e tipos do filtro)
+COLUNAS_TABELA_REGISTROS = [
+    {"name": "Ano", "id": "work_year", "type": "numeric"},
+    {"name": "Experiência", "id": "experience_level", "type": "text"},
+    {"name": "Cargo", "id": "job_title", "type": "text"},
+    {"name": "Salário (USD)", "id": "salary_in_usd", "type": "numeric", "format": dash_table.FormatTemplate.money(0)},
+    {"name": "Residência", "id": "employee_residence", "type": "text"},
+    {"name": "Local da Empresa", "id": "company_location", "type": "text"},
+    {"name": "Tamanho", "id": "company_size", "type": "text"},
+    {"name": "Anos de Experiência", "id": "years_of_experience", "type": "numeric"}
+]
+
+def faixa_anos():
+    """
+    (mínimo, máximo, marcas) do RangeSlider de anos, a partir dos anos presentes nos dados
+    """
+    anos = [int(ano) for ano in cubo_salarios.valores["work_year"]]
+    return min(anos), max(anos), {ano: str(ano) for ano in anos}
+
+def opcoes_filtro(id_filtro):
+    dimensao, rotulo = FILTROS_DROPDOWN[id_filtro]
+    return [{"label": "Todos", "value": "all"}] + [
+        {"label": rotulo(valor), "value": valor} for valor in cubo_salarios.valores[dimensao]
+    ]
+
 # ============================================================================
 # LAYOUT DO DASHBOARD
 # ============================================================================
 
-app.layout = dbc.Container([
+def montar_layout():
+    """
+    Layout servido a cada acesso. Enquanto os dados carregam, KPIs e filtros
+    ficam vazios e o intervalo consulta a carga até ela terminar
+    """
+    pronto = dados_prontos.is_set()
+    if pronto:
+        textos = textos_kpis(obter_kpis())
+        opcoes = {id_filtro: opcoes_filtro(id_filtro) for id_filtro in FILTROS_DROPDOWN}
+        ano_minimo, ano_maximo, marcas_anos = faixa_anos()
+    else:
+        textos = {id_kpi: "…" for id_kpi in IDS_KPIS}
+        opcoes = {id_filtro: [{"label": "Todos", "value": "all"}] for id_filtro in FILTROS_DROPDOWN}
+        ano_minimo, ano_maximo, marcas_anos = 0, 1, {}
     
-    # HEADER
-    dbc.Row([
-        dbc.Col([
-            html.Div([
-                html.H1("📊 Dashboard - Análise Salarial em Data Science", 
-                       style={"color": "white", "fontWeight": "bold", "marginBottom": "10px"}),
-                html.P("Análise interativa de tendências salariais, correlações e insights estratégicos",
-                      style={"color": "rgba(255,255,255,0.9)", "fontSize": "1.1rem", "marginBottom": "0"})
-            ], style={
-                "textAlign": "center",
-                "padding": "30px 20px",
-                "background": f"linear-gradient(135deg, {COLORS['primary']} 0%, {COLORS['info']} 100%)",
-                "borderRadius": "10px",
-                "marginBottom": "30px"
-            })
-        ], width=12)
-    ]),
-    
-    # KPIs PRINCIPAIS
-    dbc.Row([
-        dbc.Col(create_kpi_card("Total de Registros", f"{total_registros:,}", "database", COLORS["primary"]), 
-                width=12, md=6, lg=2, className="mb-3"),
-        dbc.Col(create_kpi_card("Salário Médio", f"${salario_medio:,.0f}", "dollar-sign", COLORS["success"]), 
-                width=12, md=6, lg=2, className="mb-3"),
-        dbc.Col(create_kpi_card("Salário Mediano", f"${salario_mediano:,.0f}", "chart-line", COLORS["info"]), 
-                width=12, md=6, lg=2, className="mb-3"),
-        dbc.Col(create_kpi_card("CAGR", f"{cagr:+.1f}%", "arrow-trend-up", COLORS["warning"]), 
-                width=12, md=6, lg=2, className="mb-3"),
-        dbc.Col(create_kpi_card("Cargos Únicos", f"{total_cargos}", "briefcase", COLORS["secondary"]), 
-                width=12, md=6, lg=2, className="mb-3"),
-        dbc.Col(create_kpi_card("Países", f"{total_paises}", "globe", COLORS["danger"]), 
-                width=12, md=6, lg=2, className="mb-3"),
-    ], style={"marginBottom": "30px"}),
-    
-    # FILTROS INTERATIVOS
-    dbc.Row([
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    html.H5("🔍 Filtros Interativos", style={"marginBottom": "20px", "color": COLORS["dark"]}),
+    return dbc.Container([
+        
+        # HEADER
+        dbc.Row([
+            dbc.Col([
+                html.Div([
+                    html.H1("📊 Dashboard - Análise Salarial em Data Science", 
+                           style={"color": "white", "fontWeight": "bold", "marginBottom": "10px"}),
+                    html.P("Análise interativa de tendências salariais, correlações e insights estratégicos",
+                          style={"color": "rgba(255,255,255,0.9)", "fontSize": "1.1rem", "marginBottom": "0"})
+                ], style={
+                    "textAlign": "center",
+                    "padding": "30px 20px",
+                    "background": f"linear-gradient(135deg, {COLORS['primary']} 0%, {COLORS['info']} 100%)",
+                    "borderRadius": "10px",
+                    "marginBottom": "30px"
+                })
+            ], width=12)
+        ]),
+        
+        # KPIs PRINCIPAIS
+        dbc.Row([
+            dbc.Col(create_kpi_card("Total de Registros", textos["kpi-total-registros"], "database", COLORS["primary"],
+                                    "kpi-total-registros"), 
+                    width=12, md=6, lg=2, className="mb-3"),
+            dbc.Col(create_kpi_card("Salário Médio", textos["kpi-salario-medio"], "dollar-sign", COLORS["success"],
+                                    "kpi-salario-medio"), 
+                    width=12, md=6, lg=2, className="mb-3"),
+            dbc.Col(create_kpi_card("Salário Mediano", textos["kpi-salario-mediano"], "chart-line", COLORS["info"],
+                                    "kpi-salario-mediano"), 
+                    width=12, md=6, lg=2, className="mb-3"),
+            dbc.Col(create_kpi_card("CAGR", textos["kpi-cagr"], "arrow-trend-up", COLORS["warning"],
+                                    "kpi-cagr"), 
+                    width=12, md=6, lg=2, className="mb-3"),
+            dbc.Col(create_kpi_card("Cargos Únicos", textos["kpi-cargos"], "briefcase", COLORS["secondary"],
+                                    "kpi-cargos"), 
+                    width=12, md=6, lg=2, className="mb-3"),
+            dbc.Col(create_kpi_card("Países", textos["kpi-paises"], "globe", COLORS["danger"],
+                                    "kpi-paises"), 
+                    width=12, md=6, lg=2, className="mb-3"),
+        ], style={"marginBottom": "30px"}),
+        
+        # FILTROS INTERATIVOS
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5("🔍 Filtros Interativos", style={"marginBottom": "20px", "color": COLORS["dark"]}),
                     
-                    html.Label("Ano:", style={"fontWeight": "bold", "color": COLORS["dark"]}),
-                    dcc.Dropdown(
-                        id="filtro-ano",
-                        options=[{"label": "Todos", "value": "all"}] + 
-                                [{"label": str(ano), "value": ano} for ano in sorted(df["work_year"].unique())],
-                        value="all",
-                        clearable=False,
-                        style={"marginBottom": "15px"}
-                    ),
+                        html.Label("Ano:", style={"fontWeight": "bold", "color": COLORS["dark"]}),
+                        dcc.Dropdown(
+                            id="filtro-ano",
+                            options=opcoes["filtro-ano"],
+                            value="all",
+                            multi=True,
+                            clearable=False,
+                            style={"marginBottom": "10px"}
+                        ),
+                        # Faixa de anos: sincronizada com o dropdown (assets/selecao_filtros.js)
+                        html.Div(
+                            dcc.RangeSlider(
+                                id="faixa-ano",
+                                min=ano_minimo, max=ano_maximo, step=1,
+                                value=[ano_minimo, ano_maximo],
+                                marks=marcas_anos,
+                                allowCross=True,
+                                disabled=not pronto
+                            ),
+                            style={"marginBottom": "15px"}
+                        ),
                     
-                    html.Label("Nível de Experiência:", style={"fontWeight": "bold", "color": COLORS["dark"]}),
-                    dcc.Dropdown(
-                        id="filtro-experiencia",
-                        options=[{"label": "Todos", "value": "all"}] + 
-                                [{"label": experience_labels[exp], "value": exp} 
-                                 for exp in sorted(df["experience_level"].unique())],
-                        value="all",
-                        clearable=False,
-                        style={"marginBottom": "15px"}
-                    ),
+                        html.Label("Nível de Experiência:", style={"fontWeight": "bold", "color": COLORS["dark"]}),
+                        dcc.Dropdown(
+                            id="filtro-experiencia",
+                            options=opcoes["filtro-experiencia"],
+                            value="all",
+                            multi=True,
+                            clearable=False,
+                            style={"marginBottom": "15px"}
+                        ),
                     
-                    html.Label("Tamanho da Empresa:", style={"fontWeight": "bold", "color": COLORS["dark"]}),
-                    dcc.Dropdown(
-                        id="filtro-tamanho",
-                        options=[{"label": "Todos", "value": "all"}] + 
-                                [{"label": size_labels[size], "value": size} 
-                                 for size in sorted(df["company_size"].unique())],
-                        value="all",
-                        clearable=False,
-                        style={"marginBottom": "15px"}
-                    ),
+                        html.Label("Tamanho da Empresa:", style={"fontWeight": "bold", "color": COLORS["dark"]}),
+                        dcc.Dropdown(
+                            id="filtro-tamanho",
+                            options=opcoes["filtro-tamanho"],
+                            value="all",
+                            multi=True,
+                            clearable=False,
+                            style={"marginBottom": "15px"}
+                        ),
                     
-                    html.Label("País (Residência):", style={"fontWeight": "bold", "color": COLORS["dark"]}),
-                    dcc.Dropdown(
-                        id="filtro-pais",
-                        options=[{"label": "Todos", "value": "all"}] + 
-                                [{"label": pais, "value": pais} 
-                                 for pais in sorted(df["employee_residence"].unique())],
-                        value="all",
-                        clearable=False,
-                        placeholder="Selecione um país..."
-                    ),
-                ])
-            ], style={"boxShadow": "0 4px 6px rgba(0,0,0,0.1)", "borderRadius": "10px", "height": "100%"})
-        ], width=12, lg=3, className="mb-3"),
+                        html.Label("País (Residência):", style={"fontWeight": "bold", "color": COLORS["dark"]}),
+                        dcc.Dropdown(
+                            id="filtro-pais",
+                            options=opcoes["filtro-pais"],
+                            value="all",
+                            multi=True,
+                            clearable=False,
+                            placeholder="Selecione um país..."
+                        ),
+                    ])
+                ], style={"boxShadow": "0 4px 6px rgba(0,0,0,0.1)", "borderRadius": "10px", "height": "100%"})
+            ], width=12, lg=3, className="mb-3"),
         
-        # GRÁFICO: Distribuição Salarial
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    html.H5("📊 Distribuição Salarial", style={"marginBottom": "15px", "color": COLORS["dark"]}),
-                    dcc.Graph(id="grafico-distribuicao", config={"displayModeBar": False})
-                ])
-            ], style={"boxShadow": "0 4px 6px rgba(0,0,0,0.1)", "borderRadius": "10px"})
-        ], width=12, lg=9, className="mb-3"),
-    ], style={"marginBottom": "30px"}),
-    
-    # GRÁFICOS PRINCIPAIS - LINHA 1
-    dbc.Row([
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    html.H5("📈 Evolução Temporal por Experiência", style={"marginBottom": "15px", "color": COLORS["dark"]}),
-                    dcc.Graph(id="grafico-temporal", config={"displayModeBar": False})
-                ])
-            ], style={"boxShadow": "0 4px 6px rgba(0,0,0,0.1)", "borderRadius": "10px"})
-        ], width=12, lg=6, className="mb-3"),
+            # GRÁFICO: Distribuição Salarial
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5("📊 Distribuição Salarial", style={"marginBottom": "15px", "color": COLORS["dark"]}),
+                        dcc.Graph(id="grafico-distribuicao", config={"displayModeBar": False})
+                    ])
+                ], style={"boxShadow": "0 4px 6px rgba(0,0,0,0.1)", "borderRadius": "10px"})
+            ], width=12, lg=9, className="mb-3"),
+        ], style={"marginBottom": "30px"}),
         
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    html.H5("💼 Top 10 Cargos Mais Bem Pagos", style={"marginBottom": "15px", "color": COLORS["dark"]}),
-                    html.P("(Baseado na média salarial com mínimo de 3 registros)", 
-                           style={"fontSize": "0.85rem", "color": "#6c757d", "marginBottom": "10px"}),
-                    dcc.Graph(id="grafico-top-cargos", config={"displayModeBar": False})
-                ])
-            ], style={"boxShadow": "0 4px 6px rgba(0,0,0,0.1)", "borderRadius": "10px"})
-        ], width=12, lg=6, className="mb-3"),
-    ], style={"marginBottom": "30px"}),
-    
-    # GRÁFICOS PRINCIPAIS - LINHA 2
-    dbc.Row([
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    html.H5("🔗 Matriz de Correlação", style={"marginBottom": "15px", "color": COLORS["dark"]}),
-                    dcc.Graph(id="grafico-correlacao", config={"displayModeBar": False})
-                ])
-            ], style={"boxShadow": "0 4px 6px rgba(0,0,0,0.1)", "borderRadius": "10px"})
-        ], width=12, lg=6, className="mb-3"),
+        # GRÁFICOS PRINCIPAIS - LINHA 1
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5("📈 Evolução Temporal por Experiência", style={"marginBottom": "15px", "color": COLORS["dark"]}),
+                        dcc.Graph(id="grafico-temporal", config={"displayModeBar": False})
+                    ])
+                ], style={"boxShadow": "0 4px 6px rgba(0,0,0,0.1)", "borderRadius": "10px"})
+            ], width=12, lg=6, className="mb-3"),
         
-        dbc.Col([
-            dbc.Card([
-                dbc.CardBody([
-                    html.H5("🏢 Salários por Tamanho de Empresa", style={"marginBottom": "15px", "color": COLORS["dark"]}),
-                    dcc.Graph(id="grafico-empresa", config={"displayModeBar": False})
-                ])
-            ], style={"boxShadow": "0 4px 6px rgba(0,0,0,0.1)", "borderRadius": "10px"})
-        ], width=12, lg=6, className="mb-3"),
-    ], style={"marginBottom": "30px"}),
-    
-    # FOOTER
-    dbc.Row([
-        dbc.Col([
-            html.Div([
-                html.P("Dashboard desenvolvido com Plotly Dash | Análise de Dados em Data Science", 
-                      style={"marginBottom": "5px", "color": "#6c757d"}),
-                html.P("© 2024 - Projeto de Portfólio", 
-                      style={"marginBottom": "0", "color": "#adb5bd", "fontSize": "0.9rem"})
-            ], style={"textAlign": "center", "padding": "20px"})
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5(f"💼 Top {TOP_CARGOS_K} Cargos Mais Bem Pagos", style={"marginBottom": "15px", "color": COLORS["dark"]}),
+                        html.P(f"(Baseado na média salarial com mínimo de {TOP_CARGOS_MINIMO} registros)", 
+                               style={"fontSize": "0.85rem", "color": "#6c757d", "marginBottom": "10px"}),
+                        dcc.Graph(id="grafico-top-cargos", config={"displayModeBar": False}),
+                        # Páginas seguintes do ranking (posições 11-20, 21-30...)
+                        dbc.Pagination(id="paginacao-cargos", max_value=1, active_page=1,
+                                       fully_expanded=False, size="sm", className="justify-content-center mb-0")
+                    ])
+                ], style={"boxShadow": "0 4px 6px rgba(0,0,0,0.1)", "borderRadius": "10px"})
+            ], width=12, lg=6, className="mb-3"),
+        ], style={"marginBottom": "30px"}),
+        
+        # GRÁFICOS PRINCIPAIS - LINHA 2
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5("🔗 Matriz de Correlação", style={"marginBottom": "5px", "color": COLORS["dark"]}),
+                        dbc.RadioItems(
+                            id="metodo-correlacao",
+                            options=[
+                                {"label": "Pearson", "value": "pearson"},
+                                {"label": "Spearman (postos)", "value": "spearman"}
+                            ],
+                            value="pearson", inline=True,
+                            style={"fontSize": "0.85rem", "color": "#6c757d", "marginBottom": "10px"}
+                        ),
+                        dcc.Graph(id="grafico-correlacao", config={"displayModeBar": False})
+                    ])
+                ], style={"boxShadow": "0 4px 6px rgba(0,0,0,0.1)", "borderRadius": "10px"})
+            ], width=12, lg=6, className="mb-3"),
+        
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5("🏢 Salários por Tamanho de Empresa", style={"marginBottom": "15px", "color": COLORS["dark"]}),
+                        dcc.Graph(id="grafico-empresa", config={"displayModeBar": False})
+                    ])
+                ], style={"boxShadow": "0 4px 6px rgba(0,0,0,0.1)", "borderRadius": "10px"})
+            ], width=12, lg=6, className="mb-3"),
+        ], style={"marginBottom": "30px"}),
+        
+        # REGISTROS DA SELEÇÃO (sem linhas em memória no modo streaming)
+        *([dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5("🔎 Registros da Seleção", style={"marginBottom": "5px", "color": COLORS["dark"]}),
+                        html.P("(Mesmos filtros dos gráficos; ordene e filtre pelas colunas)",
+                               style={"fontSize": "0.85rem", "color": "#6c757d", "marginBottom": "10px"}),
+                        # Paginação, ordenação e filtros por coluna no servidor: só a página vai ao navegador
+                        dash_table.DataTable(
+                            id="tabela-registros",
+                            columns=COLUNAS_TABELA_REGISTROS,
+                            page_action="custom", page_current=0, page_size=REGISTROS_POR_PAGINA, page_count=1,
+                            sort_action="custom", sort_mode="single", sort_by=[],
+                            filter_action="custom", filter_query="",
+                            style_table={"overflowX": "auto"},
+                            style_header={"fontWeight": "bold", "backgroundColor": COLORS["background"]},
+                            style_cell={"fontSize": "0.85rem", "padding": "6px", "textAlign": "left"}
+                        )
+                    ])
+                ], style={"boxShadow": "0 4px 6px rgba(0,0,0,0.1)", "borderRadius": "10px"})
+            ], width=12, className="mb-3"),
+        ], style={"marginBottom": "30px"})] if not MODO_STREAMING else []),
+        
+        # ESQUELETO DA FIGURA EXIBIDA EM CADA GRÁFICO ("vazia" ou "grafico"): decide entre Patch e figura completa
+        *[dcc.Store(id=f"esqueleto-{id_grafico}") for id_grafico in GRAFICOS],
+        
+        # PEDIDOS DE FIGURAS AOS JOBS EM SEGUNDO PLANO
+        *([dcc.Store(id=f"pedido-{id_grafico}") for id_grafico in GRAFICOS_SEGUNDO_PLANO] if SEGUNDO_PLANO else []),
+        
+        # AGREGADOS DO MODO CLIENTE (enviados uma vez por sessão e a cada versão dos dados)
+        *([dcc.Store(id="agregados-cliente")] if MODO_CLIENTE else []),
+        
+        # MEDIÇÃO DE TEMPOS (primeiro gráfico / todos os gráficos)
+        dcc.Store(id="inicio-interacao"),
+        dcc.Store(id="tempos-graficos"),
+        
+        # ATUALIZAÇÃO AO VIVO (versão dos dados exibidos e verificação periódica)
+        dcc.Store(id="versao-dados", data=versao_incremental if pronto else None),
+        dcc.Interval(id="intervalo-atualizacao",
+                     interval=INTERVALO_ATUALIZACAO_S * 1000 if pronto else 1000,
+                     disabled=pronto and not ATUALIZACAO_AO_VIVO),
+        
+        # FOOTER
+        dbc.Row([
+            dbc.Col([
+                html.Div([
+                    html.P("Dashboard desenvolvido com Plotly Dash | Análise de Dados em Data Science", 
+                          style={"marginBottom": "5px", "color": "#6c757d"}),
+                    html.P("© 2024 - Projeto de Portfólio", 
+                          style={"marginBottom": "0", "color": "#adb5bd", "fontSize": "0.9rem"})
+                ], style={"textAlign": "center", "padding": "20px"})
+            ])
         ])
-    ])
-    
-], fluid=True, style={"backgroundColor": COLORS["background"], "padding": "20px"})
+        
+    ], fluid=True, style={"backgroundColor": COLORS["background"], "padding": "20px"})
 
 # ============================================================================
 # CALLBACKS (INTERATIVIDADE)
 # ============================================================================
 
-@app.callback(
-    [
-        Output("grafico-distribuicao", "figure"),
-        Output("grafico-temporal", "figure"),
-        Output("grafico-top-cargos", "figure"),
-        Output("grafico-correlacao", "figure"),
-        Output("grafico-empresa", "figure")
-    ],
-    [
-        Input("filtro-ano", "value"),
-        Input("filtro-experiencia", "value"),
-        Input("filtro-tamanho", "value"),
-        Input("filtro-pais", "value")
-    ]
-)
-def update_graphs(ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado):
+FILTROS_INPUTS = [
+    Input("filtro-ano", "value"),
+    Input("filtro-experiencia", "value"),
+    Input("filtro-tamanho", "value"),
+    Input("filtro-pais", "value")
+]
+
+def montar_filtros(ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado):
+    """
+    Cada filtro aceita "all", um valor, uma lista (multi-seleção) ou uma faixa
+    {"de": a, "ate": b}; todos chegam na forma canônica de normalizar_filtro
+    """
+    selecao = {
+        "work_year": ano_selecionado,
+        "experience_level": exp_selecionada,
+        "company_size": tamanho_selecionado,
+        "employee_residence": pais_selecionado
+    }
+    return {dim: normalizar_filtro(valor, cubo_salarios.valores.get(dim)) for dim, valor in selecao.items()}
+
+def figura_vazia(mensagem="Nenhum dado disponível para os filtros selecionados"):
+    fig_vazio = go.Figure()
+    fig_vazio.add_annotation(
+        text=mensagem,
+        xref="paper", yref="paper",
+        x=0.5, y=0.5, showarrow=False,
+        font=dict(size=14, color="gray")
+    )
+    fig_vazio.update_layout(template="plotly_white", height=300)
+    return fig_vazio
+
+# Espaçamento entre as barras do histograma (fração da largura do bin)
+BARGAP_HISTOGRAMA = 0.05
+
+def calcular_bins_histograma(valores, nbins=20):
+    """
+    Binning no servidor reproduzindo o autobin do Plotly para nbinsx:
+    largura "redonda" (2, 5 ou 10 x 10^k) e bordas deslocadas para que
+    valores inteiros não caiam exatamente sobre elas.
+    Retorna (inicio, largura, contagens)
+    """
+    valores = np.asarray(valores)
+    inteiros = np.issubdtype(valores.dtype, np.integer)
+    valores = valores.astype(float, copy=False)
+    valores = valores[~np.isnan(valores)]
+    minimo, maximo = valores.min(), valores.max()
+    inteiros = inteiros or bool(np.all(np.mod(valores, 1) == 0))
+    
+    if maximo == minimo:
+        largura = 10 ** np.floor(np.log10(abs(minimo))) if minimo else 1.0
+        return minimo - largura / 2, largura, np.array([len(valores)])
     
-    # Filtrando dados
-    df_filtrado = df.copy()
+    bruto = (maximo - minimo) / nbins
+    base = 10 ** np.floor(np.log10(bruto))
+    largura = base * next((passo for passo in (2, 5, 10) if passo > bruto / base), 10)
     
-    if ano_selecionado != "all":
-        df_filtrado = df_filtrado[df_filtrado["work_year"] == ano_selecionado]
+    # Primeira marca do eixo antes do mínimo (mesma tolerância de 1e-4 do Plotly)
+    inicio = np.ceil((minimo - (maximo - minimo) * 1e-4) / largura) * largura - largura
     
-    if exp_selecionada != "all":
-        df_filtrado = df_filtrado[df_filtrado["experience_level"] == exp_selecionada]
+    def perto_da_borda(x):
+        return np.fmod(1 + 100 * (x - inicio) / largura, 100) < 2
     
-    if tamanho_selecionado != "all":
-        df_filtrado = df_filtrado[df_filtrado["company_size"] == tamanho_selecionado]
+    if inteiros:
+        if largura < 1:
+            inicio = minimo - 0.5 * largura
+        else:
+            inicio -= 0.5
+            if inicio + largura < minimo:
+                inicio += largura
+    elif perto_da_borda(valores + largura / 2).sum() < 0.1 * len(valores):
+        if (perto_da_borda(valores).sum() > 0.3 * len(valores)
+                or perto_da_borda(minimo) or perto_da_borda(maximo)):
+            deslocamento = largura / 2
+            inicio += deslocamento if inicio + deslocamento < minimo else -deslocamento
     
-    if pais_selecionado != "all":
-        df_filtrado = df_filtrado[df_filtrado["employee_residence"] == pais_selecionado]
+    total_bins = 1 + int(np.floor((maximo - inicio) / largura))
+    indices = np.floor((valores - inicio) / largura).astype(np.int64)
+    contagens = np.bincount(indices, minlength=total_bins)[:total_bins]
+    return inicio, largura, contagens
+
+def faixa_salarial(valores):
+    """
+    (mínimo, máximo, só inteiros?) — o que determina os bins da seleção "Todos"
+    """
+    valores = np.asarray(valores, dtype=float)
+    valores = valores[~np.isnan(valores)]
+    return valores.min(), valores.max(), bool(np.all(np.mod(valores, 1) == 0))
+
+# GRÁFICO 1: Distribuição Salarial
+def figura_distribuicao(filtros):
+    total_filtrado, soma_filtrada = cubo_salarios.celula(filtros)
     
-    # Verificação de dados vazios
-    if len(df_filtrado) == 0:
-        fig_vazio = go.Figure()
-        fig_vazio.add_annotation(
-            text="Nenhum dado disponível para os filtros selecionados",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False,
-            font=dict(size=14, color="gray")
+    # Seleção "Todos" usa bins e mediana pré-calculados; demais seleções
+    # fazem o binning apenas sobre os salários filtrados
+    if all(valor == "all" for valor in filtros.values()):
+        inicio, largura, contagens = histograma_completo
+        mediana_filtrada = obter_kpis()["salario_mediano"]
+        aproximada = False
+    else:
+        with metricas.etapa("filtragem"):
+            salarios = indice_filtros.filtrar(filtros, colunas=["salary_in_usd"])["salary_in_usd"].to_numpy()
+        with metricas.etapa("agregacao"):
+            inicio, largura, contagens = calcular_bins_histograma(salarios)
+        with metricas.etapa("quantis"):
+            estatisticas = quantis_filtrados(filtros, salarios)
+            mediana_filtrada = estatisticas["mediana"]
+            aproximada = estatisticas["erro_rank"] > 0
+    
+    bordas = inicio + largura * np.arange(len(contagens) + 1)
+    
+    with metricas.etapa("figura"):
+        fig_dist = go.Figure()
+    
+        # Barras com os bins já calculados: o payload tem tamanho fixo,
+        # independente do número de registros
+        fig_dist.add_trace(go.Bar(
+            x=(bordas[:-1] + bordas[1:]) / 2,
+            y=contagens,
+            width=largura * (1 - BARGAP_HISTOGRAMA),
+            customdata=np.column_stack([bordas[:-1], bordas[1:]]),
+            hovertemplate="%{customdata[0]:$,.0f} - %{customdata[1]:$,.0f}<br>Frequência: %{y}<extra></extra>",
+            marker_color=COLORS["primary"],
+            opacity=0.75,
+            name="Frequência"
+        ))
+    
+        # Média lida do cubo
+        media_filtrada = soma_filtrada / total_filtrado
+    
+        # Adicionar linha vertical da média (vermelha tracejada)
+        fig_dist.add_vline(
+            x=media_filtrada,
+            line_dash="dash",
+            line_color="red",
+            line_width=2,
+            annotation_text=f"Média: ${media_filtrada:,.0f}",
+            annotation_position="top right",
+            annotation=dict(
+                font=dict(size=11, color="red"),
+                bgcolor="rgba(255,255,255,0.8)"
+            )
         )
-        fig_vazio.update_layout(template="plotly_white", height=300)
-        return fig_vazio, fig_vazio, fig_vazio, fig_vazio, fig_vazio
-    
-    # GRÁFICO 1: Distribuição Salarial
-    fig_dist = go.Figure()
-    
-    # Adicionar histograma com bins mais largos
-    fig_dist.add_trace(go.Histogram(
-        x=df_filtrado["salary_in_usd"],
-        nbinsx=20,  # Bins mais largos (igual ao notebook)
-        marker_color=COLORS["primary"],
-        opacity=0.75,
-        name="Frequência"
-    ))
-    
-    # Calcular média e mediana dos dados filtrados
-    media_filtrada = df_filtrado["salary_in_usd"].mean()
-    mediana_filtrada = df_filtrado["salary_in_usd"].median()
-    
-    # Adicionar linha vertical da média (vermelha tracejada)
-    fig_dist.add_vline(
-        x=media_filtrada,
-        line_dash="dash",
-        line_color="red",
-        line_width=2,
-        annotation_text=f"Média: ${media_filtrada:,.0f}",
-        annotation_position="top right",
-        annotation=dict(
-            font=dict(size=11, color="red"),
-            bgcolor="rgba(255,255,255,0.8)"
+    
+        # Adicionar linha vertical da mediana (azul escuro tracejada)
+        fig_dist.add_vline(
+            x=mediana_filtrada,
+            line_dash="dash",
+            line_color="navy",
+            line_width=2,
+            annotation_text=f"Mediana{' ≈' if aproximada else ':'} ${mediana_filtrada:,.0f}",
+            annotation_position="top left",
+            annotation=dict(
+                font=dict(size=11, color="navy"),
+                bgcolor="rgba(255,255,255,0.8)"
+            )
         )
-    )
     
-    # Adicionar linha vertical da mediana (azul escuro tracejada)
-    fig_dist.add_vline(
-        x=mediana_filtrada,
-        line_dash="dash",
-        line_color="navy",
-        line_width=2,
-        annotation_text=f"Mediana: ${mediana_filtrada:,.0f}",
-        annotation_position="top left",
-        annotation=dict(
-            font=dict(size=11, color="navy"),
-            bgcolor="rgba(255,255,255,0.8)"
+        fig_dist.update_layout(
+            template="plotly_white",
+            height=300,
+            margin=dict(l=20, r=20, t=20, b=20),
+            showlegend=False,
+            xaxis_title="Salário (USD)",
+            yaxis_title="Frequência",
+            bargap=BARGAP_HISTOGRAMA,
+            xaxis=dict(
+                tickformat="$,.0f",
+                tickmode="linear",
+                dtick=50000  # Marcas a cada 50k
+            )
         )
+    return fig_dist
+
+# GRÁFICO 2: Evolução Temporal
+def figura_temporal(filtros):
+    with metricas.etapa("agregacao"):
+        temporal_data = cubo_salarios.agrupar(filtros, por=["work_year", "experience_level"])
+        temporal_data["experience_label"] = temporal_data["experience_level"].map(experience_labels)
+        temporal_data = temporal_data.rename(columns={"mean": "salary_in_usd"})
+        temporal_data = temporal_data.sort_values(["work_year", "experience_label"])[
+            ["work_year", "experience_label", "salary_in_usd"]
+        ]
+    with metricas.etapa("figura"):
+        fig_temporal = px.line(
+            temporal_data,
+            x="work_year",
+            y="salary_in_usd",
+            color="experience_label",
+            labels={"work_year": "Ano", "salary_in_usd": "Salário Médio (USD)", "experience_label": "Experiência"},
+            markers=True,
+            color_discrete_sequence=px.colors.qualitative.Set2
+        )
+        fig_temporal.update_layout(
+            template="plotly_white",
+            height=350,
+            margin=dict(l=20, r=20, t=20, b=20),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, title="")
+        )
+    return fig_temporal
+
+# GRÁFICO 3: Top Cargos (com filtro de mínimo de registros e paginação)
+def figura_top_cargos(filtros, pagina=1):
+    with metricas.etapa("agregacao"):
+        # Contagem e soma por cargo lidas do ranking; cargos com menos de
+        # TOP_CARGOS_MINIMO registros ficam de fora para evitar outliers
+        top_cargos = ranking_cargos.top(
+            filtros, k=TOP_CARGOS_K, minimo=TOP_CARGOS_MINIMO, inicio=(pagina - 1) * TOP_CARGOS_K
+        )
+    
+    with metricas.etapa("figura"):
+        fig_cargos = px.bar(
+            top_cargos,
+            x="salary_mean",
+            y="job_title",
+            orientation="h",
+            labels={"salary_mean": "Salário Médio (USD)", "job_title": ""},
+            color="salary_mean",
+            color_continuous_scale="Blues",
+            hover_data={"count": True, "salary_mean": ":.2f"}
+        )
+        fig_cargos.update_layout(
+            template="plotly_white",
+            height=350,
+            margin=dict(l=20, r=20, t=20, b=20),
+            showlegend=False,
+            coloraxis_showscale=False
+        )
+    return fig_cargos
+
+# GRÁFICO 4: Matriz de Correlação
+def figura_correlacao(filtros, metodo="pearson"):
+    if metodo == "spearman":
+        # Postos dependem da seleção inteira: calculados sobre as linhas filtradas
+        if indice_filtros is None:
+            return figura_vazia("Correlação de Spearman indisponível no modo streaming (exige as linhas)")
+        with metricas.etapa("filtragem"):
+            linhas = indice_filtros.filtrar(filtros, colunas=colunas_de_origem(cubo_salarios.covariaveis))
+            df_filtrado = com_derivadas(linhas, cubo_salarios.covariaveis)
+        with metricas.etapa("correlacao"):
+            df_corr = df_filtrado.corr(method="spearman")
+    else:
+        # Pearson combinado dos co-momentos das células do cubo, sem tocar nas linhas
+        with metricas.etapa("correlacao"):
+            df_corr = cubo_salarios.correlacao(filtros)
+    
+    with metricas.etapa("figura"):
+        labels_corr = {
+            "work_year": "Ano",
+            "salary_in_usd": "Salário",
+            "experience_level_num": "Experiência",
+            "company_size_num": "Tamanho",
+            "years_of_experience": "Anos Exp."
+        }
+    
+        fig_corr = go.Figure(data=go.Heatmap(
+            z=df_corr.values,
+            x=[labels_corr.get(col, col) for col in df_corr.columns],
+            y=[labels_corr.get(col, col) for col in df_corr.index],
+            colorscale="RdBu",
+            zmid=0,
+            text=np.round(df_corr.values, 2),
+            texttemplate="%{text}",
+            textfont={"size": 12},
+            colorbar=dict(title="Correlação")
+        ))
+        fig_corr.update_layout(
+            template="plotly_white",
+            height=350,
+            margin=dict(l=20, r=20, t=20, b=20)
+        )
+    return fig_corr
+
+# GRÁFICO 5: Salários por Tamanho de Empresa
+def figura_empresa(filtros):
+    with metricas.etapa("agregacao"):
+        empresa_data = cubo_salarios.agrupar(filtros, por=["company_size"])
+        empresa_data["size_label"] = empresa_data["company_size"].map(size_labels)
+        empresa_data = empresa_data.rename(columns={"mean": "salary_in_usd"})[["size_label", "salary_in_usd"]]
+        ordem_tamanho = {"Small": 1, "Medium": 2, "Large": 3}
+        empresa_data["ordem"] = empresa_data["size_label"].map(ordem_tamanho)
+        empresa_data = empresa_data.sort_values("ordem")
+    
+    with metricas.etapa("figura"):
+        fig_empresa = px.bar(
+            empresa_data,
+            x="size_label",
+            y="salary_in_usd",
+            labels={"size_label": "Tamanho da Empresa", "salary_in_usd": "Salário Médio (USD)"},
+            color="salary_in_usd",
+            color_continuous_scale="Greens"
+        )
+        fig_empresa.update_layout(
+            template="plotly_white",
+            height=350,
+            margin=dict(l=20, r=20, t=20, b=20),
+            showlegend=False,
+            coloraxis_showscale=False
+        )
+    return fig_empresa
+
+# Gráficos que ainda dependem das linhas filtradas (indisponíveis no modo streaming)
+GRAFICOS_POR_LINHAS = {"grafico-distribuicao"}
+
+# Gráficos que percorrem as linhas da seleção (a correlação só no modo Spearman):
+# os únicos que podem ir para o segundo plano
+GRAFICOS_SEGUNDO_PLANO = {"grafico-distribuicao", "grafico-correlacao"}
+
+# Opção própria de alguns gráficos, com o valor padrão: página do ranking e método da correlação
+OPCOES_GRAFICOS = {"grafico-top-cargos": 1, "grafico-correlacao": "pearson"}
+
+GRAFICOS = {
+    "grafico-distribuicao": figura_distribuicao,
+    "grafico-temporal": figura_temporal,
+    "grafico-top-cargos": figura_top_cargos,
+    "grafico-correlacao": figura_correlacao,
+    "grafico-empresa": figura_empresa
+}
+
+def chave_figura(id_grafico, filtros, opcao=None):
+    # Chave pela forma canônica: a mesma seleção em qualquer ordem reaproveita a figura
+    return (id_grafico, *filtros.values(), versao_dados, opcao or OPCOES_GRAFICOS.get(id_grafico))
+
+def figura_pesada(id_grafico, filtros, opcao=None):
+    """
+    Se a figura ainda precisa ser calculada sobre mais de LIMITE_SEGUNDO_PLANO linhas
+    """
+    if id_grafico not in GRAFICOS_SEGUNDO_PLANO or indice_filtros is None:
+        return False
+    if id_grafico == "grafico-correlacao" and opcao != "spearman":
+        return False
+    if cubo_salarios.celula(filtros)[0] <= LIMITE_SEGUNDO_PLANO:
+        return False
+    return not cache_figuras.contem(chave_figura(id_grafico, filtros, opcao))
+
+def obter_figura(id_grafico, ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado, opcao=None):
+    """
+    Figura de um gráfico, servida pelo cache LRU quando possível
+    (opcao: página do ranking de cargos ou método da correlação; ver OPCOES_GRAFICOS)
+    """
+    garantir_dados()
+    filtros = montar_filtros(ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado)
+    opcao = opcao or OPCOES_GRAFICOS.get(id_grafico)
+    chave = chave_figura(id_grafico, filtros, opcao)
+    
+    def construir():
+        # Verificação de dados vazios (contagem lida direto do cubo)
+        if cubo_salarios.celula(filtros)[0] == 0:
+            return figura_vazia()
+        if indice_filtros is None and id_grafico in GRAFICOS_POR_LINHAS:
+            return figura_vazia("Gráfico indisponível no modo streaming (apenas agregados em memória)")
+        if id_grafico in OPCOES_GRAFICOS:
+            return GRAFICOS[id_grafico](filtros, opcao)
+        return GRAFICOS[id_grafico](filtros)
+    
+    inicio = time.perf_counter()
+    with metricas.contexto(grafico=id_grafico):
+        with metricas.etapa("cache"):
+            figura = cache_figuras.obter(chave)
+        resultado_cache = "acerto" if figura is not None else "falha"
+        if figura is None:
+            versao = versao_incremental
+            figura = construir()
+            # Registros que chegaram durante o cálculo deixariam a figura obsoleta no cache
+            if versao == versao_incremental:
+                # O cache guarda o JSON da figura: codificação só nas falhas do cache (a resposta
+                # do callback é codificada depois pelo Dash e entra só no total da requisição)
+                with metricas.etapa("gravacao_cache"):
+                    cache_figuras.guardar(chave, figura)
+    metricas.observar("salarios_grafico_segundos", time.perf_counter() - inicio,
+                      grafico=id_grafico, cache=resultado_cache)
+    return figura
+
+def registros_da_pagina(filtros, pagina, tamanho_pagina, ordenacao, filtro_colunas, reiniciar=False):
+    """
+    (linhas da página, número de páginas, página exibida): a página volta para a última
+    quando a seleção encolheu e só é reenviada quando mudou
+    """
+    paginador = paginador_registros
+    with metricas.contexto(grafico="tabela-registros"):
+        with metricas.etapa("filtragem"):
+            ids = paginador.selecionar(filtros, filtro_colunas)
+        chave = chave_selecao(filtros, filtro_colunas)
+        total = len(paginador.df) if ids is None else len(ids)
+        paginas = max(1, -(-total // tamanho_pagina))
+        atual = min(pagina, paginas - 1)
+        with metricas.etapa("pagina"):
+            linhas = paginador.registros(ids, atual, tamanho_pagina, ordenacao, chave)
+    return linhas, paginas, atual if reiniciar or atual != pagina else dash.no_update
+
+def update_graphs(ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado):
+    """
+    Todas as figuras de uma seleção, na ordem dos gráficos do layout
+    """
+    return tuple(
+        obter_figura(id_grafico, ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado)
+        for id_grafico in GRAFICOS
     )
+
+def esqueleto_figura(figura):
+    """
+    Forma do layout de uma figura: "vazia" (figura_vazia, sem traces) ou "grafico"
+    """
+    dados = figura["data"] if isinstance(figura, dict) else figura.data
+    return "grafico" if len(dados) else "vazia"
+
+def atualizacao_parcial(figura):
+    """
+    Patch com apenas o que muda entre seleções: traces, anotações e linhas.
+    O layout (template, eixos, margens) já está no navegador e não é reenviado;
+    só vale entre figuras com o mesmo esqueleto (ver responder_grafico)
+    """
+    if not isinstance(figura, dict):
+        figura = figura.to_plotly_json()
+    patch = Patch()
+    patch["data"] = figura["data"]
+    patch["layout"]["annotations"] = figura["layout"].get("annotations", [])
+    patch["layout"]["shapes"] = figura["layout"].get("shapes", [])
+    return patch
+
+# ============================================================================
+# ATUALIZAÇÃO AO VIVO (NOVOS REGISTROS)
+# ============================================================================
+
+trava_ingestao = threading.Lock()
+tabela_incremental = None
+
+def atualizar_histograma(salarios_novos):
+    """
+    Soma os novos salários aos bins da seleção "Todos". Se eles saem da faixa
+    atual (ou deixam de ser inteiros), os bins do Plotly mudariam: recalcula
+    """
+    global histograma_completo, faixa_histograma
+    minimo, maximo, inteiros = faixa_histograma
+    novo_minimo, novo_maximo, novos_inteiros = faixa_salarial(salarios_novos)
     
-    fig_dist.update_layout(
-        template="plotly_white",
-        height=300,
-        margin=dict(l=20, r=20, t=20, b=20),
-        showlegend=False,
-        xaxis_title="Salário (USD)",
-        yaxis_title="Frequência",
-        bargap=0.05,
-        xaxis=dict(
-            tickformat="$,.0f",
-            tickmode="linear",
-            dtick=50000  # Marcas a cada 50k
+    if inteiros and novos_inteiros and minimo <= novo_minimo and novo_maximo <= maximo:
+        inicio, largura, contagens = histograma_completo
+        indices = np.floor((np.asarray(salarios_novos, dtype=float) - inicio) / largura).astype(np.int64)
+        histograma_completo = (inicio, largura, contagens + np.bincount(indices, minlength=len(contagens)))
+    else:
+        histograma_completo = calcular_bins_histograma(df["salary_in_usd"].to_numpy())
+        faixa_histograma = faixa_salarial(df["salary_in_usd"].to_numpy())
+
+def ingerir_registros(delta):
+    """
+    Incorpora um lote de registros novos com custo proporcional ao lote:
+    linhas anexadas aos buffers, ids às listas do índice, células somadas ao
+    cubo; do cache saem apenas as figuras cujos filtros cobrem o lote
+    """
+    global df, tabela_incremental, resumo_streaming, indice_filtros, paginador_registros, cubo_salarios, ranking_cargos
+    global versao_incremental, cargos_distintos, paises_distintos
+    if len(delta) == 0:
+        return
+    
+    with trava_ingestao:
+        if MODO_STREAMING:
+            # Resumo novo (lote + acumulado): leitores continuam com o anterior até a troca
+            resumo_streaming = ResumoSalarial(delta).mesclar(resumo_streaming)
+            cubo_salarios = resumo_streaming.cubo
+            ranking_cargos = resumo_streaming.ranking
+        else:
+            delta = preparar_colunas(delta.reset_index(drop=True), verbose=False)
+            if tabela_incremental is None:
+                tabela_incremental = TabelaIncremental(df)
+            primeiro_id = tabela_incremental.anexar(delta)
+            df = tabela_incremental.dataframe()
+            # Índice novo trocado numa única atribuição, como o cubo: requisições em
+            # andamento seguem com o anterior (df, listas e códigos coerentes entre si)
+            indice_filtros = indice_filtros.com_linhas(delta, primeiro_id, df)
+            # As permutações de ordenação não cobrem as linhas novas: recalculadas sob demanda
+            paginador_registros = PaginadorRegistros(df, indice_filtros, limite_cache_bytes=CACHE_REGISTROS_BYTES)
+            cubo_salarios = CuboSalarial(delta).mesclar(cubo_salarios)
+            ranking_cargos = RankingCargos(delta).mesclar(ranking_cargos)
+            atualizar_histograma(delta["salary_in_usd"].to_numpy())
+            cargos_distintos = cargos_distintos | valores_distintos(delta, "job_title")
+            paises_distintos = paises_distintos | valores_distintos(delta, "employee_residence")
+        versao_incremental += 1
+    
+    combinacoes = set(zip(*(delta[dim].tolist() for dim in DIMENSOES_FILTRO)))
+    
+    def afetada(chave):
+        filtros = chave[1:5]
+        return any(
+            all(
+                filtro == "all" or (valor in filtro if isinstance(filtro, tuple) else filtro == valor)
+                for filtro, valor in zip(filtros, combinacao)
+            )
+            for combinacao in combinacoes
         )
+    
+    removidas = cache_figuras.invalidar(afetada)
+    print(f"🆕 {len(delta):,} registros incorporados (versão {versao_incremental}, "
+          f"{removidas} figuras invalidadas no cache)")
+
+def aquecer_cache_figuras():
+    """
+    Pré-calcula as combinações mais comuns: tudo "all" e cada filtro isolado
+    """
+    opcoes = [cubo_salarios.valores[dim] for dim in cubo_salarios.dimensoes]
+    combinacoes = [("all", "all", "all", "all")]
+    for posicao, valores in enumerate(opcoes):
+        for valor in valores:
+            combinacao = ["all"] * 4
+            combinacao[posicao] = valor
+            combinacoes.append(tuple(combinacao))
+    
+    for combinacao in combinacoes:
+        update_graphs(*combinacao)
+    
+    stats = cache_figuras.estatisticas()
+    print(f"🔥 Cache de figuras aquecido: {len(combinacoes)} combinações, {stats['entradas']} figuras "
+          f"({stats['bytes'] / 1024:,.0f} KB)")
+
+# ============================================================================
+# REGISTRO NO APP (CALLBACKS E ROTAS)
+# ============================================================================
+
+# Entradas além dos filtros, por gráfico (a opção de OPCOES_GRAFICOS)
+ENTRADAS_EXTRAS = {
+    "grafico-top-cargos": [Input("paginacao-cargos", "active_page")],
+    "grafico-correlacao": [Input("metodo-correlacao", "value")]
+}
+
+def responder_grafico(id_grafico, entradas, esqueleto_exibido=None):
+    """
+    (figura ou Patch, esqueleto) de uma requisição (entradas: filtros + opção do gráfico).
+    Mudanças de filtro (ou da opção) entre dois gráficos com dados enviam só os dados;
+    carga inicial, dados novos e entradas ou saídas do estado vazio, a figura completa
+    (o layout da figura vazia não tem os eixos, títulos e formatos do gráfico)
+    """
+    figura = obter_figura(id_grafico, *entradas)
+    esqueleto = esqueleto_figura(figura)
+    mudou = dash.no_update if esqueleto == esqueleto_exibido else esqueleto
+    selecao_mudou = ctx.triggered_id in FILTROS_DROPDOWN or ctx.triggered_id in ("paginacao-cargos", "metodo-correlacao")
+    if selecao_mudou and esqueleto == esqueleto_exibido == "grafico":
+        return atualizacao_parcial(figura), mudou
+    return figura, mudou
+
+def registrar_callback_grafico(app, id_grafico, gerenciador=None):
+    """
+    Um callback independente por gráfico: cada um é uma requisição própria,
+    atendida em paralelo, e o gráfico mais lento não segura os demais
+    """
+    entradas = FILTROS_INPUTS + [Input("versao-dados", "data")] + ENTRADAS_EXTRAS.get(id_grafico, [])
+    if gerenciador is not None and id_grafico in GRAFICOS_SEGUNDO_PLANO:
+        return registrar_callback_segundo_plano(app, id_grafico, entradas, gerenciador)
+    
+    @app.callback(
+        Output(id_grafico, "figure"), Output(f"esqueleto-{id_grafico}", "data"),
+        entradas, State(f"esqueleto-{id_grafico}", "data")
     )
+    def atualizar_grafico(ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado, _versao, *extras):
+        *extras, esqueleto_exibido = extras
+        # Sem esperar a carga: o gráfico é preenchido quando a versão dos dados chegar
+        if not dados_prontos.is_set():
+            iniciar_carga()
+            return figura_vazia("⏳ Carregando dados..."), "vazia"
+        selecao = (ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado, *extras)
+        return responder_grafico(id_grafico, selecao, esqueleto_exibido)
     
-    # GRÁFICO 2: Evolução Temporal
-    temporal_data = df_filtrado.groupby(["work_year", "experience_label"])["salary_in_usd"].mean().reset_index()
-    fig_temporal = px.line(
-        temporal_data,
-        x="work_year",
-        y="salary_in_usd",
-        color="experience_label",
-        labels={"work_year": "Ano", "salary_in_usd": "Salário Médio (USD)", "experience_label": "Experiência"},
-        markers=True,
-        color_discrete_sequence=px.colors.qualitative.Set2
+    return atualizar_grafico
+
+def registrar_callback_segundo_plano(app, id_grafico, entradas, gerenciador):
+    """
+    Dois callbacks: o do worker responde na hora o que é leve (cache ou poucas
+    linhas) e, para o resto, só publica o pedido; um job do gerenciador calcula
+    a figura em outro processo, sem ocupar a thread do worker. Mudar qualquer
+    entrada cancela o job em andamento, e o renderer do Dash encerra o job
+    anterior da mesma saída quando um novo pedido chega
+    """
+    @app.callback(
+        Output(id_grafico, "figure"), Output(f"esqueleto-{id_grafico}", "data"), Output(f"pedido-{id_grafico}", "data"),
+        entradas, State(f"esqueleto-{id_grafico}", "data")
+    )
+    def atualizar_grafico(ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado, _versao, *extras):
+        *extras, esqueleto_exibido = extras
+        if not dados_prontos.is_set():
+            iniciar_carga()
+            return figura_vazia("⏳ Carregando dados..."), "vazia", dash.no_update
+        
+        selecao = (ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado, *extras)
+        filtros = montar_filtros(ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado)
+        if figura_pesada(id_grafico, filtros, *extras):
+            metricas.incrementar("salarios_jobs_segundo_plano_total", grafico=id_grafico)
+            # O instante garante um novo disparo mesmo para um pedido repetido
+            return dash.no_update, dash.no_update, {"entradas": selecao, "instante": time.time()}
+        return *responder_grafico(id_grafico, selecao, esqueleto_exibido), dash.no_update
+    
+    @app.callback(
+        Output(id_grafico, "figure", allow_duplicate=True),
+        Output(f"esqueleto-{id_grafico}", "data", allow_duplicate=True),
+        Input(f"pedido-{id_grafico}", "data"),
+        background=True,
+        manager=gerenciador,
+        # Gráfico esmaecido com aviso (assets/custom.css) enquanto o job roda
+        running=[(Output(id_grafico, "className"), "grafico-calculando", "")],
+        cancel=entradas,
+        prevent_initial_call=True
     )
-    fig_temporal.update_layout(
-        template="plotly_white",
-        height=350,
-        margin=dict(l=20, r=20, t=20, b=20),
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, title="")
+    def calcular_em_segundo_plano(pedido):
+        # O job é um processo filho do worker: herda os dados já carregados e grava
+        # a figura na camada em disco do cache, visível para o worker
+        figura = obter_figura(id_grafico, *pedido["entradas"])
+        return figura, esqueleto_figura(figura)
+    
+    return atualizar_grafico
+
+def criar_gerenciador_segundo_plano():
+    """
+    DiskcacheManager do Dash (jobs em processos, resultados em disco) e camada em
+    disco do cache de figuras; None se as dependências opcionais não estiverem instaladas
+    """
+    try:
+        import diskcache
+        gerenciador = dash.DiskcacheManager(diskcache.Cache(os.path.join(PASTA_SEGUNDO_PLANO, "jobs")))
+    except ImportError:
+        print('⚠️  Segundo plano requer pip install "dash[diskcache]"; os gráficos seguem no próprio worker')
+        return None
+    cache_figuras.disco = diskcache.Cache(os.path.join(PASTA_SEGUNDO_PLANO, "figuras"))
+    print(f"🧵 Figuras acima de {LIMITE_SEGUNDO_PLANO:,} registros calculadas em segundo plano ({PASTA_SEGUNDO_PLANO})")
+    return gerenciador
+
+# Gráficos filtrados no navegador no modo cliente -> função em assets/filtros_cliente.js.
+# Distribuição (bins e quantis exatos por seleção) e correlação seguem no servidor
+GRAFICOS_CLIENTE = {
+    "grafico-temporal": "temporal",
+    "grafico-top-cargos": "top_cargos",
+    "grafico-empresa": "empresa"
+}
+_agregados_calculados = {}
+
+def _celulas_cliente(cubo, limite=None):
+    """
+    Células não vazias de um cubo em colunas: posição de cada dimensão, contagem e soma
+    (None quando passam do limite)
+    """
+    posicoes, contagem, soma = cubo.celulas()
+    if limite is not None and len(contagem) > limite:
+        return None
+    return {
+        "valores": cubo.valores,
+        "posicoes": {dim: eixo.tolist() for dim, eixo in posicoes.items()},
+        "contagem": contagem.tolist(),
+        "soma": soma.tolist()
+    }
+
+def montar_agregados_cliente():
+    """
+    Payload do modo cliente: células do cubo (ano x experiência x tamanho x país) e do
+    ranking (+ cargo, até LIMITE_RANKING_CLIENTE entradas; None acima disso), rótulos,
+    parâmetros do ranking e os moldes das figuras (a figura sem filtros, de onde o
+    navegador copia layout e estilo dos traces). O histograma não entra: os bins
+    seguem o mínimo, o máximo e as bordas dos valores da seleção, que contagens por
+    célula não reproduzem
+    """
+    moldes = {}
+    for id_grafico in GRAFICOS_CLIENTE:
+        figura = obter_figura(id_grafico, "all", "all", "all", "all")
+        moldes[id_grafico] = figura if isinstance(figura, dict) else figura.to_plotly_json()
+    agregados = {
+        "dimensoes": DIMENSOES_FILTRO,
+        "cubo": _celulas_cliente(cubo_salarios),
+        "cargos": _celulas_cliente(ranking_cargos.cubo, LIMITE_RANKING_CLIENTE),
+        "rotulos": {"experience_level": experience_labels, "company_size": size_labels},
+        "cores": px.colors.qualitative.Set2,
+        "top_cargos": {"k": TOP_CARGOS_K, "minimo": TOP_CARGOS_MINIMO},
+        "moldes": moldes,
+        "vazia": figura_vazia().to_plotly_json()
+    }
+    ranking = (f"{len(agregados['cargos']['contagem']):,} do ranking" if agregados["cargos"] is not None
+               else f"ranking no servidor (mais de {LIMITE_RANKING_CLIENTE:,} entradas)")
+    print(f"📦 Agregados do modo cliente: {len(agregados['cubo']['contagem']):,} células do cubo, {ranking}")
+    return agregados
+
+def agregados_cliente():
+    """
+    Agregados da versão atual; remontados só na primeira sessão após novos registros
+    """
+    versao = versao_incremental
+    if _agregados_calculados.get("versao") != versao:
+        _agregados_calculados.update(versao=versao, agregados=montar_agregados_cliente())
+    return _agregados_calculados["agregados"]
+
+def registrar_callbacks_cliente(app):
+    """
+    O servidor só envia os agregados (na carga da página e quando os dados mudam);
+    filtros e paginação desses gráficos não geram mais requisições
+    """
+    @app.callback(Output("agregados-cliente", "data"), Input("versao-dados", "data"))
+    def enviar_agregados(versao):
+        if versao is None or not dados_prontos.is_set():
+            raise PreventUpdate
+        return agregados_cliente()
+    
+    for id_grafico, funcao in GRAFICOS_CLIENTE.items():
+        app.clientside_callback(
+            ClientsideFunction(namespace="cliente", function_name=funcao),
+            Output(id_grafico, "figure"),
+            FILTROS_INPUTS + [Input("agregados-cliente", "data")] + ENTRADAS_EXTRAS.get(id_grafico, [])
+        )
+    app.clientside_callback(
+        ClientsideFunction(namespace="cliente", function_name="paginacao"),
+        Output("paginacao-cargos", "max_value"),
+        Output("paginacao-cargos", "active_page"),
+        FILTROS_INPUTS + [Input("agregados-cliente", "data")]
     )
     
-    # GRÁFICO 3: Top 10 Cargos (CORRIGIDO - com filtro de mínimo de registros)
-    # Agrupar por cargo e calcular estatísticas
-    cargos_stats = df_filtrado.groupby("job_title").agg({
-        "salary_in_usd": ["mean", "count"]
-    }).reset_index()
-    cargos_stats.columns = ["job_title", "salary_mean", "count"]
-    
-    # Filtrar cargos com pelo menos 3 registros para evitar outliers
-    cargos_stats = cargos_stats[cargos_stats["count"] >= 3]
-    
-    # Pegar top 10
-    top_cargos = cargos_stats.nlargest(10, "salary_mean").sort_values("salary_mean")
-    
-    fig_cargos = px.bar(
-        top_cargos,
-        x="salary_mean",
-        y="job_title",
-        orientation="h",
-        labels={"salary_mean": "Salário Médio (USD)", "job_title": ""},
-        color="salary_mean",
-        color_continuous_scale="Blues",
-        hover_data={"count": True, "salary_mean": ":.2f"}
+    # Ranking fora do payload (mais de LIMITE_RANKING_CLIENTE entradas): o navegador devolve
+    # no_update e estes callbacks respondem pelo servidor; com o ranking no payload, não fazem nada
+    def ranking_no_servidor():
+        return dados_prontos.is_set() and agregados_cliente()["cargos"] is None
+    
+    @app.callback(
+        Output("grafico-top-cargos", "figure", allow_duplicate=True),
+        Output("esqueleto-grafico-top-cargos", "data", allow_duplicate=True),
+        FILTROS_INPUTS + [Input("versao-dados", "data")] + ENTRADAS_EXTRAS["grafico-top-cargos"],
+        State("esqueleto-grafico-top-cargos", "data"),
+        prevent_initial_call="initial_duplicate"
     )
-    fig_cargos.update_layout(
-        template="plotly_white",
-        height=350,
-        margin=dict(l=20, r=20, t=20, b=20),
-        showlegend=False,
-        coloraxis_showscale=False
+    def top_cargos_no_servidor(ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado, _versao,
+                               pagina, esqueleto_exibido):
+        if not ranking_no_servidor():
+            raise PreventUpdate
+        selecao = (ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado, pagina)
+        return responder_grafico("grafico-top-cargos", selecao, esqueleto_exibido)
+    
+    @app.callback(
+        Output("paginacao-cargos", "max_value", allow_duplicate=True),
+        Output("paginacao-cargos", "active_page", allow_duplicate=True),
+        FILTROS_INPUTS + [Input("versao-dados", "data")],
+        prevent_initial_call="initial_duplicate"
     )
+    def paginacao_no_servidor(ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado, _versao):
+        if not ranking_no_servidor():
+            raise PreventUpdate
+        return paginacao_ranking(ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado)
+
+def paginacao_ranking(ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado):
+    """
+    Número de páginas do ranking para os filtros; nova seleção volta à primeira página
+    """
+    filtros = montar_filtros(ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado)
+    elegiveis = ranking_cargos.total_elegiveis(filtros, TOP_CARGOS_MINIMO)
+    paginas = max(1, -(-elegiveis // TOP_CARGOS_K))
+    return paginas, 1 if ctx.triggered_id in FILTROS_DROPDOWN else dash.no_update
+
+def registrar_callbacks(app):
+    gerenciador = criar_gerenciador_segundo_plano() if SEGUNDO_PLANO else None
+    for id_grafico in GRAFICOS:
+        if MODO_CLIENTE and id_grafico in GRAFICOS_CLIENTE:
+            continue
+        registrar_callback_grafico(app, id_grafico, gerenciador)
     
-    # GRÁFICO 4: Matriz de Correlação
-    colunas_numericas = ["work_year", "salary_in_usd", "experience_level_num", "company_size_num"]
-    colunas_disponiveis = [col for col in colunas_numericas if col in df_filtrado.columns]
-    df_corr = df_filtrado[colunas_disponiveis].corr()
+    if MODO_CLIENTE:
+        registrar_callbacks_cliente(app)
+    else:
+        @app.callback(
+            Output("paginacao-cargos", "max_value"),
+            Output("paginacao-cargos", "active_page"),
+            FILTROS_INPUTS + [Input("versao-dados", "data")]
+        )
+        def atualizar_paginacao(ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado, _versao):
+            if not dados_prontos.is_set():
+                raise PreventUpdate
+            return paginacao_ranking(ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado)
     
-    labels_corr = {
-        "work_year": "Ano",
-        "salary_in_usd": "Salário",
-        "experience_level_num": "Experiência",
-        "company_size_num": "Tamanho"
-    }
+    if not MODO_STREAMING:
+        @app.callback(
+            Output("tabela-registros", "data"),
+            Output("tabela-registros", "page_count"),
+            Output("tabela-registros", "page_current"),
+            FILTROS_INPUTS + [Input("versao-dados", "data"),
+                              Input("tabela-registros", "page_current"),
+                              Input("tabela-registros", "page_size"),
+                              Input("tabela-registros", "sort_by"),
+                              Input("tabela-registros", "filter_query")]
+        )
+        def atualizar_registros(ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado, _versao,
+                                pagina, tamanho_pagina, ordenacao, filtro_colunas):
+            """
+            Página pedida dos registros da seleção; nova seleção, ordenação ou filtro de
+            coluna volta à primeira página
+            """
+            if not dados_prontos.is_set():
+                raise PreventUpdate
+            reiniciar = any(
+                gatilho.split(".")[0] in FILTROS_DROPDOWN
+                or gatilho in ("tabela-registros.sort_by", "tabela-registros.filter_query")
+                for gatilho in ctx.triggered_prop_ids
+            )
+            return registros_da_pagina(
+                montar_filtros(ano_selecionado, exp_selecionada, tamanho_selecionado, pais_selecionado),
+                0 if reiniciar else pagina or 0, tamanho_pagina, ordenacao, filtro_colunas, reiniciar
+            )
     
-    fig_corr = go.Figure(data=go.Heatmap(
-        z=df_corr.values,
-        x=[labels_corr.get(col, col) for col in df_corr.columns],
-        y=[labels_corr.get(col, col) for col in df_corr.index],
-        colorscale="RdBu",
-        zmid=0,
-        text=np.round(df_corr.values, 2),
-        texttemplate="%{text}",
-        textfont={"size": 12},
-        colorbar=dict(title="Correlação")
-    ))
-    fig_corr.update_layout(
-        template="plotly_white",
-        height=350,
-        margin=dict(l=20, r=20, t=20, b=20)
+    # O valor exibido nos dropdowns é o aplicado: "Todos" e valores específicos não convivem,
+    # e a faixa de anos acompanha o dropdown de ano (assets/selecao_filtros.js)
+    for id_filtro in FILTROS_DROPDOWN:
+        if id_filtro == "filtro-ano":
+            continue
+        app.clientside_callback(
+            ClientsideFunction(namespace="filtros", function_name="normalizar"),
+            Output(id_filtro, "value"),
+            Input(id_filtro, "value")
+        )
+    app.clientside_callback(
+        ClientsideFunction(namespace="filtros", function_name="ano"),
+        Output("filtro-ano", "value"),
+        Output("faixa-ano", "value"),
+        Input("filtro-ano", "value"),
+        Input("faixa-ano", "value"),
+        State("filtro-ano", "options")
     )
     
-    # GRÁFICO 5: Salários por Tamanho de Empresa
-    empresa_data = df_filtrado.groupby("size_label")["salary_in_usd"].mean().reset_index()
-    ordem_tamanho = {"Small": 1, "Medium": 2, "Large": 3}
-    empresa_data["ordem"] = empresa_data["size_label"].map(ordem_tamanho)
-    empresa_data = empresa_data.sort_values("ordem")
-    
-    fig_empresa = px.bar(
-        empresa_data,
-        x="size_label",
-        y="salary_in_usd",
-        labels={"size_label": "Tamanho da Empresa", "salary_in_usd": "Salário Médio (USD)"},
-        color="salary_in_usd",
-        color_continuous_scale="Greens"
+    # Tempo até o primeiro gráfico e até todos os gráficos, medidos no navegador
+    # (funções em assets/tempos_graficos.js; resultado em "tempos-graficos" e no console)
+    app.clientside_callback(
+        ClientsideFunction(namespace="tempos", function_name="marcar_inicio"),
+        Output("inicio-interacao", "data"),
+        FILTROS_INPUTS
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace="tempos", function_name="registrar_grafico"),
+        Output("tempos-graficos", "data"),
+        [Input(id_grafico, "figure") for id_grafico in GRAFICOS],
+        State("inicio-interacao", "data")
     )
-    fig_empresa.update_layout(
-        template="plotly_white",
-        height=350,
-        margin=dict(l=20, r=20, t=20, b=20),
-        showlegend=False,
-        coloraxis_showscale=False
+    
+    @app.callback(
+        [Output(id_kpi, "children") for id_kpi in IDS_KPIS]
+        + [Output(id_filtro, "options") for id_filtro in FILTROS_DROPDOWN]
+        + [Output("faixa-ano", "min"),
+           Output("faixa-ano", "max"),
+           Output("faixa-ano", "marks"),
+           Output("faixa-ano", "disabled"),
+           Output("faixa-ano", "value", allow_duplicate=True),
+           Output("versao-dados", "data"),
+           Output("intervalo-atualizacao", "interval"),
+           Output("intervalo-atualizacao", "disabled")],
+        Input("intervalo-atualizacao", "n_intervals"),
+        State("versao-dados", "data"),
+        State("filtro-ano", "value"),
+        prevent_initial_call=True
     )
+    def atualizar_kpis(_, versao_exibida, ano_selecionado):
+        """
+        KPIs, opções dos filtros e limites da faixa de anos, reenviados só quando a versão
+        dos dados mudou (fim da carga ou registros novos); a nova versão faz os gráficos se atualizarem
+        """
+        if not dados_prontos.is_set():
+            iniciar_carga()
+            raise PreventUpdate
+        versao = versao_incremental
+        if versao_exibida == versao:
+            raise PreventUpdate
+        textos = textos_kpis(obter_kpis())
+        ano_minimo, ano_maximo, marcas_anos = faixa_anos()
+        # Com "Todos" no ano, a faixa cobre também os anos novos
+        faixa = [ano_minimo, ano_maximo] if normalizar_filtro(ano_selecionado) == "all" else dash.no_update
+        return (
+            [textos[id_kpi] for id_kpi in IDS_KPIS]
+            + [opcoes_filtro(id_filtro) for id_filtro in FILTROS_DROPDOWN]
+            + [ano_minimo, ano_maximo, marcas_anos, False, faixa]
+            + [versao, INTERVALO_ATUALIZACAO_S * 1000, not ATUALIZACAO_AO_VIVO]
+        )
+
+def limite_faixa(texto, valores):
+    """
+    Limite de uma faixa "a..b" da query string no tipo dos valores da dimensão
+    (None quando omitido); ValueError se a dimensão é numérica e o texto não
+    """
+    if not texto:
+        return None
+    if valores and isinstance(valores[0], (int, float, np.number)):
+        numero = float(texto)
+        return int(numero) if numero.is_integer() else numero
+    return texto
+
+def registrar_rotas(app):
+    metricas.instrumentar(app.server)
+    
+    @app.server.route("/metrics")
+    def exportar_metricas():
+        """
+        Métricas no formato texto do Prometheus (por processo)
+        """
+        estatisticas = cache_figuras.estatisticas()
+        metricas.definir("salarios_cache_figuras_acertos_total", estatisticas["acertos"])
+        metricas.definir("salarios_cache_figuras_falhas_total", estatisticas["falhas"])
+        metricas.definir("salarios_cache_figuras_descartes_total", estatisticas["descartes"])
+        metricas.definir("salarios_cache_figuras_bytes", estatisticas["bytes"])
+        return metricas.exportar(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+    
+    @app.server.route("/saude")
+    def saude():
+        return jsonify({"status": "ok"})
+    
+    @app.server.route("/pronto")
+    def pronto():
+        """
+        Prontidão: 200 com os dados carregados e o cache aquecido, 503 enquanto carregam
+        ou aquecem (no modo sob demanda, a primeira consulta dispara a carga)
+        """
+        if dados_prontos.is_set():
+            return jsonify({"status": "pronto", "registros": int(cubo_salarios.celula({})[0])})
+        if erro_carga is not None:
+            return jsonify({"status": "erro", "erro": str(erro_carga)}), 500
+        if _dados_carregados.is_set():
+            return jsonify({"status": "aquecendo"}), 503
+        iniciar_carga()
+        return jsonify({"status": "carregando"}), 503
+    
+    @app.server.route("/api/quantis")
+    def consultar_quantis():
+        """
+        Q1, mediana, Q3 e IQR para os filtros da query string: um valor, vários
+        separados por vírgula ou uma faixa "a..b" (ex.: /api/quantis?work_year=2021..2023&employee_residence=US,GB)
+        """
+        if not dados_prontos.is_set():
+            iniciar_carga()
+            return jsonify({"status": "carregando"}), 503
+        filtros = {}
+        for dim in cubo_salarios.dimensoes:
+            # A query string chega como texto: usa o valor original (ex.: ano inteiro)
+            originais = {str(original): original for original in cubo_salarios.valores[dim]}
+            texto = request.args.get(dim, "all")
+            if ".." in texto:
+                try:
+                    de, ate = (limite_faixa(parte, cubo_salarios.valores[dim]) for parte in texto.split("..", 1))
+                except ValueError:
+                    return jsonify({"erro": f"Faixa inválida para {dim}: '{texto}' (limites numéricos esperados)"}), 400
+                valor = {"de": de, "ate": ate}
+            elif "," in texto:
+                valor = [originais.get(parte, parte) for parte in texto.split(",")]
+            else:
+                valor = originais.get(texto, texto)
+            filtros[dim] = normalizar_filtro(valor, cubo_salarios.valores[dim])
+        return jsonify({"filtros": filtros, **quantis_filtrados(filtros)})
     
-    return fig_dist, fig_temporal, fig_cargos, fig_corr, fig_empresa
+    if ATUALIZACAO_AO_VIVO:
+        @app.server.route("/api/registros", methods=["POST"])
+        def receber_registros():
+            """
+            Anexa registros (objeto ou lista de objetos JSON com as colunas do CSV)
+            """
+            registros = request.get_json(silent=True)
+            if isinstance(registros, dict):
+                registros = [registros]
+            if not isinstance(registros, list) or not registros:
+                return jsonify({"erro": "Envie um objeto ou uma lista de registros"}), 400
+            garantir_dados()
+            try:
+                total = observador_dados.anexar(registros)
+            except ValueError as e:
+                return jsonify({"erro": str(e)}), 400
+            return jsonify({"registros": total, "versao": versao_incremental}), 201
+
+def criar_app(carga=CARGA_DADOS):
+    """
+    Monta o app Dash (layout, callbacks e rotas) sem ler o dataset. A carga é
+    "segundo_plano" (padrão), "sob_demanda" (no primeiro acesso) ou "imediata"
+    """
+    with medir_etapa("app"):
+        app = dash.Dash(
+            __name__,
+            external_stylesheets=[dbc.themes.BOOTSTRAP],
+            meta_tags=[{"name": "viewport", "content": "width=device-width, initial-scale=1"}]
+        )
+        
+        app.title = "Dashboard - Salários Data Science"
+        app.layout = montar_layout
+        registrar_callbacks(app)
+        registrar_rotas(app)
+    
+    if carga == "imediata":
+        garantir_dados()
+    elif carga == "segundo_plano":
+        iniciar_carga()
+    return app
 
 # ============================================================================
 # EXECUTAR O APP
 # ============================================================================
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dashboard interativo de salários em Data Science")
+    parser.add_argument("--perfil", action="store_true",
+                        help="carrega tudo, imprime o tempo de cada etapa da inicialização e sai")
+    parser.add_argument("--limite-s", type=float, default=LIMITE_INICIALIZACAO_S,
+                        help="com --perfil, sai com código 1 se a inicialização passar desse tempo")
+    args = parser.parse_args()
+    
+    if args.perfil:
+        criar_app(carga="imediata")
+        sys.exit(0 if relatorio_inicializacao(args.limite_s) else 1)
+    
     print("\n" + "="*70)
     print("🚀 INICIANDO DASHBOARD INTERATIVO")
     print("="*70)
@@ -580,4 +1733,8 @@ if __name__ == "__main__":
     print("\n💡 Pressione CTRL+C para encerrar")
     print("="*70 + "\n")
     
+    # Com o reloader do modo debug, só o processo filho (WERKZEUG_RUN_MAIN) serve o app;
+    # o processo pai nunca recebe requisições e não precisa carregar os dados
+    carga = CARGA_DADOS if os.environ.get("WERKZEUG_RUN_MAIN") == "true" else "sob_demanda"
+    app = criar_app(carga)
     app.run(debug=True, port=8050, host='127.0.0.1')
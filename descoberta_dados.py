@@ -0,0 +1,144 @@
+"""
+Descoberta do arquivo de dados
+Ordem: variável de ambiente, último caminho resolvido (manifesto), pastas
+conhecidas e, por fim, uma única varredura com profundidade e tempo limitados
+que testa todos os nomes aceitos na mesma passada
+"""
+
+import json
+import os
+import time
+
+NOMES_POSSIVEIS = [
+    "salario_profissionais_dados.csv",
+    "salaries.csv",
+    "ds_salaries.csv",
+    "data_science_salaries.csv"
+]
+
+PASTAS_POSSIVEIS = ["", "Data", "data", "datasets", "..", "../.."]
+
+# Pastas que nunca contêm o dataset e custam caro para percorrer
+PASTAS_IGNORADAS = {"node_modules", "__pycache__", "venv", "site-packages", "proc", "sys"}
+
+PASTA_MODULO = os.path.dirname(os.path.abspath(__file__))
+ARQUIVO_MANIFESTO_DESCOBERTA = os.path.join(PASTA_MODULO, ".descoberta_dados.json")
+
+PROFUNDIDADE_BUSCA = int(os.environ.get("SALARIOS_PROFUNDIDADE_BUSCA", "3"))
+TEMPO_BUSCA_S = float(os.environ.get("SALARIOS_TEMPO_BUSCA_S", "2"))
+
+
+def _ler_manifesto():
+    try:
+        with open(ARQUIVO_MANIFESTO_DESCOBERTA, encoding="utf-8") as arquivo:
+            return json.load(arquivo).get("caminho")
+    except (OSError, ValueError):
+        return None
+
+
+def _gravar_manifesto(caminho):
+    if _ler_manifesto() == os.path.abspath(caminho):
+        return
+    try:
+        with open(ARQUIVO_MANIFESTO_DESCOBERTA, "w", encoding="utf-8") as arquivo:
+            json.dump({"caminho": os.path.abspath(caminho)}, arquivo, ensure_ascii=False)
+    except OSError:
+        pass
+
+
+def _candidatos_conhecidos():
+    # Relativos ao diretório atual e à pasta do projeto, sem repetir
+    vistos = set()
+    for base in (os.getcwd(), PASTA_MODULO):
+        for pasta in PASTAS_POSSIVEIS:
+            for nome in NOMES_POSSIVEIS:
+                caminho = os.path.normpath(os.path.join(base, pasta, nome))
+                if caminho not in vistos:
+                    vistos.add(caminho)
+                    yield caminho
+
+
+def varrer(raiz, nomes=NOMES_POSSIVEIS, profundidade=PROFUNDIDADE_BUSCA, tempo_s=TEMPO_BUSCA_S):
+    """
+    Uma única passada (os.walk) até a profundidade e o tempo dados.
+    Retorna (caminho ou None, alguns CSVs vistos, se a busca foi interrompida)
+    """
+    limite = time.perf_counter() + tempo_s
+    nomes = set(nomes)
+    raiz = os.path.abspath(raiz)
+    nivel_raiz = raiz.rstrip(os.sep).count(os.sep)
+    outros_csv = []
+
+    for pasta, subpastas, arquivos in os.walk(raiz):
+        encontrados = sorted(nomes.intersection(arquivos), key=NOMES_POSSIVEIS.index)
+        if encontrados:
+            return os.path.join(pasta, encontrados[0]), outros_csv, False
+        if len(outros_csv) < 10:
+            outros_csv.extend(
+                os.path.relpath(os.path.join(pasta, nome), raiz)
+                for nome in arquivos if nome.endswith(".csv")
+            )
+        if time.perf_counter() > limite:
+            return None, outros_csv[:10], True
+
+        if pasta.count(os.sep) - nivel_raiz >= profundidade:
+            subpastas[:] = []
+        else:
+            subpastas[:] = sorted(
+                nome for nome in subpastas
+                if not nome.startswith(".") and nome not in PASTAS_IGNORADAS
+            )
+    return None, outros_csv[:10], False
+
+
+def encontrar_arquivo_csv():
+    """
+    Procura o arquivo CSV em múltiplos locais e nomes possíveis
+    """
+    inicio = time.perf_counter()
+
+    def encontrado(caminho, origem, lembrar=True):
+        print(f"✅ Arquivo encontrado: {caminho} ({origem})")
+        print(f"📁 Caminho completo: {os.path.abspath(caminho)}")
+        print(f"⏱️  Descoberta em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+        if lembrar:
+            _gravar_manifesto(caminho)
+        return caminho
+
+    configurado = os.environ.get("SALARIOS_ARQUIVO_DADOS")
+    if configurado:
+        if not os.path.isfile(configurado):
+            raise FileNotFoundError(f"❌ SALARIOS_ARQUIVO_DADOS aponta para um arquivo inexistente: {configurado}")
+        # Escolha explícita vale só para esta execução: não substitui o manifesto
+        return encontrado(configurado, "SALARIOS_ARQUIVO_DADOS", lembrar=False)
+
+    ultimo = _ler_manifesto()
+    if ultimo and os.path.isfile(ultimo):
+        return encontrado(ultimo, "último caminho resolvido")
+
+    for caminho in _candidatos_conhecidos():
+        if os.path.isfile(caminho):
+            return encontrado(os.path.relpath(caminho), "pastas conhecidas")
+
+    print(f"\n🔎 Procurando em {os.getcwd()} (até {PROFUNDIDADE_BUSCA} níveis, {TEMPO_BUSCA_S:g}s)...")
+    caminho, outros_csv, interrompida = varrer(os.getcwd())
+    if caminho:
+        return encontrado(os.path.relpath(caminho), "busca limitada")
+
+    print("\n❌ ARQUIVO NÃO ENCONTRADO!")
+    print(f"📁 Diretório atual: {os.getcwd()}")
+    if interrompida:
+        print(f"⌛ Busca interrompida após {TEMPO_BUSCA_S:g}s (SALARIOS_TEMPO_BUSCA_S)")
+    print("\n📄 Arquivos CSV disponíveis:")
+    if outros_csv:
+        for i, arquivo in enumerate(outros_csv, 1):
+            print(f"   {i}. {arquivo}")
+    else:
+        print("   (Nenhum arquivo CSV encontrado)")
+    print(f"⏱️  Descoberta em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    raise FileNotFoundError(
+        f"\n❌ Arquivo de dados não encontrado!\n"
+        f"📁 Procurado em: {os.getcwd()}\n"
+        "💡 Verifique se o arquivo existe na pasta 'Data' ou defina SALARIOS_ARQUIVO_DADOS"
+    )
@@ -0,0 +1,234 @@
+"""
+Índice invertido sobre as dimensões de filtro do dashboard
+Cada valor de cada dimensão aponta para o array ordenado de ids das linhas
+que o contêm; um filtro vira uma interseção desses arrays seguida de um
+único gather das colunas necessárias, sem copiar o DataFrame inteiro.
+Filtros com vários valores (ou faixas) usam a coluna de códigos inteiros da
+dimensão: a pertinência é um gather numa tabela booleana indexada pelo código,
+com custo independente do número de valores escolhidos
+"""
+
+import copy
+
+import numpy as np
+import pandas as pd
+
+DIMENSOES_FILTRO = ["work_year", "experience_level", "company_size", "employee_residence"]
+
+
+def _intersecao_ordenada(menor, maior):
+    """
+    Interseção de dois arrays ordenados e sem repetição, com custo
+    proporcional ao menor deles (busca binária no maior)
+    """
+    if len(menor) == 0 or len(maior) == 0:
+        return menor[:0]
+    posicoes = np.searchsorted(maior, menor)
+    np.minimum(posicoes, len(maior) - 1, out=posicoes)
+    return menor[maior[posicoes] == menor]
+
+
+def tipo_id(total_linhas):
+    return np.int32 if total_linhas < np.iinfo(np.int32).max else np.int64
+
+
+def tipo_codigo(total_valores):
+    """
+    Menor inteiro sem sinal para os códigos; o maior valor do tipo fica
+    reservado para ausentes (NaN)
+    """
+    for tipo in (np.uint8, np.uint16):
+        if total_valores < np.iinfo(tipo).max:
+            return tipo
+    return np.uint32
+
+
+def normalizar_filtro(valor, valores=None):
+    """
+    Forma canônica de um filtro (também usada nas chaves de cache):
+    "all", um valor, ou uma tupla ordenada de valores. Aceita listas (multi-seleção;
+    "all" por último, ou lista vazia, significa todos) e faixas {"de": a, "ate": b},
+    expandidas sobre os valores conhecidos da dimensão
+    """
+    if valor is None:
+        return "all"
+    if isinstance(valor, dict):
+        de, ate = valor.get("de"), valor.get("ate")
+        valor = tuple(
+            item for item in (valores or [])
+            if (de is None or item >= de) and (ate is None or item <= ate)
+        )
+        return valor[0] if len(valor) == 1 else valor
+    if isinstance(valor, (list, tuple, set)):
+        valor = list(valor)
+        if not valor or valor[-1] == "all":
+            return "all"
+        valor = tuple(sorted(set(item for item in valor if item != "all")))
+        return valor[0] if len(valor) == 1 else valor
+    return valor
+
+
+def ordenar_ids(serie, tipo=np.int64):
+    """
+    (valores, ordem, limites, codigos): ids da coluna agrupados por valor, com os
+    ids do i-ésimo valor em ordem[limites[i]:limites[i + 1]], e o código de cada linha
+    """
+    codigos, valores = pd.factorize(serie, sort=True)
+    tipo_cod = tipo_codigo(len(valores))
+    codigos[codigos < 0] = np.iinfo(tipo_cod).max
+    codigos = codigos.astype(tipo_cod, copy=False)
+    # Ordenação estável dos códigos agrupa os ids por valor mantendo-os crescentes
+    ordem = np.argsort(codigos, kind="stable").astype(tipo, copy=False)
+    limites = np.searchsorted(codigos[ordem], np.arange(len(valores) + 1))
+    return valores.tolist(), ordem, limites, codigos
+
+
+def _anexar_buffer(buffer, ocupado, novos):
+    """
+    Copia novos para o fim do buffer, dobrando a capacidade quando esgota
+    """
+    fim = ocupado + len(novos)
+    if fim > len(buffer):
+        novo = np.empty(max(fim, 2 * len(buffer)), dtype=buffer.dtype)
+        novo[:ocupado] = buffer[:ocupado]
+        buffer = novo
+    buffer[ocupado:fim] = novos
+    return buffer, fim
+
+
+class IndiceFiltros:
+    """
+    Mapeia valor -> ids de linhas (ordenados) para cada dimensão de filtro
+    """
+
+    def __init__(self, df, dimensoes=DIMENSOES_FILTRO, ordenacoes=None):
+        self.df = df
+        self.total_linhas = len(df)
+        self.dimensoes = [dim for dim in dimensoes if dim in df.columns]
+        self._tipo_id = tipo_id(self.total_linhas)
+
+        # ordenacoes: {dim: (valores, ordem, limites, codigos)} já calculadas (ex.:
+        # arrays memory-mapped do cache colunar); as listas são apenas fatias delas
+        ordenacoes = ordenacoes or {}
+        self.listas = {}
+        self.codigos = {}
+        self._ocupacao = {}
+        self._ocupacao_codigos = {}
+        for dim in self.dimensoes:
+            valores, ordem, limites, codigos = ordenacoes.get(dim) or ordenar_ids(df[dim], self._tipo_id)
+            self.listas[dim] = dict(self._fatiar(valores, ordem, limites))
+            self.codigos[dim] = codigos
+            self._ocupacao[dim] = {}
+
+    @staticmethod
+    def _fatiar(valores, ordem, limites):
+        for i, valor in enumerate(valores):
+            yield valor, ordem[limites[i]:limites[i + 1]]
+
+    def _agrupar_ids(self, serie, primeiro_id=0):
+        """
+        Pares (valor, ids ordenados) de uma coluna; valores ausentes não são indexados
+        """
+        valores, ordem, limites, _ = ordenar_ids(serie, self._tipo_id)
+        ordem += primeiro_id
+        return self._fatiar(valores, ordem, limites)
+
+    def anexar(self, delta, primeiro_id):
+        """
+        Acrescenta as linhas novas (ids a partir de primeiro_id) às listas de cada valor.
+        As listas ganham capacidade extra, então o custo amortizado é O(delta)
+        """
+        for dim in self.dimensoes:
+            for valor, ids in self._agrupar_ids(delta[dim], primeiro_id):
+                atual = self.listas[dim].get(valor, np.empty(0, dtype=self._tipo_id))
+                buffer, fim = _anexar_buffer(*self._ocupacao[dim].get(valor, (atual, len(atual))), ids)
+                self._ocupacao[dim][valor] = (buffer, fim)
+                self.listas[dim][valor] = buffer[:fim]
+
+            # Valores novos entram no fim do dicionário: códigos antigos não mudam
+            atual = self.codigos[dim]
+            buffer, ocupado = self._ocupacao_codigos.get(dim, (atual, len(atual)))
+            ausente = np.iinfo(buffer.dtype).max
+            if len(self.listas[dim]) >= ausente:
+                buffer = buffer.astype(tipo_codigo(len(self.listas[dim])))
+                buffer[buffer == ausente] = np.iinfo(buffer.dtype).max
+                ausente = np.iinfo(buffer.dtype).max
+            novos = pd.Index(list(self.listas[dim])).get_indexer(delta[dim])
+            novos[novos < 0] = ausente
+            buffer, fim = _anexar_buffer(buffer, ocupado, novos.astype(buffer.dtype))
+            self._ocupacao_codigos[dim] = (buffer, fim)
+            self.codigos[dim] = buffer[:fim]
+        self.total_linhas += len(delta)
+
+    def com_linhas(self, delta, primeiro_id, df):
+        """
+        Novo índice com as linhas anexadas, sem alterar este: os dicionários são
+        copiados (custo proporcional aos valores distintos) e os buffers só crescem
+        além dos trechos que este índice enxerga, então leitores concorrentes seguem
+        com df, listas e códigos coerentes até a troca da referência
+        """
+        novo = copy.copy(self)
+        novo.df = df
+        novo.listas = {dim: dict(listas) for dim, listas in self.listas.items()}
+        novo.codigos = dict(self.codigos)
+        novo._ocupacao = {dim: dict(ocupacao) for dim, ocupacao in self._ocupacao.items()}
+        novo._ocupacao_codigos = dict(self._ocupacao_codigos)
+        novo.anexar(delta, primeiro_id)
+        return novo
+
+    def _pertence(self, dim, valores, codigos):
+        """
+        Máscara de pertinência: gather numa tabela booleana indexada pelo código
+        (códigos de 8/16 bits; acima disso, np.isin sobre as posições)
+        """
+        posicoes = {valor: i for i, valor in enumerate(self.listas[dim])}
+        escolhidos = [posicoes[valor] for valor in valores if valor in posicoes]
+        if codigos.dtype.itemsize > 2:
+            return np.isin(codigos, escolhidos)
+        tabela = np.zeros(np.iinfo(codigos.dtype).max + 1, dtype=bool)
+        tabela[escolhidos] = True
+        return tabela[codigos]
+
+    def selecionar(self, filtros):
+        """
+        Retorna os ids das linhas que atendem a todos os filtros, ou None
+        quando nenhum filtro está ativo (todas as linhas). Valores únicos usam as
+        listas do índice; tuplas de valores, a tabela de busca sobre os códigos
+        """
+        listas = []
+        conjuntos = []
+        for dim, valor in filtros.items():
+            if valor == "all":
+                continue
+            if isinstance(valor, tuple):
+                conjuntos.append((dim, valor))
+            else:
+                listas.append(self.listas[dim].get(valor, np.empty(0, dtype=np.int32)))
+
+        if not listas and not conjuntos:
+            return None
+
+        ids = None
+        if listas:
+            listas.sort(key=len)
+            ids = listas[0]
+            for lista in listas[1:]:
+                ids = _intersecao_ordenada(ids, lista)
+
+        # Com ids já restritos pelas listas, o gather é feito só sobre eles
+        for dim, valores in conjuntos:
+            if ids is None:
+                ids = np.flatnonzero(self._pertence(dim, valores, self.codigos[dim])).astype(self._tipo_id)
+            else:
+                ids = ids[self._pertence(dim, valores, self.codigos[dim][ids])]
+        return ids
+
+    def filtrar(self, filtros, colunas=None):
+        """
+        Gather das colunas pedidas apenas nas linhas selecionadas
+        """
+        colunas = colunas if colunas is not None else list(self.df.columns)
+        ids = self.selecionar(filtros)
+        if ids is None:
+            return pd.DataFrame({col: self.df[col] for col in colunas}, copy=False)
+        return pd.DataFrame({col: self.df[col].take(ids) for col in colunas}, copy=False)
@@ -0,0 +1,119 @@
+"""
+Ingestão em streaming para datasets maiores que a memória
+O arquivo é lido em blocos por um pipeline de geradores e cada bloco vira um
+resumo mesclável (cubo de contagens/somas e co-momentos, conjuntos distintos
+e sketch de quantis). Só os resumos permanecem em memória, nunca as linhas
+"""
+
+import argparse
+import os
+import time
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+from cubo_agregado import CuboSalarial
+from indice_filtros import DIMENSOES_FILTRO
+from ranking_cargos import RankingCargos
+from sketch_quantis import SketchQuantis
+
+TAMANHO_BLOCO = 500_000
+
+COLUNAS_STREAMING = DIMENSOES_FILTRO + ["job_title", "salary_in_usd", "years_of_experience"]
+COLUNAS_CATEGORICAS = ["experience_level", "company_size", "employee_residence", "job_title"]
+
+
+def calcular_cagr(cubo):
+    """
+    CAGR entre a média salarial do primeiro e do último ano, lido do cubo
+    """
+    media_por_ano = cubo.agrupar({}, por=["work_year"])
+    if len(media_por_ano) <= 1:
+        return 0
+    salario_inicial = media_por_ano["mean"].iloc[0]
+    salario_final = media_por_ano["mean"].iloc[-1]
+    num_anos = media_por_ano["work_year"].iloc[-1] - media_por_ano["work_year"].iloc[0]
+    return ((salario_final / salario_inicial) ** (1 / num_anos) - 1) * 100
+
+
+class ResumoSalarial:
+    """
+    Agregados mescláveis de um trecho do dataset
+    """
+
+    def __init__(self, bloco):
+        self.cubo = CuboSalarial(bloco)
+        self.ranking = RankingCargos(bloco)
+        self.cargos = set(bloco["job_title"].dropna().unique().tolist())
+        self.paises = set(bloco["employee_residence"].dropna().unique().tolist())
+        self.sketch_salarios = SketchQuantis().atualizar(bloco["salary_in_usd"].to_numpy())
+
+    def mesclar(self, outro):
+        self.cubo.mesclar(outro.cubo)
+        self.ranking.mesclar(outro.ranking)
+        self.cargos |= outro.cargos
+        self.paises |= outro.paises
+        self.sketch_salarios.mesclar(outro.sketch_salarios)
+        return self
+
+    def kpis(self):
+        total_registros, soma_salarios = self.cubo.celula({})
+        return {
+            "total_registros": total_registros,
+            "salario_medio": soma_salarios / total_registros if total_registros else np.nan,
+            "salario_mediano": self.sketch_salarios.mediana(),
+            "total_cargos": len(self.cargos),
+            "total_paises": len(self.paises),
+            "cagr": calcular_cagr(self.cubo)
+        }
+
+
+# ============================================================================
+# PIPELINE DE GERADORES
+# ============================================================================
+
+def ler_blocos(caminho_csv, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Lê apenas as colunas agregadas, já como categorias, um bloco por vez
+    """
+    with pd.read_csv(
+        caminho_csv,
+        usecols=COLUNAS_STREAMING,
+        dtype={coluna: "category" for coluna in COLUNAS_CATEGORICAS},
+        chunksize=tamanho_bloco
+    ) as leitor:
+        yield from leitor
+
+
+def resumir_blocos(blocos):
+    for bloco in blocos:
+        yield ResumoSalarial(bloco)
+
+
+def agregar_streaming(caminho_csv, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Percorre o arquivo inteiro mantendo só o resumo acumulado
+    """
+    return reduce(ResumoSalarial.mesclar, resumir_blocos(ler_blocos(caminho_csv, tamanho_bloco)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KPIs do dataset salarial em memória limitada")
+    parser.add_argument(
+        "csv", nargs="?",
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "Data", "salario_profissionais_dados.csv")
+    )
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO, help="linhas por bloco")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resumo = agregar_streaming(args.csv, args.bloco)
+    kpis = resumo.kpis()
+    print(f"📊 Total de registros: {kpis['total_registros']:,}")
+    print(f"💰 Salário médio: ${kpis['salario_medio']:,.0f}")
+    print(f"📏 Salário mediano (sketch): ${kpis['salario_mediano']:,.0f}")
+    print(f"📈 CAGR: {kpis['cagr']:+.1f}%")
+    print(f"💼 Cargos únicos: {kpis['total_cargos']}")
+    print(f"🌍 Países: {kpis['total_paises']}")
+    print(f"⏱️  Tempo: {time.perf_counter() - inicio:.2f}s")
@@ -0,0 +1,158 @@
+"""
+Métricas do dashboard no formato texto do Prometheus
+Histogramas de tempo por etapa (filtragem, agregação, correlação, figura,
+gravação no cache) e por gráfico, contadores e medidores, além do cabeçalho
+Server-Timing com as etapas de cada requisição
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g, has_request_context, request
+
+# Limites (segundos) dos buckets: de 1 ms a 10 s
+BUCKETS_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Rótulos herdados pelas etapas medidas dentro de um contexto (ex.: o gráfico atual)
+_rotulos_contexto = ContextVar("rotulos_metricas", default={})
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _formatar_rotulos(rotulos):
+    if not rotulos:
+        return ""
+    pares = ",".join(f'{nome}="{_escapar(valor)}"' for nome, valor in sorted(rotulos.items()))
+    return "{" + pares + "}"
+
+
+def _formatar_numero(valor):
+    return "+Inf" if valor == float("inf") else repr(float(valor))
+
+
+class Metricas:
+    """
+    Registro em memória (por processo) de histogramas, contadores e medidores
+    """
+
+    def __init__(self, buckets=BUCKETS_SEGUNDOS):
+        self.buckets = tuple(buckets)
+        self._trava = threading.Lock()
+        self._descricoes = {}
+        # nome -> {rótulos (tupla ordenada) -> valor ou [contagens por bucket, soma, total]}
+        self._histogramas = {}
+        self._contadores = {}
+        self._medidores = {}
+
+    def descrever(self, nome, tipo, ajuda):
+        self._descricoes[nome] = (tipo, ajuda)
+
+    def observar(self, nome, valor, **rotulos):
+        chave = tuple(sorted(rotulos.items()))
+        with self._trava:
+            serie = self._histogramas.setdefault(nome, {}).get(chave)
+            if serie is None:
+                serie = self._histogramas[nome][chave] = [[0] * len(self.buckets), 0.0, 0]
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[0][i] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def incrementar(self, nome, valor=1, **rotulos):
+        chave = tuple(sorted(rotulos.items()))
+        with self._trava:
+            series = self._contadores.setdefault(nome, {})
+            series[chave] = series.get(chave, 0) + valor
+
+    def definir(self, nome, valor, **rotulos):
+        """
+        Valor absoluto; exportado como contador se assim descrito (ex.: totais lidos de outro objeto)
+        """
+        with self._trava:
+            self._medidores.setdefault(nome, {})[tuple(sorted(rotulos.items()))] = valor
+
+    @contextmanager
+    def contexto(self, **rotulos):
+        """
+        Rótulos aplicados a todas as etapas medidas dentro do bloco
+        """
+        token = _rotulos_contexto.set({**_rotulos_contexto.get(), **rotulos})
+        try:
+            yield
+        finally:
+            _rotulos_contexto.reset(token)
+
+    @contextmanager
+    def etapa(self, etapa, nome="salarios_etapa_segundos", **rotulos):
+        """
+        Mede o bloco no histograma da etapa e soma o tempo ao Server-Timing da requisição
+        """
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            duracao = time.perf_counter() - inicio
+            self.observar(nome, duracao, etapa=etapa, **{**_rotulos_contexto.get(), **rotulos})
+            if has_request_context():
+                tempos = g.setdefault("tempos_etapas", {})
+                tempos[etapa] = tempos.get(etapa, 0.0) + duracao
+
+    def exportar(self):
+        """
+        Texto no formato de exposição do Prometheus (versão 0.0.4)
+        """
+        linhas = []
+        with self._trava:
+            grupos = [
+                ("histogram", self._histogramas),
+                ("counter", self._contadores),
+                ("gauge", self._medidores)
+            ]
+            for tipo, metricas in grupos:
+                for nome in sorted(metricas):
+                    tipo_declarado, ajuda = self._descricoes.get(nome, (tipo, ""))
+                    if ajuda:
+                        linhas.append(f"# HELP {nome} {ajuda}")
+                    linhas.append(f"# TYPE {nome} {tipo_declarado}")
+                    for chave, valor in sorted(metricas[nome].items()):
+                        rotulos = dict(chave)
+                        if tipo != "histogram":
+                            linhas.append(f"{nome}{_formatar_rotulos(rotulos)} {_formatar_numero(valor)}")
+                            continue
+                        contagens, soma, total = valor
+                        for limite, contagem in zip(self.buckets + (float("inf"),), contagens + [total]):
+                            rotulos_bucket = _formatar_rotulos({**rotulos, "le": _formatar_numero(limite)})
+                            linhas.append(f"{nome}_bucket{rotulos_bucket} {contagem}")
+                        linhas.append(f"{nome}_sum{_formatar_rotulos(rotulos)} {_formatar_numero(soma)}")
+                        linhas.append(f"{nome}_count{_formatar_rotulos(rotulos)} {total}")
+        return "\n".join(linhas) + "\n"
+
+    def instrumentar(self, servidor):
+        """
+        Mede cada requisição do servidor Flask e anexa o cabeçalho Server-Timing
+        """
+        self.descrever("salarios_requisicao_segundos", "histogram", "Duração das requisições HTTP por rota")
+
+        @servidor.before_request
+        def _iniciar_requisicao():
+            g.inicio_requisicao = time.perf_counter()
+
+        @servidor.after_request
+        def _finalizar_requisicao(resposta):
+            inicio = g.pop("inicio_requisicao", None)
+            if inicio is None:
+                return resposta
+            duracao = time.perf_counter() - inicio
+            # Regra da rota (e não o caminho) mantém a cardinalidade dos rótulos baixa
+            rota = request.url_rule.rule if request.url_rule is not None else "outras"
+            self.observar("salarios_requisicao_segundos", duracao, rota=rota, status=resposta.status_code)
+            tempos = g.pop("tempos_etapas", {})
+            entradas = [f"{etapa};dur={segundos * 1000:.2f}" for etapa, segundos in tempos.items()]
+            entradas.append(f"total;dur={duracao * 1000:.2f}")
+            resposta.headers["Server-Timing"] = ", ".join(entradas)
+            return resposta
@@ -0,0 +1,205 @@
+"""
+Motor de agregação sobre códigos inteiros
+Substitui o groupby do pandas quando a saída é pequena: cada coluna de
+agrupamento vira códigos inteiros (os da própria categoria, quando a coluna
+já é categórica), as colunas se combinam num único código por linha e
+contagem, soma, média, desvio padrão e mediana saem de kernels np.bincount,
+sem hashing de strings nem construção de índice. Usado pelo relatório por
+segmento (relatorio_segmentos.py, que roda as análises do notebook) e pela
+análise de top cargos que o dashboard imprime no console com
+SALARIOS_DIAGNOSTICOS=1; os gráficos do dashboard leem dos cubos
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+ESTATISTICAS = ("size", "count", "sum", "mean", "std", "median")
+
+
+def codificar(serie):
+    """
+    (códigos, valores) de uma coluna, com -1 para ausentes: categorias usam os
+    próprios códigos; as demais colunas, pd.factorize ordenado
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), np.asarray(serie.cat.categories)
+    codigos, valores = pd.factorize(serie, sort=True)
+    return codigos, np.asarray(valores)
+
+
+def codigos_grupo(df, por):
+    """
+    Código combinado de cada linha (-1 quando alguma coluna de `por` é ausente),
+    valores de cada coluna e forma da grade de grupos
+    """
+    codigos, valores = zip(*(codificar(df[coluna]) for coluna in por))
+    forma = tuple(len(vals) for vals in valores)
+    validas = np.logical_and.reduce([cod >= 0 for cod in codigos])
+    if validas.all():
+        return np.ravel_multi_index(codigos, forma), valores, forma
+    grupo = np.full(len(df), -1, dtype=np.intp)
+    grupo[validas] = np.ravel_multi_index([cod[validas] for cod in codigos], forma)
+    return grupo, valores, forma
+
+
+def agregar(df, por, medida="salary_in_usd", estatisticas=("count", "sum", "mean")):
+    """
+    Equivalente a df.groupby(por, observed=True)[medida].agg(estatisticas).reset_index():
+    grupos em ordem dos valores, sem grupos vazios nem chaves ausentes, e NaN da
+    medida fora de count/sum/mean/std/median (size conta as linhas)
+    """
+    return pd.DataFrame(agregar_arrays(df, por, medida, estatisticas), copy=False)
+
+
+def agregar_arrays(df, por, medida="salary_in_usd", estatisticas=("count", "sum", "mean")):
+    """
+    O mesmo que agregar, como {coluna: array} na ordem das colunas: em saídas
+    pequenas, montar o DataFrame custaria mais que a própria agregação
+    """
+    por = [por] if isinstance(por, str) else list(por)
+    desconhecidas = set(estatisticas) - set(ESTATISTICAS)
+    if desconhecidas:
+        raise ValueError(f"Estatísticas não suportadas: {sorted(desconhecidas)}")
+
+    grupo, valores, forma = codigos_grupo(df, por)
+    validas = grupo >= 0
+    todas = validas.all()
+    if not todas:
+        grupo = grupo[validas]
+    total = int(np.prod(forma))
+    chaves = None
+    if total > 2 * len(grupo) + 1024:
+        # Grade esparsa demais para bincount: recodifica só os grupos presentes
+        chaves, grupo = np.unique(grupo, return_inverse=True)
+        total = len(chaves)
+
+    linhas = np.bincount(grupo, minlength=total)
+    ocupados = np.flatnonzero(linhas)
+    posicoes = np.unravel_index(ocupados if chaves is None else chaves[ocupados], forma)
+    resultado = {coluna: vals[pos] for coluna, vals, pos in zip(por, valores, posicoes)}
+    if "size" in estatisticas:
+        resultado["size"] = linhas[ocupados]
+
+    if set(estatisticas) - {"size"}:
+        medidas = df[medida].to_numpy(dtype=float)
+        if not todas:
+            medidas = medidas[validas]
+        presentes = ~np.isnan(medidas)
+        if not presentes.all():
+            grupo, medidas = grupo[presentes], medidas[presentes]
+
+        contagem = np.bincount(grupo, minlength=total)
+        soma = np.bincount(grupo, weights=medidas, minlength=total)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            media = soma / contagem
+            for estatistica in estatisticas:
+                if estatistica == "count":
+                    resultado["count"] = contagem[ocupados]
+                elif estatistica == "sum":
+                    resultado["sum"] = soma[ocupados]
+                elif estatistica == "mean":
+                    resultado["mean"] = media[ocupados]
+                elif estatistica == "std":
+                    # Duas passadas: desvios em relação à média do grupo (ddof=1, como no pandas)
+                    quadrados = np.bincount(grupo, weights=(medidas - media[grupo]) ** 2, minlength=total)
+                    resultado["std"] = np.sqrt(np.where(contagem > 1, quadrados / (contagem - 1), np.nan))[ocupados]
+                elif estatistica == "median":
+                    resultado["median"] = _medianas(grupo, medidas, contagem)[ocupados]
+
+    return {coluna: resultado[coluna] for coluna in por + list(estatisticas)}
+
+
+def _medianas(grupo, medidas, contagem):
+    """
+    Mediana de cada grupo: valores ordenados e depois agrupados por uma ordenação
+    estável dos códigos (radix sort quando cabem em 16 bits); os dois elementos centrais
+    """
+    ordem = np.argsort(medidas)
+    grupos = grupo[ordem]
+    for tipo in (np.uint8, np.uint16):
+        if len(contagem) <= np.iinfo(tipo).max + 1:
+            grupos = grupos.astype(tipo)
+            break
+    ordenados = medidas[ordem][np.argsort(grupos, kind="stable")]
+    inicios = np.cumsum(contagem) - contagem
+    ocupados = contagem > 0
+    medianas = np.full(len(contagem), np.nan)
+    baixo = inicios[ocupados] + (contagem[ocupados] - 1) // 2
+    alto = inicios[ocupados] + contagem[ocupados] // 2
+    medianas[ocupados] = (ordenados[baixo] + ordenados[alto]) / 2
+    return medianas
+
+
+# ============================================================================
+# VERIFICAÇÃO CONTRA O PANDAS
+# ============================================================================
+
+# Agrupamentos das análises do notebook e do relatório por segmento
+AGRUPAMENTOS = [
+    ["experience_level"],
+    ["company_size"],
+    ["job_title"],
+    ["work_year"],
+    ["work_year", "experience_level"],
+    ["employee_residence", "work_year", "company_size"]
+]
+
+
+def comparar_com_pandas(df, agrupamentos=AGRUPAMENTOS, medida="salary_in_usd", estatisticas=ESTATISTICAS,
+                        tolerancia=1e-9):
+    """
+    Resultado do motor x groupby do pandas em cada agrupamento:
+    (agrupamento, iguais, maior erro relativo, tempo do motor, tempo do pandas)
+    """
+    resultados = []
+    for por in agrupamentos:
+        inicio = time.perf_counter()
+        motor = agregar(df, por, medida, estatisticas)
+        tempo_motor = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        referencia = df.groupby(por, observed=True)[medida].agg(list(estatisticas)).reset_index()
+        tempo_pandas = time.perf_counter() - inicio
+
+        iguais = len(motor) == len(referencia) and all(
+            np.array_equal(motor[coluna].to_numpy(), np.asarray(referencia[coluna], dtype=object).astype(motor[coluna].dtype))
+            for coluna in por
+        )
+        erro = 0.0
+        for estatistica in estatisticas:
+            if not iguais:
+                break
+            obtido = motor[estatistica].to_numpy(dtype=float)
+            esperado = referencia[estatistica].to_numpy(dtype=float)
+            if not np.array_equal(np.isnan(obtido), np.isnan(esperado)):
+                iguais = False
+                break
+            finitos = ~np.isnan(esperado)
+            if finitos.any():
+                erro = max(erro, float(np.max(np.abs(obtido[finitos] - esperado[finitos])
+                                              / np.maximum(np.abs(esperado[finitos]), 1))))
+        resultados.append((por, iguais and erro <= tolerancia, erro, tempo_motor, tempo_pandas))
+    return resultados
+
+
+if __name__ == "__main__":
+    from dados_salariais import carregar_dataset, preparar_colunas
+    from descoberta_dados import encontrar_arquivo_csv
+
+    parser = argparse.ArgumentParser(description="Confere o motor de agregação contra o groupby do pandas")
+    parser.add_argument("csv", nargs="?", help="arquivo de dados (padrão: o mesmo encontrado pelo dashboard)")
+    args = parser.parse_args()
+
+    df = preparar_colunas(carregar_dataset(args.csv or encontrar_arquivo_csv()), verbose=False)
+    print("="*70)
+    print(f"🧮 MOTOR DE AGREGAÇÃO x PANDAS ({len(df):,} registros, {', '.join(ESTATISTICAS)})")
+    print("="*70)
+    falhas = 0
+    for por, iguais, erro, tempo_motor, tempo_pandas in comparar_com_pandas(df):
+        falhas += not iguais
+        print(f"{'✅' if iguais else '❌'} {' x '.join(por):<45} erro relativo {erro:.1e} | "
+              f"motor {tempo_motor * 1000:7.2f} ms | pandas {tempo_pandas * 1000:7.2f} ms")
+    raise SystemExit(1 if falhas else 0)
@@ -0,0 +1,112 @@
+"""
+Observador do arquivo de dados para atualização ao vivo
+Acompanha o CSV de origem e entrega apenas as linhas anexadas desde a
+última leitura (a partir do deslocamento em bytes já consumido); também
+permite anexar registros recebidos pela API, gravando-os no mesmo arquivo
+"""
+
+import io
+import os
+import threading
+
+import pandas as pd
+
+
+class ObservadorArquivo:
+    """
+    Lê só o trecho novo do arquivo e chama ao_receber(delta) com as linhas completas
+    """
+
+    def __init__(self, caminho, ao_receber, deslocamento=None, intervalo=5.0):
+        self.caminho = caminho
+        self.ao_receber = ao_receber
+        self.intervalo = intervalo
+        self.colunas = pd.read_csv(caminho, nrows=0).columns.tolist()
+        self.deslocamento = os.path.getsize(caminho) if deslocamento is None else deslocamento
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+
+    def _consumir(self):
+        """
+        Lê as linhas completas a partir do deslocamento (chamado com a trava)
+        """
+        tamanho = os.path.getsize(self.caminho)
+        if tamanho < self.deslocamento:
+            print("⚠️  Arquivo de dados foi reescrito; reinicie o dashboard para recarregá-lo")
+            self.deslocamento = tamanho
+            return 0
+        if tamanho == self.deslocamento:
+            return 0
+
+        with open(self.caminho, "rb") as arquivo:
+            arquivo.seek(self.deslocamento)
+            dados = arquivo.read(tamanho - self.deslocamento)
+
+        # Uma linha ainda sem "\n" pode estar sendo escrita: fica para a próxima
+        fim = dados.rfind(b"\n")
+        if fim < 0:
+            return 0
+        dados = dados[:fim + 1]
+        self.deslocamento += len(dados)
+
+        delta = pd.read_csv(io.BytesIO(dados), header=None, names=self.colunas)
+        if len(delta):
+            self.ao_receber(delta)
+        return len(delta)
+
+    def verificar(self):
+        """
+        Consome as linhas completas anexadas desde a última verificação
+        """
+        with self._trava:
+            return self._consumir()
+
+    def anexar(self, registros):
+        """
+        Grava os registros no fim do arquivo e os entrega sem esperar o próximo ciclo
+        """
+        delta = pd.DataFrame(registros)
+        faltando = [coluna for coluna in self.colunas if coluna not in delta.columns]
+        if faltando:
+            raise ValueError(f"Colunas ausentes: {', '.join(faltando)}")
+        conteudo = delta[self.colunas].to_csv(header=False, index=False).encode("utf-8")
+
+        with self._trava:
+            with open(self.caminho, "rb+") as arquivo:
+                arquivo.seek(0, os.SEEK_END)
+                if arquivo.tell() > 0:
+                    arquivo.seek(-1, os.SEEK_END)
+                    if arquivo.read(1) != b"\n":
+                        arquivo.write(b"\n")
+            # Linhas anexadas por outro processo (inclusive a que acabou de ser
+            # terminada com "\n") são consumidas antes das novas
+            self._consumir()
+
+            with open(self.caminho, "ab") as arquivo:
+                arquivo.write(conteudo)
+                self.deslocamento = arquivo.tell()
+            # Relido do CSV gravado: mesmos tipos que as linhas vindas do arquivo
+            delta = pd.read_csv(io.BytesIO(conteudo), header=None, names=self.colunas)
+            self.ao_receber(delta)
+        return len(delta)
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.verificar()
+            except Exception as e:
+                print(f"⚠️  Falha ao ler novos registros: {e}")
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._executar, name="observador-dados", daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        """
+        Encerra o ciclo e espera a verificação em andamento terminar
+        """
+        self._parar.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.intervalo)
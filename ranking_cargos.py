@@ -0,0 +1,43 @@
+"""
+Ranking de cargos por salário médio em qualquer fatia dos filtros
+Um cubo com o cargo como quinta dimensão guarda contagem e soma por
+(ano x experiência x tamanho x país x cargo); o top-k com suporte mínimo
+vira a leitura de um vetor de cargos, sem tocar nas linhas
+"""
+
+from cubo_agregado import CuboSalarial
+from indice_filtros import DIMENSOES_FILTRO
+
+
+class RankingCargos:
+    """
+    Contagem e soma por cargo para cada célula dos filtros (mesclável como o cubo)
+    """
+
+    def __init__(self, df, dimensoes=DIMENSOES_FILTRO, coluna_cargo="job_title"):
+        self.coluna_cargo = coluna_cargo
+        self.cubo = CuboSalarial(df, dimensoes=list(dimensoes) + [coluna_cargo], k_quantis=0, covariaveis=())
+
+    def mesclar(self, outro):
+        self.cubo.mesclar(outro.cubo)
+        return self
+
+    def estatisticas(self, filtros, minimo=1):
+        """
+        (cargo, salary_mean, count) dos cargos com pelo menos `minimo` registros
+        """
+        grade = self.cubo.agrupar(filtros, por=[self.coluna_cargo])
+        grade = grade.rename(columns={"mean": "salary_mean"})[[self.coluna_cargo, "salary_mean", "count"]]
+        return grade[grade["count"] >= minimo]
+
+    def total_elegiveis(self, filtros, minimo=1):
+        return len(self.estatisticas(filtros, minimo))
+
+    def top(self, filtros, k=10, minimo=3, inicio=0):
+        """
+        Cargos nas posições [inicio, inicio + k) por média decrescente,
+        devolvidos em ordem crescente (barras horizontais)
+        """
+        estatisticas = self.estatisticas(filtros, minimo)
+        top = estatisticas.nlargest(inicio + k, "salary_mean").iloc[inicio:]
+        return top.sort_values("salary_mean")
@@ -0,0 +1,265 @@
+"""
+Relatório por segmento, sem notebook e sem interface
+Roda as análises do main.ipynb enviadas ao RH (estatísticas descritivas,
+quartis e IQR, salário por nível de experiência e por tamanho de empresa,
+cargos mais bem pagos com ao menos 3 registros e correlação entre anos de
+experiência e salário) para cada segmento (país x ano x tamanho, por padrão).
+O dataset é carregado uma vez, pela mesma camada de dados do dashboard, antes
+de criar o pool de processos: com fork os workers herdam as colunas
+memory-mapped e o índice de filtros sem copiá-los. As agregações por grupo
+usam o motor de códigos inteiros (motor_agregacao), sem groupby do pandas
+"""
+
+import argparse
+import gc
+import importlib.util
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from dados_salariais import carregar_dataset, ordenacoes_do_cache, preparar_colunas
+from descoberta_dados import encontrar_arquivo_csv
+from indice_filtros import IndiceFiltros
+from motor_agregacao import agregar_arrays
+
+DIMENSOES_SEGMENTO = ["employee_residence", "work_year", "company_size"]
+COLUNAS_ANALISE = ["salary_in_usd", "experience_level", "company_size", "job_title", "years_of_experience"]
+
+# Critérios do notebook para o ranking de cargos
+TOP_CARGOS = 10
+MINIMO_CARGO = 3
+
+# Estado de cada processo: montado no principal (herdado no fork) ou pelo inicializador
+df = None
+indice = None
+dimensoes = None
+
+
+def carregar(caminho_csv, dimensoes_segmento):
+    """
+    Dataset (cache colunar quando válido) e índice sobre as dimensões dos segmentos
+    """
+    global df, indice, dimensoes
+    df = preparar_colunas(carregar_dataset(caminho_csv), verbose=False)
+    dimensoes = list(dimensoes_segmento)
+    indice = IndiceFiltros(df, dimensoes=dimensoes, ordenacoes=ordenacoes_do_cache(caminho_csv, len(df)))
+
+
+def _iniciar_worker(caminho_csv, dimensoes_segmento):
+    # Sem fork (spawn), cada worker carrega o dataset por conta própria
+    if df is None:
+        carregar(caminho_csv, dimensoes_segmento)
+
+
+def _numero(valor):
+    """
+    Escalar NumPy/pandas -> tipo nativo; NaN vira None (null no JSON)
+    """
+    if hasattr(valor, "item"):
+        valor = valor.item()
+    if isinstance(valor, float) and math.isnan(valor):
+        return None
+    return valor
+
+
+def _estatisticas_por(linhas, coluna):
+    grupos = agregar_arrays(linhas, [coluna], estatisticas=("mean", "median", "std", "count"))
+    return [
+        {coluna: _numero(valor), "media": _numero(media), "mediana": _numero(mediana),
+         "desvio_padrao": _numero(desvio), "registros": int(registros)}
+        for valor, media, mediana, desvio, registros in zip(*grupos.values())
+    ]
+
+
+def _correlacao(x, y):
+    # Segmentos de uma linha ou com variável constante não têm correlação (null)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return _numero(x.corr(y)) if len(x) > 1 else None
+
+
+def analisar(linhas, top=TOP_CARGOS, minimo_cargo=MINIMO_CARGO):
+    """
+    Análises do notebook sobre as linhas de um segmento
+    """
+    # Os mesmos números de describe() (quartis por interpolação linear), direto no NumPy:
+    # em segmentos pequenos o custo fixo do describe domina
+    salarios = linhas["salary_in_usd"].to_numpy(dtype=float)
+    minimo, q1, mediana, q3, maximo = np.percentile(salarios, [0, 25, 50, 75, 100])
+    media = salarios.mean()
+    desvio = salarios.std(ddof=1) if len(salarios) > 1 else math.nan
+    estatisticas = {
+        "registros": len(salarios),
+        "media": media,
+        "mediana": mediana,
+        "desvio_padrao": desvio,
+        "minimo": minimo,
+        "maximo": maximo,
+        "amplitude": maximo - minimo,
+        "coef_variacao": desvio / media * 100 if media else math.nan,
+        "q1": q1,
+        "q3": q3,
+        "iqr": q3 - q1
+    }
+
+    cargos = agregar_arrays(linhas, ["job_title"], estatisticas=("mean", "median", "count"))
+    elegiveis = np.flatnonzero(cargos["count"] >= minimo_cargo)
+    # Média decrescente; empates ficam na ordem dos cargos
+    melhores = elegiveis[np.argsort(-cargos["mean"][elegiveis], kind="stable")][:top]
+
+    return {
+        "estatisticas": {nome: _numero(valor) for nome, valor in estatisticas.items()},
+        "por_experiencia": _estatisticas_por(linhas, "experience_level"),
+        "por_tamanho": _estatisticas_por(linhas, "company_size"),
+        "top_cargos": [
+            {"job_title": cargo, "media": _numero(media), "mediana": _numero(mediana), "registros": _numero(registros)}
+            for cargo, media, mediana, registros in zip(*(valores[melhores] for valores in cargos.values()))
+        ],
+        "correlacao_experiencia_salario": _correlacao(linhas["years_of_experience"], linhas["salary_in_usd"])
+    }
+
+
+def analisar_segmento(valores):
+    """
+    Tarefa de um worker: seleciona o segmento pelo índice e roda as análises
+    """
+    segmento = dict(zip(dimensoes, valores))
+    linhas = indice.filtrar(segmento, colunas=COLUNAS_ANALISE)
+    return {"segmento": {dim: _numero(valor) for dim, valor in segmento.items()}, **analisar(linhas)}
+
+
+def listar_segmentos(minimo_registros=1):
+    """
+    Combinações das dimensões presentes nos dados, com ao menos minimo_registros linhas
+    """
+    grupos = agregar_arrays(df, dimensoes, estatisticas=("size",))
+    mantidos = grupos["size"] >= minimo_registros
+    return list(zip(*(grupos[dim][mantidos] for dim in dimensoes)))
+
+
+# ============================================================================
+# SAÍDA
+# ============================================================================
+
+def _tabelas(resultados):
+    """
+    Resultados achatados em uma tabela por análise, com as dimensões do segmento em cada linha
+    """
+    resumo, por_experiencia, por_tamanho, top_cargos = [], [], [], []
+    for resultado in resultados:
+        segmento = resultado["segmento"]
+        resumo.append({
+            **segmento, **resultado["estatisticas"],
+            "correlacao_experiencia_salario": resultado["correlacao_experiencia_salario"]
+        })
+        por_experiencia.extend({**segmento, **linha} for linha in resultado["por_experiencia"])
+        por_tamanho.extend({**segmento, **linha} for linha in resultado["por_tamanho"])
+        top_cargos.extend({**segmento, "posicao": i, **linha} for i, linha in enumerate(resultado["top_cargos"], 1))
+    return {
+        "resumo": pd.DataFrame(resumo),
+        "por_experiencia": pd.DataFrame(por_experiencia),
+        "por_tamanho": pd.DataFrame(por_tamanho),
+        "top_cargos": pd.DataFrame(top_cargos)
+    }
+
+
+def parquet_disponivel():
+    return any(importlib.util.find_spec(motor) is not None for motor in ("pyarrow", "fastparquet"))
+
+
+def gravar(resultados, execucao, pasta, formatos):
+    """
+    JSON com todos os segmentos e/ou um arquivo Parquet por análise
+    """
+    os.makedirs(pasta, exist_ok=True)
+    arquivos = []
+    if "json" in formatos:
+        caminho = os.path.join(pasta, "segmentos.json")
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump({"execucao": execucao, "segmentos": resultados}, arquivo, ensure_ascii=False, indent=1)
+        arquivos.append(caminho)
+    if "parquet" in formatos:
+        for nome, tabela in _tabelas(resultados).items():
+            caminho = os.path.join(pasta, f"{nome}.parquet")
+            tabela.to_parquet(caminho, index=False)
+            arquivos.append(caminho)
+    return arquivos
+
+
+# ============================================================================
+# EXECUÇÃO
+# ============================================================================
+
+def gerar_relatorio(caminho_csv, dimensoes_segmento=DIMENSOES_SEGMENTO, processos=None, minimo_registros=1):
+    """
+    Carrega uma vez, distribui os segmentos num pool de processos e devolve
+    (resultados na ordem dos segmentos, metadados da execução)
+    """
+    processos = processos or os.cpu_count() or 1
+    inicio = time.perf_counter()
+    carregar(caminho_csv, dimensoes_segmento)
+    tempo_carga = time.perf_counter() - inicio
+    segmentos = listar_segmentos(minimo_registros)
+    print(f"📊 {len(df):,} registros | {len(segmentos):,} segmentos ({' x '.join(dimensoes)}) | "
+          f"carga em {tempo_carga:.2f}s")
+
+    inicio = time.perf_counter()
+    if processos == 1:
+        resultados = [analisar_segmento(valores) for valores in segmentos]
+    else:
+        metodos = multiprocessing.get_all_start_methods()
+        contexto = multiprocessing.get_context("fork" if "fork" in metodos else "spawn")
+        # Objetos já montados fora do coletor: coletas nos workers não desfazem o compartilhamento
+        gc.freeze()
+        with contexto.Pool(processos, initializer=_iniciar_worker, initargs=(caminho_csv, dimensoes)) as pool:
+            lote = max(1, len(segmentos) // (processos * 8))
+            resultados = list(pool.imap(analisar_segmento, segmentos, chunksize=lote))
+    tempo_analise = time.perf_counter() - inicio
+
+    execucao = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "arquivo": os.path.abspath(caminho_csv),
+        "registros": len(df),
+        "dimensoes": dimensoes,
+        "segmentos": len(segmentos),
+        "processos": processos,
+        "tempo_carga_s": tempo_carga,
+        "tempo_analise_s": tempo_analise,
+        "segmentos_s": len(segmentos) / tempo_analise if tempo_analise else None
+    }
+    return resultados, execucao
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Análises do notebook para cada segmento do dataset salarial")
+    parser.add_argument("csv", nargs="?", help="arquivo de dados (padrão: o mesmo encontrado pelo dashboard)")
+    parser.add_argument("--dimensoes", default=",".join(DIMENSOES_SEGMENTO), help="colunas que definem os segmentos")
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 1, help="tamanho do pool")
+    parser.add_argument("--minimo-registros", type=int, default=1, help="ignora segmentos menores")
+    parser.add_argument("--formato", choices=["json", "parquet", "ambos"], default="json")
+    parser.add_argument("--saida", default="relatorios_segmentos", help="pasta de saída")
+    args = parser.parse_args()
+
+    formatos = ["json", "parquet"] if args.formato == "ambos" else [args.formato]
+    # Verificado antes de processar, para não perder a execução na gravação
+    if "parquet" in formatos and not parquet_disponivel():
+        print("❌ Parquet requer pyarrow ou fastparquet (pip install pyarrow)")
+        sys.exit(1)
+
+    print("="*70)
+    print("📑 RELATÓRIO POR SEGMENTO")
+    print("="*70)
+    resultados, execucao = gerar_relatorio(
+        args.csv or encontrar_arquivo_csv(), args.dimensoes.split(","), args.processos, args.minimo_registros
+    )
+    arquivos = gravar(resultados, execucao, args.saida, formatos)
+    print(f"⚡ {execucao['segmentos']:,} segmentos em {execucao['tempo_analise_s']:.2f}s com "
+          f"{execucao['processos']} processo(s): {execucao['segmentos_s']:.1f} segmentos/s")
+    for caminho in arquivos:
+        print(f"💾 {caminho}")
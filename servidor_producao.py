@@ -0,0 +1,255 @@
+"""
+Servidor de produção com vários processos (gunicorn)
+O processo principal garante o cache colunar (colunas, colunas derivadas e
+ordenações do índice de filtros), importa o app e mapeia esses arquivos .npy
+em modo somente leitura antes do fork. Os workers herdam o mapeamento e as
+estruturas já montadas (copy-on-write): as colunas ficam uma única vez no
+cache de páginas do sistema, então a memória quase não cresce com os workers
+"""
+
+import argparse
+import gc
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from dados_salariais import cache_valido, construir_cache, caminho_cache
+from descoberta_dados import encontrar_arquivo_csv
+
+GRAFICOS = ["grafico-distribuicao", "grafico-temporal", "grafico-top-cargos", "grafico-correlacao", "grafico-empresa"]
+FILTROS = ["filtro-ano", "filtro-experiencia", "filtro-tamanho", "filtro-pais"]
+# Entradas além dos filtros, com o valor padrão, nos gráficos que as têm
+ENTRADAS_EXTRAS = {
+    "grafico-top-cargos": [{"id": "paginacao-cargos", "property": "active_page", "value": 1}],
+    "grafico-correlacao": [{"id": "metodo-correlacao", "property": "value", "value": "pearson"}]
+}
+
+
+def preparar_cache_compartilhado():
+    """
+    Garante o cache colunar antes do fork, para que nenhum worker faça o parse
+    """
+    caminho = encontrar_arquivo_csv()
+    if cache_valido(caminho) is None:
+        print("💾 Construindo o cache colunar compartilhado...")
+        construir_cache(caminho)
+    print(f"🗂️  Workers vão mapear: {caminho_cache(caminho)}")
+    # Os workers herdam o caminho e pulam a descoberta
+    os.environ["SALARIOS_ARQUIVO_DADOS"] = os.path.abspath(caminho)
+    return caminho
+
+
+def servir(workers, host="0.0.0.0", porta=8050, threads=1):
+    """
+    Com atualização ao vivo não há preload: o observador é uma thread, que não
+    sobrevive ao fork, então cada worker carrega e observa os dados por conta própria
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        print("❌ gunicorn não está instalado (pip install gunicorn; disponível apenas em Linux/macOS)")
+        sys.exit(1)
+
+    preparar_cache_compartilhado()
+    preload = os.environ.get("SALARIOS_ATUALIZACAO_AO_VIVO", "0") != "1"
+
+    class AplicacaoGunicorn(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{porta}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("threads", threads)
+            # Preload: app e dados montados uma vez no processo principal, antes do fork
+            self.cfg.set("preload_app", preload)
+
+        def load(self):
+            import dashboard_salarios
+            servidor = dashboard_salarios.criar_app(carga="imediata").server
+            if preload:
+                # Tira os objetos já criados do coletor de lixo: sem isso cada coleta
+                # nos workers escreve nos cabeçalhos e desfaz o compartilhamento das páginas
+                gc.freeze()
+            return servidor
+
+    print(f"🚀 {workers} worker(s) em http://{host}:{porta}/")
+    AplicacaoGunicorn().run()
+
+
+# ============================================================================
+# BENCHMARK DE VAZÃO
+# ============================================================================
+
+def _pss_kb(pid):
+    """
+    PSS (memória proporcional: páginas compartilhadas divididas entre os processos)
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as arquivo:
+            for linha in arquivo:
+                if linha.startswith("Pss:"):
+                    return int(linha.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def _processos(pid):
+    filhos = []
+    try:
+        for tarefa in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tarefa}/children") as arquivo:
+                filhos.extend(int(filho) for filho in arquivo.read().split())
+    except OSError:
+        pass
+    return [pid] + [neto for filho in filhos for neto in _processos(filho)]
+
+
+def memoria_total_mb(pid):
+    pss = [_pss_kb(processo) for processo in _processos(pid)]
+    if any(valor is None for valor in pss):
+        return None
+    return sum(pss) / 1024
+
+
+def _opcoes_filtros(conexao):
+    conexao.request("GET", "/_dash-layout")
+    layout = json.loads(conexao.getresponse().read())
+    opcoes = {}
+
+    def percorrer(no):
+        if isinstance(no, dict):
+            props = no.get("props", {})
+            if props.get("id") in FILTROS:
+                opcoes[props["id"]] = [opcao["value"] for opcao in props.get("options", [])]
+            for valor in no.values():
+                percorrer(valor)
+        elif isinstance(no, list):
+            for valor in no:
+                percorrer(valor)
+
+    percorrer(layout)
+    return [opcoes[id_filtro] for id_filtro in FILTROS]
+
+
+def _corpo_callback(grafico, valores):
+    # Gráfico já exibido com dados: a mudança de filtro responde com o Patch, como no navegador
+    return json.dumps({
+        "output": f"..{grafico}.figure...esqueleto-{grafico}.data..",
+        "outputs": [{"id": grafico, "property": "figure"}, {"id": f"esqueleto-{grafico}", "property": "data"}],
+        "inputs": [
+            {"id": id_filtro, "property": "value", "value": valor} for id_filtro, valor in zip(FILTROS, valores)
+        ] + [{"id": "versao-dados", "property": "data", "value": 0}] + ENTRADAS_EXTRAS.get(grafico, []),
+        "changedPropIds": ["filtro-ano.value"],
+        "state": [{"id": f"esqueleto-{grafico}", "property": "data", "value": "grafico"}]
+    })
+
+
+def medir_vazao(host, porta, duracao_s=10, concorrencia=8, semente=0):
+    """
+    Seleções por segundo, cada uma com as 5 requisições de gráfico que o
+    navegador faz (o equivalente a uma chamada de update_graphs)
+    """
+    opcoes = _opcoes_filtros(http.client.HTTPConnection(host, porta, timeout=60))
+    fim = time.perf_counter() + duracao_s
+    selecoes = [0] * concorrencia
+    erros = [0] * concorrencia
+
+    def cliente(i):
+        aleatorio = random.Random(semente + i)
+        conexao = http.client.HTTPConnection(host, porta, timeout=60)
+        while time.perf_counter() < fim:
+            # Cada filtro fica em "Todos" metade das vezes, como na navegação real
+            valores = [aleatorio.choice(valores) if aleatorio.random() < 0.5 else "all" for valores in opcoes]
+            for grafico in GRAFICOS:
+                conexao.request("POST", "/_dash-update-component", _corpo_callback(grafico, valores),
+                                {"Content-Type": "application/json"})
+                resposta = conexao.getresponse()
+                resposta.read()
+                if resposta.status != 200:
+                    erros[i] += 1
+            selecoes[i] += 1
+
+    inicio = time.perf_counter()
+    threads = [threading.Thread(target=cliente, args=(i,)) for i in range(concorrencia)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    decorrido = time.perf_counter() - inicio
+    return sum(selecoes) / decorrido, sum(erros)
+
+
+def _aguardar_pronto(host, porta, processo, limite_s=120):
+    limite = time.perf_counter() + limite_s
+    while time.perf_counter() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError("Servidor encerrou antes de ficar pronto")
+        try:
+            conexao = http.client.HTTPConnection(host, porta, timeout=5)
+            conexao.request("GET", "/pronto")
+            if conexao.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError("Servidor não ficou pronto a tempo")
+
+
+def benchmark(lista_workers, duracao_s=10, concorrencia=8, porta=8765, com_cache=False):
+    """
+    Sobe o servidor com cada número de workers e mede vazão e memória (PSS)
+    """
+    preparar_cache_compartilhado()
+    ambiente = dict(os.environ)
+    if not com_cache:
+        # Sem o cache de figuras, mede o cálculo dos gráficos e não só o cache
+        ambiente["SALARIOS_CACHE_FIGURAS_MB"] = "0"
+
+    resultados = []
+    for workers in lista_workers:
+        processo = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--workers", str(workers),
+             "--host", "127.0.0.1", "--porta", str(porta)],
+            env=ambiente, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            _aguardar_pronto("127.0.0.1", porta, processo)
+            vazao, erros = medir_vazao("127.0.0.1", porta, duracao_s, concorrencia)
+            memoria = memoria_total_mb(processo.pid)
+        finally:
+            processo.terminate()
+            processo.wait()
+        resultados.append({"workers": workers, "selecoes_s": vazao, "memoria_mb": memoria, "erros": erros})
+        memoria_txt = f"{memoria:8.1f} MB" if memoria is not None else "       n/d"
+        print(f"   {workers:>3} worker(s) | {vazao:8.1f} seleções/s | {vazao * len(GRAFICOS):8.1f} req/s "
+              f"| PSS total {memoria_txt} | erros: {erros}")
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor de produção (gunicorn) e benchmark de vazão")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads", type=int, default=1, help="threads por worker")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--porta", type=int, default=8050)
+    parser.add_argument("--benchmark", action="store_true", help="mede a vazão para cada número de workers")
+    parser.add_argument("--lista-workers", default="1,2,4", help="números de workers do benchmark")
+    parser.add_argument("--duracao", type=float, default=10, help="segundos de medição por configuração")
+    parser.add_argument("--concorrencia", type=int, default=8, help="clientes simultâneos no benchmark")
+    parser.add_argument("--com-cache", action="store_true", help="mantém o cache de figuras no benchmark")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print("="*70)
+        print("📈 BENCHMARK DE VAZÃO (seleções = 5 requisições de gráfico)")
+        print("="*70)
+        benchmark(
+            [int(valor) for valor in args.lista_workers.split(",")],
+            args.duracao, args.concorrencia, com_cache=args.com_cache
+        )
+    else:
+        servir(args.workers, args.host, args.porta, args.threads)
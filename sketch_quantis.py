@@ -0,0 +1,130 @@
+"""
+Sketch de quantis mesclável (KLL) para medianas e quartis em memória limitada
+Cada nível guarda itens com peso 2^nível; quando um nível passa da sua
+capacidade, ele é ordenado e metade dos itens (posições pares ou ímpares,
+sorteadas) sobe para o nível seguinte com o dobro do peso.
+Com k=200 o erro de rank normalizado fica em torno de 1,65%
+(estimativa publicada pela Apache DataSketches para o KLL)
+"""
+
+import numpy as np
+
+FATOR_CAPACIDADE = 2 / 3
+
+
+class SketchQuantis:
+    """
+    Sketch KLL sobre valores numéricos; exato enquanto couber em k itens
+    """
+
+    def __init__(self, k=200, semente=None):
+        self.k = k
+        self.total = 0
+        self.niveis = [np.empty(0)]
+        self._aleatorio = np.random.default_rng(semente)
+
+    def _capacidade(self, nivel):
+        altura = len(self.niveis)
+        return max(2, int(np.ceil(self.k * FATOR_CAPACIDADE ** (altura - 1 - nivel))))
+
+    def atualizar(self, valores):
+        """
+        Inclui um lote de valores (array) no nível base e compacta se necessário
+        """
+        valores = np.asarray(valores, dtype=float).ravel()
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            return self
+        self.total += len(valores)
+        self.niveis[0] = np.concatenate([self.niveis[0], valores])
+        self._compactar()
+        return self
+
+    def mesclar(self, outro):
+        """
+        Junta outro sketch nível a nível (resultado equivalente a ter visto os dois fluxos)
+        """
+        while len(self.niveis) < len(outro.niveis):
+            self.niveis.append(np.empty(0))
+        for nivel, itens in enumerate(outro.niveis):
+            self.niveis[nivel] = np.concatenate([self.niveis[nivel], itens])
+        self.total += outro.total
+        self._compactar()
+        return self
+
+    @classmethod
+    def combinar(cls, sketches, k=200, semente=None):
+        """
+        Novo sketch com a união de vários (ex.: células de um cubo), compactado
+        uma única vez; os sketches de entrada não são alterados
+        """
+        resultado = cls(k, semente)
+        sketches = [sketch for sketch in sketches if sketch.total]
+        if not sketches:
+            return resultado
+        altura = max(len(sketch.niveis) for sketch in sketches)
+        resultado.niveis = [
+            np.concatenate([sketch.niveis[nivel] for sketch in sketches if nivel < len(sketch.niveis)])
+            for nivel in range(altura)
+        ]
+        resultado.total = sum(sketch.total for sketch in sketches)
+        resultado._compactar()
+        return resultado
+
+    def _compactar(self):
+        nivel = 0
+        while nivel < len(self.niveis):
+            itens = self.niveis[nivel]
+            if len(itens) > self._capacidade(nivel):
+                if nivel + 1 == len(self.niveis):
+                    self.niveis.append(np.empty(0))
+                itens = np.sort(itens)
+                # Número ímpar de itens: o último permanece no nível atual
+                sobra = itens[-1:] if len(itens) % 2 else itens[:0]
+                pares = itens[:len(itens) - len(sobra)]
+                promovidos = pares[self._aleatorio.integers(2)::2]
+                self.niveis[nivel] = sobra
+                self.niveis[nivel + 1] = np.concatenate([self.niveis[nivel + 1], promovidos])
+            nivel += 1
+
+    @property
+    def exato(self):
+        return len(self.niveis) == 1
+
+    def erro_rank(self):
+        """
+        Erro de rank normalizado esperado (fração): 0 enquanto exato;
+        senão a aproximação 2.446 / k^0.9433 da Apache DataSketches (~1,65% com k=200)
+        """
+        return 0.0 if self.exato else 2.446 / self.k ** 0.9433
+
+    def _itens_ponderados(self):
+        itens = np.concatenate(self.niveis)
+        pesos = np.concatenate([
+            np.full(len(nivel), 2 ** altura, dtype=np.int64)
+            for altura, nivel in enumerate(self.niveis)
+        ])
+        ordem = np.argsort(itens, kind="stable")
+        return itens[ordem], np.cumsum(pesos[ordem])
+
+    def quantis(self, qs):
+        """
+        Quantis aproximados; enquanto o sketch é exato, igual a np.quantile (linear)
+        """
+        qs = np.atleast_1d(np.asarray(qs, dtype=float))
+        if self.total == 0:
+            return np.full(len(qs), np.nan)
+        if self.exato:
+            return np.quantile(self.niveis[0], qs)
+        itens, acumulado = self._itens_ponderados()
+        posicoes = np.searchsorted(acumulado, qs * acumulado[-1], side="left")
+        return itens[np.minimum(posicoes, len(itens) - 1)]
+
+    def quantil(self, q):
+        return float(self.quantis([q])[0])
+
+    def mediana(self):
+        return self.quantil(0.5)
+
+    def tamanho(self):
+        return sum(len(nivel) for nivel in self.niveis)
@@ -0,0 +1,94 @@
+"""
+Tabela com colunas em buffers crescentes para ingestão incremental
+Cada coluna vive num array NumPy com capacidade extra (dobrada quando
+esgota); anexar linhas custa O(delta) amortizado e o DataFrame exposto
+é apenas uma visão sobre os buffers, sem cópia das linhas existentes
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _tipo_codigos(total_categorias):
+    """
+    Mesmo dtype de códigos que o pandas usa para esse número de categorias
+    """
+    for tipo in (np.int8, np.int16, np.int32):
+        if total_categorias < np.iinfo(tipo).max:
+            return tipo
+    return np.int64
+
+
+class TabelaIncremental:
+    """
+    Buffers por coluna; categorias novas entram no fim do dicionário
+    """
+
+    def __init__(self, df, folga=0.25):
+        self.linhas = len(df)
+        self._capacidade = max(16, int(self.linhas * (1 + folga)))
+        self._buffers = {}
+        self._categorias = {}
+
+        for nome in df.columns:
+            serie = df[nome]
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                self._categorias[nome] = serie.cat.categories.tolist()
+                valores = serie.cat.codes.to_numpy()
+            else:
+                valores = serie.to_numpy()
+            buffer = np.empty(self._capacidade, dtype=valores.dtype)
+            buffer[:self.linhas] = valores
+            self._buffers[nome] = buffer
+
+    def _garantir_capacidade(self, necessario):
+        if necessario <= self._capacidade:
+            return
+        self._capacidade = max(necessario, 2 * self._capacidade)
+        for nome, buffer in self._buffers.items():
+            novo = np.empty(self._capacidade, dtype=buffer.dtype)
+            novo[:self.linhas] = buffer[:self.linhas]
+            self._buffers[nome] = novo
+
+    def _codificar(self, nome, serie):
+        categorias = self._categorias[nome]
+        novos = pd.Index(serie.dropna().unique().tolist()).difference(pd.Index(categorias))
+        categorias.extend(novos.tolist())
+
+        tipo = _tipo_codigos(len(categorias))
+        if np.dtype(tipo).itemsize > self._buffers[nome].dtype.itemsize:
+            self._buffers[nome] = self._buffers[nome].astype(tipo)
+        return pd.Index(categorias).get_indexer(serie).astype(tipo)
+
+    def anexar(self, delta):
+        """
+        Acrescenta as linhas de delta (mesmas colunas) ao fim da tabela
+        """
+        inicio = self.linhas
+        fim = inicio + len(delta)
+        self._garantir_capacidade(fim)
+
+        for nome, buffer in self._buffers.items():
+            if nome in self._categorias:
+                valores = self._codificar(nome, delta[nome])
+            else:
+                valores = delta[nome].to_numpy()
+                tipo = np.result_type(buffer.dtype, valores.dtype)
+                if tipo != buffer.dtype:
+                    buffer = self._buffers[nome] = buffer.astype(tipo)
+            self._buffers[nome][inicio:fim] = valores
+
+        self.linhas = fim
+        return inicio
+
+    def dataframe(self):
+        """
+        DataFrame sobre as visões [:linhas] dos buffers (sem copiar)
+        """
+        colunas = {}
+        for nome, buffer in self._buffers.items():
+            valores = buffer[:self.linhas]
+            if nome in self._categorias:
+                valores = pd.Categorical.from_codes(valores, categories=self._categorias[nome], validate=False)
+            colunas[nome] = valores
+        return pd.DataFrame(colunas, copy=False)
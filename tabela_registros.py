@@ -0,0 +1,282 @@
+"""
+Registros da seleção, paginados no servidor
+Cada página busca só a janela de ids pedida: os ids da seleção vêm do índice
+de filtros, os filtros por coluna da tabela (filter_query do DataTable) são
+avaliados sobre as categorias e expandidos pelos códigos, e a ordem vem de
+uma permutação pré-calculada por coluna (ids ordenados pelo valor), filtrada
+pela seleção. Seleções pequenas são ordenadas direto. Os ids da seleção e a
+seleção ordenada ficam num LRU limitado por bytes: só a primeira página de uma
+seleção (ou ordenação) percorre as linhas; as seguintes são apenas fatias
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from indice_filtros import tipo_codigo, tipo_id
+
+COLUNAS_REGISTROS = [
+    "work_year", "experience_level", "job_title", "salary_in_usd",
+    "employee_residence", "company_location", "company_size", "years_of_experience"
+]
+
+# Termo do filter_query: "{coluna} operador valor", com operadores simbólicos ou por nome
+# e o prefixo opcional de sensibilidade a maiúsculas ("i" ignora, "s" diferencia)
+TERMO_FILTRO = re.compile(
+    r"^\{(?P<coluna>[^}]+)\}\s*(?P<caixa>[is]?)(?P<operador>>=|<=|!=|<|>|=|ge|le|lt|gt|ne|eq|contains|datestartswith)"
+    r"(?:\s+|(?<=[<>=])\s*)(?P<valor>.*)$"
+)
+NOMES_OPERADORES = {">=": "ge", "<=": "le", "<": "lt", ">": "gt", "!=": "ne", "=": "eq"}
+
+# Bytes de ids (seleções e seleções ordenadas) mantidos por paginador
+LIMITE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def chave_ordenacao(serie, ids=None):
+    """
+    Chave numérica na ordem dos valores, com ausentes por último: postos das
+    categorias em ordem alfabética indexados pelos códigos, ou a própria coluna
+    numérica (só nas linhas `ids`, quando informadas)
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = np.asarray(serie.cat.categories)
+        # Uma posição extra no fim: o código -1 (ausente) recebe o maior posto
+        postos = np.empty(len(categorias) + 1, dtype=tipo_codigo(len(categorias) + 1))
+        postos[np.argsort(categorias, kind="stable")] = np.arange(len(categorias))
+        postos[-1] = len(categorias)
+        codigos = serie.cat.codes.to_numpy()
+        return postos[codigos if ids is None else codigos[ids]]
+    valores = serie.to_numpy()
+    return valores if ids is None else valores[ids]
+
+
+def permutacao(serie, tipo=np.int64):
+    """
+    Ids da coluna ordenados pelo valor (estável: empates em ordem de id)
+    """
+    return np.argsort(chave_ordenacao(serie), kind="stable").astype(tipo, copy=False)
+
+
+def separar_filtro(parte):
+    """
+    (coluna, operador, valor, ignorar_caixa) de um termo como "{salary_in_usd} >= 100000";
+    valores entre aspas perdem as aspas e seguem como texto
+    """
+    termo = TERMO_FILTRO.match(parte.strip())
+    if termo is None:
+        return None
+    valor = termo["valor"].strip()
+    if len(valor) > 1 and valor[0] == valor[-1] and valor[0] in ("'", '"', "`"):
+        valor = valor[1:-1].replace("\\" + valor[0], valor[0])
+    operador = NOMES_OPERADORES.get(termo["operador"], termo["operador"])
+    return termo["coluna"], operador, valor, termo["caixa"] == "i"
+
+
+def traduzir_filtro(consulta):
+    """
+    Termos do filter_query ("&&" entre colunas); termos fora do formato são ignorados
+    """
+    termos = []
+    for parte in (consulta or "").split(" && "):
+        termo = separar_filtro(parte)
+        if termo is not None:
+            termos.append(termo)
+    return termos
+
+
+def _comparar(valores, operador, valor):
+    if operador == "ge":
+        return valores >= valor
+    if operador == "le":
+        return valores <= valor
+    if operador == "lt":
+        return valores < valor
+    if operador == "gt":
+        return valores > valor
+    if operador == "ne":
+        return valores != valor
+    return valores == valor
+
+
+def valores_nativos(serie, ids):
+    """
+    Valores da coluna nas linhas `ids` como tipos nativos, com None para ausentes
+    (categorias: o dicionário indexado pelos códigos, sem passar pelo pandas)
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = np.append(np.asarray(serie.cat.categories, dtype=object), None)
+        return categorias[serie.cat.codes.to_numpy()[ids]].tolist()
+    valores = serie.to_numpy()[ids]
+    if valores.dtype.kind == "f":
+        return np.where(np.isnan(valores), None, valores.astype(object)).tolist()
+    return valores.tolist()
+
+
+class CacheSelecoes:
+    """
+    LRU de arrays de ids, limitado pela soma dos bytes (None ocupa zero)
+    """
+
+    def __init__(self, limite_bytes=LIMITE_CACHE_BYTES):
+        self.limite_bytes = limite_bytes
+        self._itens = OrderedDict()
+        self._bytes = 0
+        self._trava = threading.Lock()
+
+    def obter_ou_calcular(self, chave, calcular):
+        with self._trava:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                return self._itens[chave]
+        # Calculado fora da trava: requisições concorrentes da mesma chave repetem o cálculo
+        valor = calcular()
+        tamanho = 0 if valor is None else valor.nbytes
+        if tamanho <= self.limite_bytes:
+            with self._trava:
+                anterior = self._itens.pop(chave, None)
+                if anterior is not None:
+                    self._bytes -= anterior.nbytes
+                self._itens[chave] = valor
+                self._bytes += tamanho
+                while self._bytes > self.limite_bytes:
+                    _, descartado = self._itens.popitem(last=False)
+                    self._bytes -= 0 if descartado is None else descartado.nbytes
+        return valor
+
+
+def chave_selecao(filtros, filtro_colunas=""):
+    """
+    Chave de cache de uma seleção: filtros canônicos (normalizar_filtro) + filter_query
+    """
+    return tuple(sorted(filtros.items())), filtro_colunas or ""
+
+
+class PaginadorRegistros:
+    """
+    Páginas dos registros de uma seleção, ordenadas e filtradas por coluna
+    """
+
+    def __init__(self, df, indice, colunas=COLUNAS_REGISTROS, permutacoes=None,
+                 limite_cache_bytes=LIMITE_CACHE_BYTES):
+        self.df = df
+        self.indice = indice
+        self.colunas = [coluna for coluna in colunas if coluna in df.columns]
+        # permutacoes: {coluna: ids ordenados} já calculadas (ex.: memory-mapped do cache
+        # colunar); as demais são calculadas na primeira ordenação pela coluna
+        self._permutacoes = {
+            coluna: ordem for coluna, ordem in (permutacoes or {}).items()
+            if coluna in self.colunas and len(ordem) == len(df)
+        }
+        # O paginador é recriado a cada lote ingerido: o cache nunca mistura versões dos dados
+        self._cache = CacheSelecoes(limite_cache_bytes)
+
+    def permutacao(self, coluna):
+        if coluna not in self._permutacoes:
+            self._permutacoes[coluna] = permutacao(self.df[coluna], tipo_id(len(self.df)))
+        return self._permutacoes[coluna]
+
+    def _condicao(self, coluna, operador, valor, ignorar_caixa, ids):
+        """
+        Máscara de um termo sobre as linhas `ids` (todas, quando None). Categorias: o termo é
+        avaliado uma vez por categoria e expandido pelos códigos; colunas numéricas comparam
+        o número (contains e datestartswith viram igualdade)
+        """
+        serie = self.df[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            categorias = pd.Index(serie.cat.categories).astype(str)
+            if ignorar_caixa:
+                categorias, valor = categorias.str.lower(), valor.lower()
+            if operador == "contains":
+                aceitas = categorias.str.contains(valor, regex=False)
+            elif operador == "datestartswith":
+                aceitas = categorias.str.startswith(valor)
+            else:
+                aceitas = _comparar(categorias, operador, valor)
+            # Posição extra para o código -1 (ausente), que não atende a nenhum termo
+            tabela = np.append(np.asarray(aceitas, dtype=bool), False)
+            codigos = serie.cat.codes.to_numpy()
+            return tabela[codigos if ids is None else codigos[ids]]
+
+        try:
+            numero = float(valor)
+        except ValueError:
+            return np.zeros(len(self.df) if ids is None else len(ids), dtype=bool)
+        valores = serie.to_numpy()
+        return _comparar(valores if ids is None else valores[ids], operador, numero)
+
+    def selecionar(self, filtros, filtro_colunas=""):
+        """
+        Ids (crescentes) da seleção dos filtros com os termos do filter_query,
+        ou None quando nada restringe as linhas (do cache, quando já pedidos)
+        """
+        return self._cache.obter_ou_calcular(
+            ("ids", chave_selecao(filtros, filtro_colunas)), lambda: self._selecionar(filtros, filtro_colunas)
+        )
+
+    def _selecionar(self, filtros, filtro_colunas):
+        ids = self.indice.selecionar(filtros)
+        for coluna, operador, valor, ignorar_caixa in traduzir_filtro(filtro_colunas):
+            if coluna not in self.colunas:
+                continue
+            mascara = self._condicao(coluna, operador, valor, ignorar_caixa, ids)
+            ids = np.flatnonzero(mascara).astype(tipo_id(len(self.df))) if ids is None else ids[mascara]
+        return ids
+
+    def _ordenados(self, ids, coluna):
+        """
+        Ids da seleção em ordem crescente do valor da coluna (mesmos empates que a permutação)
+        """
+        if len(ids) * 8 < len(self.df):
+            # Seleção pequena: ordena só os ids dela
+            return ids[np.argsort(chave_ordenacao(self.df[coluna], ids), kind="stable")]
+        ordem = self.permutacao(coluna)
+        selecionados = np.zeros(len(self.df), dtype=bool)
+        selecionados[ids] = True
+        return ordem[selecionados[ordem]]
+
+    def _janela(self, ids, coluna, decrescente, inicio, fim, chave=None):
+        """
+        Ids nas posições [inicio, fim) da seleção na ordem pedida; com a chave da
+        seleção, a seleção ordenada vem do cache (as demais páginas são fatias)
+        """
+        if coluna is None:
+            if ids is None:
+                return np.arange(inicio, min(fim, len(self.df)))
+            return ids[inicio:fim]
+
+        if ids is None:
+            ordenados = self.permutacao(coluna)
+        elif chave is None:
+            ordenados = self._ordenados(ids, coluna)
+        else:
+            ordenados = self._cache.obter_ou_calcular(("ordem", chave, coluna), lambda: self._ordenados(ids, coluna))
+        return (ordenados[::-1] if decrescente else ordenados)[inicio:fim]
+
+    def pagina(self, filtros, pagina=0, tamanho=20, ordenar_por=None, filtro_colunas=""):
+        """
+        (registros da página como lista de dicts, total de registros da seleção).
+        ordenar_por: sort_by do DataTable ([{"column_id": ..., "direction": "asc"|"desc"}])
+        """
+        ids = self.selecionar(filtros, filtro_colunas)
+        registros = self.registros(ids, pagina, tamanho, ordenar_por, chave_selecao(filtros, filtro_colunas))
+        return registros, len(self.df) if ids is None else len(ids)
+
+    def registros(self, ids, pagina=0, tamanho=20, ordenar_por=None, chave=None):
+        """
+        Registros da página sobre ids já selecionados (None: todas as linhas);
+        chave: chave_selecao dos ids, para guardar a seleção ordenada no cache
+        """
+        coluna, decrescente = None, False
+        if ordenar_por and ordenar_por[0].get("column_id") in self.colunas:
+            coluna = ordenar_por[0]["column_id"]
+            decrescente = ordenar_por[0].get("direction") == "desc"
+
+        inicio = pagina * tamanho
+        janela = self._janela(ids, coluna, decrescente, inicio, inicio + tamanho, chave)
+        registros = {"id": janela.tolist()}
+        for nome in self.colunas:
+            registros[nome] = valores_nativos(self.df[nome], janela)
+        return [dict(zip(registros, linha)) for linha in zip(*registros.values())]
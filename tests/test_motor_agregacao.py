@@ -0,0 +1,98 @@
+"""
+Motor de agregação x groupby do pandas sobre frames sintéticos: medida com NaN,
+chaves ausentes, chaves categóricas e uma grade esparsa (caminho do np.unique)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from motor_agregacao import ESTATISTICAS, agregar, agregar_arrays, codigos_grupo
+
+
+def frame_sintetico(linhas=2000, semente=0):
+    gerador = np.random.default_rng(semente)
+    return pd.DataFrame({
+        "work_year": gerador.choice([2020, 2021, 2022, 2023], linhas),
+        "experience_level": gerador.choice(["EN", "MI", "SE", "EX"], linhas),
+        "company_size": gerador.choice(["S", "M", "L"], linhas),
+        "salary_in_usd": gerador.lognormal(11, 0.5, linhas).round(),
+    })
+
+
+def conferir(df, por, estatisticas=ESTATISTICAS, medida="salary_in_usd"):
+    """
+    agregar(...) deve reproduzir df.groupby(por, observed=True)[medida].agg(...)
+    """
+    obtido = agregar(df, por, medida, estatisticas)
+    esperado = df.groupby(por, observed=True)[medida].agg(list(estatisticas)).reset_index()
+    assert list(obtido.columns) == list(esperado.columns)
+    assert len(obtido) == len(esperado)
+    for coluna in por:
+        assert obtido[coluna].tolist() == esperado[coluna].tolist(), coluna
+    for estatistica in estatisticas:
+        np.testing.assert_allclose(
+            obtido[estatistica].to_numpy(dtype=float), esperado[estatistica].to_numpy(dtype=float),
+            rtol=1e-9, equal_nan=True, err_msg=estatistica
+        )
+    return obtido
+
+
+@pytest.mark.parametrize("por", [
+    ["experience_level"],
+    ["work_year", "experience_level"],
+    ["work_year", "experience_level", "company_size"],
+])
+def test_sem_ausentes(por):
+    conferir(frame_sintetico(), por)
+
+
+def test_medida_com_nan():
+    df = frame_sintetico()
+    df.loc[df.index % 7 == 0, "salary_in_usd"] = np.nan
+    # Um grupo só com NaN: count 0, sum 0, demais estatísticas NaN (e size conta as linhas)
+    df.loc[df["experience_level"] == "EX", "salary_in_usd"] = np.nan
+    resultado = conferir(df, ["work_year", "experience_level"])
+    assert (resultado.loc[resultado["experience_level"] == "EX", "count"] == 0).all()
+
+
+def test_chaves_ausentes():
+    df = frame_sintetico()
+    df["experience_level"] = df["experience_level"].astype(object)
+    df.loc[df.index % 5 == 0, "experience_level"] = None
+    df.loc[df.index % 11 == 0, "work_year"] = np.nan
+    conferir(df, ["experience_level"])
+    conferir(df, ["work_year", "experience_level"])
+
+
+def test_chaves_categoricas():
+    df = frame_sintetico()
+    # Categorias fora de ordem alfabética, uma sem linhas e códigos -1 (ausentes)
+    df["experience_level"] = pd.Categorical(df["experience_level"], categories=["SE", "EN", "XX", "MI", "EX"])
+    df["company_size"] = pd.Categorical(df["company_size"])
+    df.loc[df.index % 13 == 0, "company_size"] = np.nan
+    conferir(df, ["experience_level"])
+    conferir(df, ["experience_level", "company_size"])
+    conferir(df, ["work_year", "experience_level", "company_size"])
+
+
+def test_grade_esparsa():
+    gerador = np.random.default_rng(1)
+    linhas = 3000
+    df = pd.DataFrame({
+        "job_title": [f"cargo_{i}" for i in gerador.integers(0, 400, linhas)],
+        "employee_residence": [f"p{i}" for i in gerador.integers(0, 150, linhas)],
+        "work_year": gerador.integers(2000, 2024, linhas),
+        "salary_in_usd": gerador.lognormal(11, 0.5, linhas).round(),
+    })
+    df.loc[df.index % 9 == 0, "salary_in_usd"] = np.nan
+    por = ["job_title", "employee_residence", "work_year"]
+    grupo, _, forma = codigos_grupo(df, por)
+    # Grade bem maior que as linhas: agregar_arrays recodifica os grupos com np.unique
+    assert np.prod(forma) > 2 * len(grupo) + 1024
+    conferir(df, por)
+
+
+def test_estatistica_desconhecida():
+    with pytest.raises(ValueError):
+        agregar_arrays(frame_sintetico(), ["work_year"], estatisticas=("mean", "max"))